@@ -1,3 +1,50 @@
 from django.contrib import admin
+from .models import ComparisonRun, ExportJob, ImportBatch
 
-# Register your models here.
+
+class ExportJobAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'user', 'status', 'progress', 'total_rows', 'jinfo', 'expires_at')
+    list_filter = ('status', 'kind', 'created_at')
+    search_fields = ('user__username', 'filename')
+    readonly_fields = (
+        'user', 'kind', 'params', 'selected_fields', 'status', 'progress', 'total_rows',
+        'file', 'filename', 'error', 'created_at', 'started_at', 'finished_at', 'expires_at',
+    )
+    ordering = ('-created_at',)
+
+    def has_add_permission(self, request):
+        return False
+
+admin.site.register(ExportJob, ExportJobAdmin)
+
+
+class ImportBatchAdmin(admin.ModelAdmin):
+    list_display = ('filename', 'user', 'status', 'total_rows', 'jinfo', 'applied_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('user__username', 'filename')
+    readonly_fields = ('user', 'filename', 'status', 'total_rows', 'created_at', 'updated_at', 'applied_at')
+    ordering = ('-created_at',)
+
+    def has_add_permission(self, request):
+        return False
+
+admin.site.register(ImportBatch, ImportBatchAdmin)
+
+
+class ComparisonRunAdmin(admin.ModelAdmin):
+    list_display = (
+        'filename', 'user', 'comparison_type', 'new_items_count', 'differences_count',
+        'system_only_count', 'excel_errors_count', 'jinfo',
+    )
+    list_filter = ('comparison_type', 'created_at')
+    search_fields = ('user__username', 'filename')
+    readonly_fields = (
+        'user', 'filename', 'comparison_type', 'new_items_count', 'existing_items_count',
+        'differences_count', 'system_only_count', 'excel_errors_count', 'created_at',
+    )
+    ordering = ('-created_at',)
+
+    def has_add_permission(self, request):
+        return False
+
+admin.site.register(ComparisonRun, ComparisonRunAdmin)
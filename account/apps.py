@@ -5,3 +5,8 @@ class AccountConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'account'
     verbose_name = 'اکانت'
+
+    def ready(self):
+        # ثبت فونت فارسی و ساخت استایل‌های PDF یک بار هنگام راه‌اندازی پروسه
+        from .pdf_resources import get_pdf_resources
+        get_pdf_resources()
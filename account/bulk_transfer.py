@@ -0,0 +1,122 @@
+"""
+انتقال دسته‌ای کالاها با سیستم تایید
+
+همه کالاهای انتخاب شده همراه با دارنده فعلی در یک کوئری خوانده می‌شوند، جفت
+درخواست‌های انتقال/دریافت (یا درخواست تخصیص برای کالاهای بدون دارنده) در حافظه
+ساخته می‌شوند و همه با یک bulk_create در یک تراکنش ثبت می‌شوند؛ در صورت بروز خطا
+هیچ درخواستی ثبت نمی‌شود.
+"""
+
+from django.conf import settings
+from django.db import transaction
+
+from holder.inbox import invalidate_pending_counts
+from holder.models import Items, ItemChangeRequest
+from shared.approval_utils import new_transfer_group
+
+
+class BulkTransferResult:
+    """
+    نتیجه انتقال دسته‌ای
+
+    Attributes:
+        request_count: تعداد کالاهای دارای دارنده که برای آن‌ها درخواست انتقال ثبت شد
+        direct_count: تعداد کالاهای بدون دارنده که برای آن‌ها درخواست تخصیص ثبت شد
+    """
+
+    def __init__(self):
+        self.request_count = 0
+        self.direct_count = 0
+
+
+def _person_change(old_owner, new_owner):
+    return {
+        'PersonalInfo': {
+            'old': f"{old_owner.name} {old_owner.family}" if old_owner else None,
+            'new': f"{new_owner.name} {new_owner.family}",
+            'old_id': old_owner.Personnel_number if old_owner else None,
+            'new_id': new_owner.Personnel_number
+        }
+    }
+
+
+def transfer_requests(item, to_person, admin_user, description=''):
+    """
+    درخواست‌های تغییر انتقال یک کالا به to_person (ذخیره نشده)
+
+    Returns:
+        list: [انتقال، دریافت] برای کالای دارای دارنده، [تخصیص] برای کالای بدون
+        دارنده و لیست خالی اگر کالا از قبل متعلق به to_person باشد
+    """
+    old_owner = item.PersonalInfo
+    if old_owner and old_owner != to_person:
+        # درخواست تایید برای مالک قبلی و همزمان برای مالک جدید
+        transfer_group = new_transfer_group()
+        return [
+            ItemChangeRequest(
+                item=item,
+                owner=old_owner,
+                admin_user=admin_user,
+                action_type='transfer',
+                proposed_changes=_person_change(old_owner, to_person),
+                description=description or f'درخواست انتقال کالا از {old_owner.name} {old_owner.family} به {to_person.name} {to_person.family}',
+                transfer_group=transfer_group
+            ),
+            ItemChangeRequest(
+                item=item,
+                owner=to_person,
+                admin_user=admin_user,
+                action_type='receive',
+                proposed_changes=_person_change(old_owner, to_person),
+                description=description or f'درخواست دریافت کالا از {old_owner.name} {old_owner.family}',
+                transfer_group=transfer_group
+            ),
+        ]
+    if not old_owner:
+        # اگر کالا مالک ندارد، درخواست تخصیص ایجاد کن
+        return [
+            ItemChangeRequest(
+                item=item,
+                owner=to_person,
+                admin_user=admin_user,
+                action_type='assign',
+                proposed_changes=_person_change(None, to_person),
+                description=description or f'درخواست تخصیص دسته‌ای کالا {item.Technical_items} به {to_person.name} {to_person.family}'
+            )
+        ]
+    return []
+
+
+def bulk_transfer(item_ids, to_person, admin_user, description=''):
+    """
+    ثبت درخواست‌های انتقال کالاهای انتخاب شده به to_person
+
+    Args:
+        item_ids: شناسه کالاهای انتخاب شده (شناسه‌های ناموجود نادیده گرفته می‌شوند)
+        to_person: شخص مقصد
+        admin_user: نام کاربر مدیر
+        description: توضیحات مشترک درخواست‌ها (در صورت خالی بودن، متن پیش‌فرض هر درخواست)
+
+    Returns:
+        BulkTransferResult
+    """
+    result = BulkTransferResult()
+    item_ids = [Items._meta.pk.get_prep_value(item_id) for item_id in item_ids]
+    items = Items.objects.select_related('PersonalInfo').in_bulk(set(item_ids))
+
+    requests = []
+    for item_id in item_ids:
+        item = items.get(item_id)
+        if item is None:
+            continue
+        item_requests = transfer_requests(item, to_person, admin_user, description)
+        if len(item_requests) == 2:
+            result.request_count += 1
+        elif item_requests:
+            result.direct_count += 1
+        requests.extend(item_requests)
+
+    with transaction.atomic():
+        ItemChangeRequest.objects.bulk_create(requests, batch_size=getattr(settings, 'IMPORT_BULK_BATCH_SIZE', 500))
+        invalidate_pending_counts(change_request.owner_id for change_request in requests)
+    return result
@@ -0,0 +1,279 @@
+"""
+اعمال دسته‌ای تفاوت‌های مقایسه Excel با سیستم
+
+به جای درخواست جداگانه برای هر کالا (با جستجوی جداگانه دارنده و ایجاد تک‌تک
+درخواست‌های تغییر)، کالاها و دارندگان همه ردیف‌های انتخاب شده یکجا خوانده می‌شوند:
+کالاهای بدون دارنده مستقیماً با import_items (bulk_update) به‌روزرسانی و برای
+کالاهای دارای دارنده درخواست‌های تغییر با bulk_create ثبت می‌شوند؛ همه در یک تراکنش.
+"""
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from holder.bulk_import import import_items
+from holder.inbox import invalidate_pending_counts
+from holder.models import Items, ItemChangeRequest, PersonalInfo
+from shared.approval_utils import new_transfer_group
+from shared.bulk_lookup import chunked
+from .excel_add_items import HOLDER_NAME_CHUNK_SIZE
+from .excel_ingest import ITEM_TYPE_CODES, STATUS_MAIN_CODES, STATUS_SUB_CODES, NO_HOLDER_LABEL, holder_personnel_number
+from .models import ComparisonEntry
+
+# کلید داده Excel -> (فیلد مدل، تبدیل مقدار نمایشی به مقدار مدل)
+EXCEL_FIELD_MAP = (
+    ('item_name', 'Technical_items', None),
+    ('item_type', 'type_Item', lambda value: ITEM_TYPE_CODES.get(value, value)),
+    ('brand', 'brand', None),
+    ('configuration', 'Configuration', None),
+    ('status_main', 'status_item', lambda value: STATUS_MAIN_CODES.get(value, value)),
+    ('status_sub', 'status_sub_item', lambda value: STATUS_SUB_CODES.get(value, value)),
+    ('serial_number', 'serial_number', None),
+    ('product_code', 'Product_code', None),
+    ('number', 'Number', int),
+)
+
+
+class ApplyDifferencesResult:
+    """
+    نتیجه اعمال دسته‌ای تفاوت‌ها
+
+    Attributes:
+        updated: تعداد کالاهای بدون دارنده که مستقیماً به‌روزرسانی شدند
+        requested: تعداد کالاهایی که برای آن‌ها درخواست تغییر ثبت شد
+        unchanged: تعداد کالاهایی که با داده‌های Excel یکسان بودند
+        errors: لیست (شماره ردیف Excel، متن خطا)
+    """
+
+    def __init__(self):
+        self.updated = 0
+        self.requested = 0
+        self.unchanged = 0
+        self.errors = []
+
+
+def _holder_number(holder_info):
+    """شماره پرسنلی دارنده در داده Excel (داخل پرانتز یا خود مقدار 9 رقمی)"""
+    if holder_info and str(holder_info).isdigit() and len(str(holder_info)) == 9:
+        return str(holder_info)
+    return holder_personnel_number(holder_info)
+
+
+def _holder_name(holder_info):
+    """(نام، نام خانوادگی) دارنده بدون شماره پرسنلی: کلمه اول و بقیه کلمات"""
+    if not holder_info or holder_info == NO_HOLDER_LABEL:
+        return None
+    name_parts = str(holder_info).strip().split()
+    if len(name_parts) < 2:
+        return None
+    return name_parts[0], ' '.join(name_parts[1:])
+
+
+def _resolve_holders(holder_infos):
+    """
+    یافتن دارندگان مقادیر Excel با کوئری‌های دسته‌ای
+
+    مقادیر دارای شماره پرسنلی با شماره و بقیه (مانند apply_excel_data_to_item) بر
+    اساس نام و نام خانوادگی جستجو می‌شوند؛ برای هر نام اولین دارنده به ترتیب شماره
+    پرسنلی انتخاب می‌شود.
+
+    Returns:
+        dict: متن دارنده -> PersonalInfo (فقط دارندگان یافت شده)
+    """
+    holder_infos = {holder_info for holder_info in holder_infos if holder_info}
+    numbers = {holder_info: _holder_number(holder_info) for holder_info in holder_infos}
+    people = PersonalInfo.objects.in_bulk({number for number in numbers.values() if number})
+    holders = {
+        holder_info: people[number]
+        for holder_info, number in numbers.items() if number in people
+    }
+
+    # (نام، نام خانوادگی) -> متن‌های دارنده
+    name_pairs = {}
+    for holder_info, number in numbers.items():
+        pair = None if number else _holder_name(holder_info)
+        if pair:
+            name_pairs.setdefault(pair, []).append(holder_info)
+
+    for pairs in chunked(sorted(name_pairs), HOLDER_NAME_CHUNK_SIZE):
+        query = Q()
+        for first_name, last_name in pairs:
+            query |= Q(name__icontains=first_name, family__icontains=last_name)
+        candidates = list(PersonalInfo.objects.filter(query).order_by('pk'))
+        for pair in pairs:
+            first_name, last_name = pair[0].lower(), pair[1].lower()
+            person = next((
+                candidate for candidate in candidates
+                if first_name in candidate.name.lower() and last_name in candidate.family.lower()
+            ), None)
+            if person:
+                holders.update(dict.fromkeys(name_pairs[pair], person))
+    return holders
+
+
+def _target_values(excel_data):
+    """فیلد مدل -> مقدار جدید برای مقادیر غیر خالی Excel (مانند apply_excel_data_to_item)"""
+    values = {}
+    for key, field, convert in EXCEL_FIELD_MAP:
+        value = excel_data.get(key)
+        if value:
+            values[field] = convert(value) if convert else value
+    return values
+
+
+def _display(value):
+    return str(value) if value else None
+
+
+def _person_change(old_owner, new_owner):
+    return {
+        'old': f"{old_owner.name} {old_owner.family}" if old_owner else None,
+        'new': f"{new_owner.name} {new_owner.family}" if new_owner else None,
+        'old_id': old_owner.Personnel_number if old_owner else None,
+        'new_id': new_owner.Personnel_number if new_owner else None
+    }
+
+
+def _change_requests(item, changes, new_owner, admin_user):
+    """
+    درخواست‌های تغییر کالای دارای دارنده (مانند edit_item_from_comparison)
+    """
+    old_owner = item.PersonalInfo
+    if new_owner is not None and new_owner != old_owner:
+        transfer_group = new_transfer_group()
+        return [
+            ItemChangeRequest(
+                item=item,
+                owner=old_owner,
+                admin_user=admin_user,
+                action_type='transfer',
+                proposed_changes=changes,
+                description=f"درخواست انتقال کالا {item.Technical_items} توسط مدیر {admin_user} به {new_owner.name} {new_owner.family}",
+                transfer_group=transfer_group
+            ),
+            ItemChangeRequest(
+                item=item,
+                owner=new_owner,
+                admin_user=admin_user,
+                action_type='receive',
+                proposed_changes=changes,
+                description=f"درخواست دریافت کالا {item.Technical_items} توسط مدیر {admin_user}",
+                transfer_group=transfer_group
+            ),
+        ]
+    return [
+        ItemChangeRequest(
+            item=item,
+            owner=old_owner,
+            admin_user=admin_user,
+            action_type='edit',
+            proposed_changes=changes,
+            description=f"درخواست تغییر مشخصات کالا {item.Technical_items} توسط مدیر {admin_user}"
+        )
+    ]
+
+
+def apply_differences(run, item_ids=None, admin_user=''):
+    """
+    اعمال داده‌های Excel ردیف‌های تفاوت یک مقایسه
+
+    Args:
+        run: مقایسه ذخیره شده
+        item_ids: شناسه کالاهای انتخاب شده (None: همه تفاوت‌های اعمال نشده)
+        admin_user: نام کاربر مدیر برای درخواست‌های تغییر
+
+    Returns:
+        ApplyDifferencesResult
+    """
+    batch_size = getattr(settings, 'IMPORT_BULK_BATCH_SIZE', 500)
+    result = ApplyDifferencesResult()
+
+    entries = run.entries.filter(category=ComparisonEntry.CATEGORY_DIFFERENCE, resolved=False)
+    if item_ids is not None:
+        entries = entries.filter(item_id__in=item_ids)
+
+    # برای هر کالا فقط اولین ردیف تفاوت آن در مقایسه اعمال می‌شود
+    selected = {}
+    for entry in entries.order_by('position'):
+        selected.setdefault(entry.item_id, entry)
+    if not selected:
+        return result
+
+    with transaction.atomic():
+        items = Items.objects.select_related('PersonalInfo').in_bulk(list(selected))
+        targets = {item_id: _target_values(entry.data['excel_data']) for item_id, entry in selected.items()}
+        holder_infos = {
+            item_id: entry.data['excel_data'].get('holder_info')
+            for item_id, entry in selected.items()
+        }
+        holders = _resolve_holders(holder_infos.values())
+
+        import_rows = []
+        requests = []
+        resolved = []
+        requested_entries = {}
+
+        for item_id, entry in selected.items():
+            item = items.get(item_id)
+            if item is None:
+                result.errors.append((entry.row_number, 'کالای مورد نظر یافت نشد.'))
+                continue
+
+            # اعتبارسنجی زیر وضعیت (مانند Items.clean) پیش از ثبت درخواست یا به‌روزرسانی
+            target = targets[item_id]
+            status = target.get('status_item', item.status_item)
+            sub_status = target.get('status_sub_item', item.status_sub_item)
+            if status and sub_status and sub_status not in [choice[0] for choice in Items.STATUS_SUB_MAPPING.get(status, [])]:
+                result.errors.append((entry.row_number, 'زیر مجموعه انتخاب‌شده معتبر نیست.'))
+                continue
+
+            changed = {field: value for field, value in target.items() if getattr(item, field) != value}
+            # دارنده فقط در صورت یافتن شخص با شماره پرسنلی یا نام تغییر می‌کند
+            new_owner = holders.get(holder_infos[item_id])
+            owner_change = new_owner is not None and new_owner != item.PersonalInfo
+
+            if not changed and not owner_change:
+                result.unchanged += 1
+                resolved.append(entry.pk)
+                continue
+
+            if item.PersonalInfo is None:
+                data = dict(changed)
+                if owner_change:
+                    data['PersonalInfo'] = new_owner.Personnel_number
+                import_rows.append({
+                    'row_number': entry.pk,
+                    'action_type': 'update',
+                    'existing_item_id': item.pk,
+                    'data': data,
+                })
+                continue
+
+            changes = {
+                field: {'old': _display(getattr(item, field)), 'new': _display(value)}
+                for field, value in changed.items()
+            }
+            if owner_change:
+                changes['PersonalInfo'] = _person_change(item.PersonalInfo, new_owner)
+            requests.extend(_change_requests(item, changes, new_owner, admin_user))
+            requested_entries[entry.pk] = entry
+            result.requested += 1
+
+        if import_rows:
+            import_result = import_items(import_rows, batch_size=batch_size)
+            failed = {entry_pk for entry_pk, error in import_result.errors}
+            entry_rows = {entry.pk: entry.row_number for entry in selected.values()}
+            result.errors.extend((entry_rows[entry_pk], error) for entry_pk, error in import_result.errors)
+            result.updated += import_result.updated
+            resolved.extend(row['row_number'] for row in import_rows if row['row_number'] not in failed)
+
+        if requests:
+            ItemChangeRequest.objects.bulk_create(requests, batch_size=batch_size)
+            invalidate_pending_counts(change_request.owner_id for change_request in requests)
+            resolved.extend(requested_entries)
+
+        if resolved:
+            ComparisonEntry.objects.filter(pk__in=resolved).update(resolved=True)
+
+    result.errors.sort(key=lambda error: error[0] or 0)
+    return result
@@ -0,0 +1,256 @@
+"""
+موتور مقایسه فایل Excel با کالاهای سیستم
+
+کالاهای سیستم یک بار با values_list خوانده و به صورت tuple در نمایه‌های کلیددار
+(شماره سریال و کد محصول / نوع کالا) نگهداری می‌شوند؛ ردیف‌های فایل به صورت جریانی
+با این نمایه‌ها مقایسه می‌شوند و به جای کوئری برای هر ردیف و بارگذاری نمونه‌های
+مدل، کالاهای فقط موجود در سیستم هم از همین نمایه استخراج می‌شوند.
+"""
+
+from holder.models import Items
+
+# فیلدهای خوانده شده از کالاهای سیستم (ترتیب مطابق اندیس‌های زیر)
+INVENTORY_FIELDS = (
+    'id', 'Technical_items', 'type_Item', 'brand', 'Configuration', 'status_item',
+    'status_sub_item', 'serial_number', 'Product_code', 'PersonalInfo',
+    'PersonalInfo__name', 'PersonalInfo__family', 'Number',
+)
+(
+    ID, NAME, TYPE, BRAND, CONFIGURATION, STATUS, SUB_STATUS, SERIAL,
+    PRODUCT_CODE, HOLDER, HOLDER_NAME, HOLDER_FAMILY, NUMBER,
+) = range(len(INVENTORY_FIELDS))
+
+TECHNICAL_LABELS = ('technical', 'فنی')
+NON_TECHNICAL_LABELS = ('non-technical', 'غیر فنی')
+
+
+def _choice_display(field_name):
+    """نمایش گزینه‌های یک فیلد (معادل get_FOO_display)"""
+    choices = dict(Items._meta.get_field(field_name).flatchoices)
+    return lambda value: choices.get(value, value)
+
+
+def _field_label(field_name):
+    return Items._meta.get_field(field_name).verbose_name
+
+
+class InventoryIndex:
+    """
+    نمایه کالاهای سیستم برای مقایسه
+
+    Attributes:
+        rows: tuple های values_list همه کالاها به ترتیب شناسه
+        by_serial: شماره سریال -> اولین کالا
+        by_code: کد محصول -> اولین کالا (هر نوع)
+        by_code_type: (کد محصول، نوع کالا) -> اولین کالا
+    """
+
+    def __init__(self, queryset=None, chunk_size=2000):
+        queryset = Items.objects.all() if queryset is None else queryset
+        self.rows = []
+        self.by_serial = {}
+        self.by_code = {}
+        self.by_code_type = {}
+
+        for row in queryset.order_by('pk').values_list(*INVENTORY_FIELDS).iterator(chunk_size=chunk_size):
+            self.rows.append(row)
+            if row[SERIAL] is not None:
+                self.by_serial.setdefault(row[SERIAL], row)
+            if row[PRODUCT_CODE] is not None:
+                self.by_code.setdefault(row[PRODUCT_CODE], row)
+                self.by_code_type.setdefault((row[PRODUCT_CODE], row[TYPE]), row)
+
+        self._type_display = _choice_display('type_Item')
+        self._status_display = _choice_display('status_item')
+        self._sub_status_display = _choice_display('status_sub_item')
+
+    def find_technical(self, serial_number, product_code):
+        """
+        کالای فنی متناظر: ابتدا بر اساس شماره سریال و سپس کد محصول؛ فقط در صورت
+        مطابقت کامل شماره سریال (در صورت وجود) و کد محصول
+        """
+        row = self.by_serial.get(serial_number) if serial_number else None
+        if row is None:
+            row = self.by_code.get(product_code)
+        if row is None:
+            return None
+        if serial_number and row[SERIAL] != serial_number:
+            return None
+        if row[PRODUCT_CODE] != product_code:
+            return None
+        return row
+
+    def find_non_technical(self, product_code):
+        """اولین کالای غیر فنی با این کد محصول"""
+        return self.by_code_type.get((product_code, 'Non-technical'))
+
+    def item_data(self, row):
+        """اطلاعات نمایشی یک کالای سیستم"""
+        return {
+            'id': row[ID],
+            'item_name': row[NAME],
+            'item_type': self._type_display(row[TYPE]),
+            'brand': row[BRAND],
+            'configuration': row[CONFIGURATION],
+            'status_main': self._status_display(row[STATUS]),
+            'status_sub': self._sub_status_display(row[SUB_STATUS]) if row[SUB_STATUS] else None,
+            'serial_number': row[SERIAL],
+            'product_code': row[PRODUCT_CODE],
+            'holder_info': f"{row[HOLDER_NAME]} {row[HOLDER_FAMILY]} ({row[HOLDER]})" if row[HOLDER] else None,
+            'number': row[NUMBER],
+        }
+
+    def system_only(self, excel_serial_numbers, excel_product_codes):
+        """کالاهای سیستم که در فایل نیستند"""
+        missing = []
+        for row in self.rows:
+            if row[TYPE] == 'Technical':
+                found = bool(row[SERIAL] and row[SERIAL] in excel_serial_numbers) or row[PRODUCT_CODE] in excel_product_codes
+            elif row[TYPE] == 'Non-technical':
+                found = row[PRODUCT_CODE] in excel_product_codes
+            else:
+                found = False
+            if not found:
+                missing.append(self.item_data(row))
+        return missing
+
+
+def field_comparisons(is_technical):
+    """(کلید فیلد، برچسب) فیلدهای مقایسه؛ شماره سریال فقط برای کالاهای فنی"""
+    comparisons = [
+        ('item_name', _field_label('Technical_items')),
+        ('item_type', _field_label('type_Item')),
+        ('brand', _field_label('brand')),
+        ('configuration', _field_label('Configuration')),
+        ('status_main', _field_label('status_item')),
+        ('status_sub', _field_label('status_sub_item')),
+    ]
+    if is_technical:
+        comparisons.append(('serial_number', _field_label('serial_number')))
+    comparisons.extend([
+        ('product_code', _field_label('Product_code')),
+        ('number', _field_label('Number')),
+    ])
+    return comparisons
+
+
+def diff_fields(excel_data, system_data, comparisons):
+    """تفاوت‌های فیلد به فیلد (مقایسه متنی بدون فاصله‌های ابتدا و انتها)"""
+    differences = []
+    for field, label in comparisons:
+        excel_value = excel_data.get(field)
+        system_value = system_data.get(field)
+
+        if excel_value is None:
+            excel_value = ''
+        if system_value is None:
+            system_value = ''
+
+        if str(excel_value).strip() != str(system_value).strip():
+            differences.append({
+                'field': field,
+                'field_label': label,
+                'excel_value': excel_value,
+                'system_value': system_value
+            })
+    return differences
+
+
+def is_technical_type(raw_type):
+    """فنی بودن کالا بر اساس مقدار خام نوع در فایل (مقدار خالی: فنی)"""
+    if not raw_type:
+        return True
+    return raw_type.lower() in TECHNICAL_LABELS
+
+
+def compare_records(records, build_excel_data, include_system_only=True, index=None):
+    """
+    مقایسه ردیف‌های فایل با کالاهای سیستم در یک عبور
+
+    Args:
+        records: (شماره ردیف، رکورد) از iter_excel_records
+        build_excel_data: تابع (شماره ردیف، رکورد، فنی بودن) -> اطلاعات نمایشی ردیف فایل
+        include_system_only: محاسبه کالاهای فقط موجود در سیستم
+        index: InventoryIndex (در صورت None ساخته می‌شود)
+
+    Returns:
+        dict: new_items, existing_items, differences, system_only, excel_errors
+    """
+    index = index or InventoryIndex()
+    comparisons = {
+        True: field_comparisons(True),
+        False: field_comparisons(False),
+    }
+    results = {
+        'new_items': [],           # کالاهای جدید (در Excel هست، در سیستم نیست)
+        'existing_items': [],      # کالاهای موجود (در هر دو هست)
+        'differences': [],         # کالاهایی که تفاوت دارند
+        'system_only': [],         # کالاهایی که فقط در سیستم هستند
+        'excel_errors': []         # خطاهای فایل Excel
+    }
+    excel_product_codes = set()
+    excel_serial_numbers = set()
+
+    for row_num, values in records:
+        try:
+            serial_number = values['serial_number']
+            product_code = values['product_code']
+
+            # بررسی وجود کد محصول (ضروری)
+            if not product_code:
+                results['excel_errors'].append({
+                    'row': row_num,
+                    'error': 'کد محصول وارد نشده است',
+                    'data': {
+                        'item_name': values['item_name'],
+                        'serial_number': serial_number
+                    }
+                })
+                continue
+
+            raw_type = values['item_type']
+            is_technical = is_technical_type(raw_type)
+
+            excel_product_codes.add(product_code)
+            # فقط برای کالاهایی که صریحاً فنی هستند شماره سریال ثبت می‌شود
+            if serial_number and raw_type and raw_type.lower() in TECHNICAL_LABELS:
+                excel_serial_numbers.add(serial_number)
+
+            excel_item_data = build_excel_data(row_num, values, is_technical)
+
+            if is_technical:
+                row = index.find_technical(serial_number, product_code)
+                new_item_reason = f"کالا جدید است - {'شماره سریال' if serial_number else 'کد محصول'} '{serial_number or product_code}' در سیستم موجود نیست"
+            else:
+                row = index.find_non_technical(product_code)
+                new_item_reason = f"کالا جدید است - کد محصول '{product_code}' در کالاهای غیر فنی موجود نیست"
+
+            if row is None:
+                excel_item_data['new_item_reason'] = new_item_reason
+                results['new_items'].append(excel_item_data)
+                continue
+
+            system_item_data = index.item_data(row)
+            differences = diff_fields(excel_item_data, system_item_data, comparisons[is_technical])
+            if differences:
+                results['differences'].append({
+                    'excel_data': excel_item_data,
+                    'system_data': system_item_data,
+                    'differences': differences
+                })
+            else:
+                results['existing_items'].append({
+                    'excel_data': excel_item_data,
+                    'system_data': system_item_data
+                })
+
+        except Exception as e:
+            results['excel_errors'].append({
+                'row': row_num,
+                'error': f'خطا در پردازش: {str(e)}',
+                'data': {}
+            })
+
+    if include_system_only:
+        results['system_only'] = index.system_only(excel_serial_numbers, excel_product_codes)
+    return results
@@ -0,0 +1,161 @@
+"""
+ذخیره نتایج مقایسه Excel (ComparisonRun / ComparisonEntry)
+
+نتیجه هر مقایسه با یک شناسه در پایگاه داده ذخیره می‌شود؛ صفحه نتایج هر دسته را
+جداگانه و صفحه‌بندی شده نمایش می‌دهد و عملیات بعدی (افزودن کالاهای جدید، ویرایش
+کالا و اعمال داده‌های Excel) داده‌ها را به جای session یا JSON ارسالی از همین
+ردیف‌ها می‌خوانند.
+"""
+
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ComparisonEntry, ComparisonRun
+
+# ترتیب نمایش دسته‌ها
+CATEGORIES = (
+    ComparisonEntry.CATEGORY_NEW,
+    ComparisonEntry.CATEGORY_EXISTING,
+    ComparisonEntry.CATEGORY_DIFFERENCE,
+    ComparisonEntry.CATEGORY_SYSTEM_ONLY,
+    ComparisonEntry.CATEGORY_ERROR,
+)
+
+# نوع مقایسه -> دسته‌های قابل نمایش
+TYPE_CATEGORIES = {
+    'all': CATEGORIES,
+    'new_items': (ComparisonEntry.CATEGORY_NEW, ComparisonEntry.CATEGORY_ERROR),
+    'existing_items': (ComparisonEntry.CATEGORY_EXISTING, ComparisonEntry.CATEGORY_ERROR),
+    'differences': (ComparisonEntry.CATEGORY_DIFFERENCE, ComparisonEntry.CATEGORY_ERROR),
+    'system_only': (ComparisonEntry.CATEGORY_SYSTEM_ONLY,),
+}
+
+
+def comparison_page_size():
+    """تعداد ردیف‌های هر صفحه نتایج مقایسه"""
+    return getattr(settings, 'COMPARISON_PAGE_SIZE', 100)
+
+
+def comparison_run_ttl():
+    """مدت نگهداری نتایج مقایسه"""
+    return timedelta(hours=getattr(settings, 'COMPARISON_RUN_TTL_HOURS', 72))
+
+
+def _entry_keys(category, data):
+    """(ردیف Excel، شناسه کالای سیستم) یک نتیجه"""
+    if category == ComparisonEntry.CATEGORY_NEW:
+        return data.get('row'), None
+    if category in (ComparisonEntry.CATEGORY_EXISTING, ComparisonEntry.CATEGORY_DIFFERENCE):
+        return data['excel_data'].get('row'), data['system_data'].get('id')
+    if category == ComparisonEntry.CATEGORY_SYSTEM_ONLY:
+        return None, data.get('id')
+    return data.get('row'), None
+
+
+def save_comparison_run(user, filename, comparison_type, results):
+    """
+    ذخیره نتیجه compare_records
+
+    Args:
+        user: کاربر
+        filename: نام فایل Excel
+        comparison_type: نوع مقایسه
+        results: دیکشنری دسته -> لیست نتایج
+
+    Returns:
+        ComparisonRun
+    """
+    with transaction.atomic():
+        run = ComparisonRun.objects.create(
+            user=user,
+            filename=filename[:255],
+            comparison_type=comparison_type if comparison_type in TYPE_CATEGORIES else 'all',
+            **{f'{category}_count': len(results[category]) for category in CATEGORIES},
+        )
+
+        entries = []
+        for category in CATEGORIES:
+            for position, data in enumerate(results[category]):
+                row_number, item_id = _entry_keys(category, data)
+                entries.append(ComparisonEntry(
+                    run=run,
+                    category=category,
+                    position=position,
+                    row_number=row_number,
+                    item_id=item_id,
+                    data=data,
+                ))
+        ComparisonEntry.objects.bulk_create(entries, batch_size=getattr(settings, 'IMPORT_BULK_BATCH_SIZE', 500))
+    return run
+
+
+def run_categories(run):
+    """دسته‌های قابل نمایش یک مقایسه با تعداد ردیف‌ها"""
+    return [
+        (category, label, getattr(run, f'{category}_count'))
+        for category, label in ComparisonEntry.CATEGORY_CHOICES
+        if category in TYPE_CATEGORIES[run.comparison_type]
+    ]
+
+
+def run_stats(run):
+    """آمار کلی مقایسه (با کلیدهای قبلی قالب نتایج)"""
+    return {
+        'total_excel_items': run.new_items_count + run.existing_items_count + run.differences_count,
+        'new_items_count': run.new_items_count,
+        'existing_items_count': run.existing_items_count,
+        'differences_count': run.differences_count,
+        'system_only_count': run.system_only_count,
+        'excel_errors_count': run.excel_errors_count,
+        'comparison_type': run.comparison_type,
+    }
+
+
+def new_item_entries(run, entry_ids=None):
+    """
+    ردیف‌های کالای جدید اضافه نشده یک مقایسه
+
+    Args:
+        run: مقایسه
+        entry_ids: شناسه ردیف‌های انتخاب شده (None: همه کالاهای جدید)
+    """
+    entries = run.entries.filter(category=ComparisonEntry.CATEGORY_NEW, resolved=False)
+    if entry_ids is not None:
+        entries = entries.filter(pk__in=entry_ids)
+    return entries.order_by('position')
+
+
+def difference_entry_for_item(user, item_id, run_id=None):
+    """
+    ردیف تفاوت کالا در مقایسه داده شده، یا در آخرین مقایسه کاربر که این کالا را دارد
+
+    Returns:
+        ComparisonEntry یا None
+    """
+    entries = ComparisonEntry.objects.filter(
+        run__user=user,
+        category=ComparisonEntry.CATEGORY_DIFFERENCE,
+        item_id=item_id,
+    )
+    if run_id:
+        try:
+            entries = entries.filter(run_id=uuid.UUID(str(run_id)))
+        except ValueError:
+            return None
+    return entries.order_by('-run__created_at', 'position').first()
+
+
+def cleanup_comparison_runs(now=None):
+    """
+    حذف نتایج مقایسه قدیمی‌تر از COMPARISON_RUN_TTL_HOURS
+
+    Returns:
+        int: تعداد مقایسه‌های حذف شده
+    """
+    now = now or timezone.now()
+    deleted, per_model = ComparisonRun.objects.filter(created_at__lt=now - comparison_run_ttl()).delete()
+    return per_model.get(ComparisonRun._meta.label, 0)
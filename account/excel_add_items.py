@@ -1,10 +1,234 @@
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.core.exceptions import ValidationError
 from django.db import transaction
+from django.db.models import Q
 from django.http import JsonResponse
+from django.urls import reverse
+from holder.bulk_import import import_items
 from holder.models import Items, PersonalInfo
+from shared.bulk_lookup import chunked, existing_values
+from .comparison_runs import new_item_entries
+from .models import ComparisonEntry, ComparisonRun
 import json
+import uuid
+
+# فیلدهای داده کالای جدید در نتایج مقایسه
+NEW_ITEM_FIELDS = (
+    'item_name', 'item_type', 'brand', 'product_code', 'serial_number', 'status_main',
+    'status_sub', 'number', 'holder_info', 'configuration', 'row',
+)
+
+
+def _posted_item_data(post, item_index):
+    """داده‌های یک کالا از فیلدهای فرم"""
+    item_data = {field: post.get(f'item_{item_index}_{field}', '').strip() for field in NEW_ITEM_FIELDS}
+    item_data['number'] = post.get(f'item_{item_index}_number', '1').strip()
+    return item_data
+
+
+def _entry_item_data(entry):
+    """داده‌های یک کالا از ردیف مقایسه ذخیره شده (مانند مقادیر فیلدهای فرم)"""
+    item_data = {}
+    for field in NEW_ITEM_FIELDS:
+        value = entry.data.get(field)
+        item_data[field] = '' if value is None else str(value).strip()
+    item_data['number'] = item_data['number'] or '1'
+    return item_data
+
+
+# تبدیل نوع کالا به مقادیر مدل
+ITEM_TYPE_MAPPING = {
+    'فنی': 'Technical',
+    'غیر فنی': 'Non-technical',
+    'Technical': 'Technical',
+    'Non-technical': 'Non-technical'
+}
+
+# تبدیل وضعیت اصلی
+STATUS_MAPPING = {
+    'سخت افزار': 'hardware',
+    'تحویل': 'Delivery', 
+    'انبار': 'warehouse',
+    'hardware': 'hardware',
+    'Delivery': 'Delivery',
+    'warehouse': 'warehouse'
+}
+
+# تبدیل زیر وضعیت
+SUB_STATUS_MAPPING = {
+    'تعمیر': 'repair',
+    'ارتقا': 'upgrade',
+    'ارجاع': 'external',
+    'داخل': 'internal',
+    'آماده بکار': 'ready',
+    'عودتی سالم': 'returned_good',
+    'عودتی فرسوده': 'returned_worn',
+    'repair': 'repair',
+    'upgrade': 'upgrade',
+    'external': 'external',
+    'internal': 'internal',
+    'ready': 'ready',
+    'returned_good': 'returned_good',
+    'returned_worn': 'returned_worn'
+}
+
+# حداکثر تعداد زوج نام / نام خانوادگی در هر کوئری جستجوی دارنده
+HOLDER_NAME_CHUNK_SIZE = 50
+
+
+class AddItemsResult:
+    """
+    نتیجه افزودن دسته‌ای کالاها
+
+    Attributes:
+        created_keys: کلید (اندیس فرم یا شناسه ردیف مقایسه) کالاهای اضافه شده
+        errors: متن خطاها به ترتیب ردیف‌ها
+        outcomes: نتیجه هر ردیف {'key', 'row', 'status': 'created' یا 'error', 'message'}
+    """
+
+    def __init__(self):
+        self.created_keys = []
+        self.errors = []
+        self.outcomes = []
+
+    def add_error(self, key, row, message):
+        self.errors.append(message)
+        self.outcomes.append({'key': key, 'row': row, 'status': 'error', 'message': message})
+
+    def add_created(self, key, row):
+        self.created_keys.append(key)
+        self.outcomes.append({'key': key, 'row': row, 'status': 'created', 'message': ''})
+
+
+def resolve_holders(holder_infos):
+    """
+    یافتن دارندگان همه ردیف‌ها با کوئری‌های دسته‌ای
+
+    شماره پرسنلی 9 رقمی مستقیماً و بقیه مقادیر بر اساس دو کلمه اول (نام و نام
+    خانوادگی) جستجو می‌شوند؛ برای هر مقدار اولین دارنده به ترتیب شماره پرسنلی
+    انتخاب می‌شود (معادل filter(...).first() برای هر ردیف).
+
+    Returns:
+        dict: متن دارنده -> PersonalInfo (فقط دارندگان یافت شده)
+    """
+    holder_infos = {holder_info for holder_info in holder_infos if holder_info}
+    numbers = {holder_info for holder_info in holder_infos if holder_info.isdigit() and len(holder_info) == 9}
+    holders = dict(PersonalInfo.objects.in_bulk(numbers))
+
+    # زوج (نام، نام خانوادگی) -> متن‌های دارنده
+    name_pairs = {}
+    for holder_info in holder_infos - numbers:
+        name_parts = holder_info.split()
+        if len(name_parts) >= 2:
+            name_pairs.setdefault((name_parts[0], name_parts[1]), []).append(holder_info)
+
+    for pairs in chunked(sorted(name_pairs), HOLDER_NAME_CHUNK_SIZE):
+        query = Q()
+        for first_name, last_name in pairs:
+            query |= Q(name__icontains=first_name, family__icontains=last_name)
+        candidates = list(PersonalInfo.objects.filter(query).order_by('pk'))
+        for pair in pairs:
+            first_name, last_name = pair[0].lower(), pair[1].lower()
+            person = next((
+                candidate for candidate in candidates
+                if first_name in candidate.name.lower() and last_name in candidate.family.lower()
+            ), None)
+            if person:
+                holders.update(dict.fromkeys(name_pairs[pair], person))
+    return holders
+
+
+def add_items_batch(selected_items):
+    """
+    افزودن دسته‌ای کالاهای جدید
+
+    دارندگان و شماره سریال‌های تکراری همه ردیف‌ها ابتدا یکجا خوانده می‌شوند، ردیف‌ها به
+    ترتیب (مانند ثبت تک‌تک، از جمله تکرار شماره سریال بین ردیف‌های انتخاب شده)
+    اعتبارسنجی و کالاهای معتبر با import_items به صورت دسته‌ای درج می‌شوند.
+
+    Args:
+        selected_items: لیست (کلید، داده‌های کالا با مقادیر متنی فیلدهای فرم)
+
+    Returns:
+        AddItemsResult
+    """
+    result = AddItemsResult()
+    holders = resolve_holders(item_data['holder_info'] for key, item_data in selected_items)
+    taken_serials = existing_values(Items.objects.all(), 'serial_number', [
+        item_data['serial_number'] for key, item_data in selected_items
+        if ITEM_TYPE_MAPPING.get(item_data['item_type'], 'Technical') == 'Technical'
+    ])
+
+    rows = []
+    pending = {}
+    for index, (key, item_data) in enumerate(selected_items):
+        row = item_data['row']
+
+        # اعتبارسنجی داده‌های ضروری
+        if not item_data['product_code']:
+            result.add_error(key, row, f"ردیف {row}: کد محصول الزامی است")
+            continue
+
+        model_item_type = ITEM_TYPE_MAPPING.get(item_data['item_type'], 'Technical')
+        model_status = STATUS_MAPPING.get(item_data['status_main'], 'warehouse')
+        model_sub_status = SUB_STATUS_MAPPING.get(item_data['status_sub'], None) if item_data['status_sub'] else None
+
+        # تبدیل تعداد به عدد
+        try:
+            number = int(item_data['number']) if item_data['number'] else 1
+        except ValueError:
+            number = 1
+
+        # بررسی تکراری بودن شماره سریال فقط برای کالاهای فنی (در سیستم و ردیف‌های قبلی)
+        serial_number = item_data['serial_number'] if model_item_type == 'Technical' else ''
+        if serial_number and serial_number in taken_serials:
+            result.add_error(key, row, f"ردیف {row}: شماره سریال '{serial_number}' قبلاً در سیستم موجود است")
+            continue
+
+        # اعتبارسنجی زیر وضعیت (مانند Items.clean)
+        if model_sub_status and model_sub_status not in [choice[0] for choice in Items.STATUS_SUB_MAPPING.get(model_status, [])]:
+            error = ValidationError({'status_sub_item': 'زیر مجموعه انتخاب‌شده معتبر نیست.'})
+            result.add_error(key, row, f"ردیف {row}: خطا در ذخیره - {str(error)}")
+            continue
+
+        if serial_number:
+            taken_serials.add(serial_number)
+
+        personal_info = holders.get(item_data['holder_info'])
+        rows.append({
+            'row_number': index,
+            'action_type': 'create',
+            'existing_item_id': None,
+            'data': {
+                'Technical_items': item_data['item_name'] or None,
+                'type_Item': model_item_type,
+                'brand': item_data['brand'] or None,
+                'Product_code': item_data['product_code'],
+                # برای کالاهای غیر فنی، شماره سریال همیشه None است
+                'serial_number': serial_number or None,
+                'status_item': model_status,
+                'status_sub_item': model_sub_status,
+                'Number': number,
+                'Configuration': item_data['configuration'] or None,
+                'PersonalInfo': personal_info.Personnel_number if personal_info else None,
+            },
+        })
+        pending[index] = (key, row)
+
+    import_errors = dict(import_items(rows).errors) if rows else {}
+    for index, (key, row) in pending.items():
+        if index in import_errors:
+            result.add_error(key, row, f"ردیف {row}: خطا در ذخیره - {import_errors[index]}")
+        else:
+            result.add_created(key, row)
+
+    # گزارش نتایج به ترتیب ردیف‌های انتخاب شده
+    order = {key: index for index, (key, item_data) in enumerate(selected_items)}
+    result.outcomes.sort(key=lambda outcome: order[outcome['key']])
+    result.errors = [outcome['message'] for outcome in result.outcomes if outcome['status'] == 'error']
+    return result
 
 
 @login_required
@@ -14,144 +238,51 @@ def add_selected_items(request):
         messages.error(request, 'روش درخواست نامعتبر است.')
         return redirect('account:import_excel')
 
-    selected_items = request.POST.getlist('selected_items')
+    # کالاهای یک مقایسه ذخیره شده با شناسه ردیف‌ها انتخاب می‌شوند؛ فیلدهای فرم فقط برای سازگاری با فرم‌های قبلی
+    run = None
+    run_id = request.POST.get('run_id')
+    if run_id:
+        try:
+            run = ComparisonRun.objects.filter(pk=uuid.UUID(run_id), user=request.user).first()
+        except ValueError:
+            pass
+        if run is None:
+            messages.error(request, 'نتیجه مقایسه یافت نشد.')
+            return redirect('account:import_excel')
+
+    if run is not None:
+        if request.POST.get('add_all'):
+            entries = new_item_entries(run)
+        else:
+            entries = new_item_entries(run, [value for value in request.POST.getlist('selected_items') if value.isdigit()])
+        selected_items = [(entry.pk, _entry_item_data(entry)) for entry in entries]
+    else:
+        selected_items = [(item_index, _posted_item_data(request.POST, item_index)) for item_index in request.POST.getlist('selected_items')]
     
     if not selected_items:
         messages.error(request, 'هیچ کالایی انتخاب نشده است.')
         return redirect('account:import_excel')
 
-    success_count = 0
-    error_count = 0
-    errors = []
+    is_ajax = request.headers.get('X-Requested-With') == 'XMLHttpRequest'
 
     try:
         with transaction.atomic():
-            for item_index in selected_items:
-                try:
-                    # دریافت داده‌های کالا از فرم
-                    item_data = {
-                        'item_name': request.POST.get(f'item_{item_index}_item_name', '').strip(),
-                        'item_type': request.POST.get(f'item_{item_index}_item_type', '').strip(),
-                        'brand': request.POST.get(f'item_{item_index}_brand', '').strip(),
-                        'product_code': request.POST.get(f'item_{item_index}_product_code', '').strip(),
-                        'serial_number': request.POST.get(f'item_{item_index}_serial_number', '').strip(),
-                        'status_main': request.POST.get(f'item_{item_index}_status_main', '').strip(),
-                        'status_sub': request.POST.get(f'item_{item_index}_status_sub', '').strip(),
-                        'number': request.POST.get(f'item_{item_index}_number', '1').strip(),
-                        'holder_info': request.POST.get(f'item_{item_index}_holder_info', '').strip(),
-                        'configuration': request.POST.get(f'item_{item_index}_configuration', '').strip(),
-                        'row': request.POST.get(f'item_{item_index}_row', '').strip(),
-                    }
-
-                    # اعتبارسنجی داده‌های ضروری
-                    if not item_data['product_code']:
-                        errors.append(f"ردیف {item_data['row']}: کد محصول الزامی است")
-                        error_count += 1
-                        continue
-
-                    # تبدیل نوع کالا به مقادیر مدل
-                    item_type_mapping = {
-                        'فنی': 'Technical',
-                        'غیر فنی': 'Non-technical',
-                        'Technical': 'Technical',
-                        'Non-technical': 'Non-technical'
-                    }
-                    
-                    model_item_type = item_type_mapping.get(item_data['item_type'], 'Technical')
-
-                    # تبدیل وضعیت اصلی
-                    status_mapping = {
-                        'سخت افزار': 'hardware',
-                        'تحویل': 'Delivery', 
-                        'انبار': 'warehouse',
-                        'hardware': 'hardware',
-                        'Delivery': 'Delivery',
-                        'warehouse': 'warehouse'
-                    }
-                    
-                    model_status = status_mapping.get(item_data['status_main'], 'warehouse')
-
-                    # تبدیل زیر وضعیت
-                    sub_status_mapping = {
-                        'تعمیر': 'repair',
-                        'ارتقا': 'upgrade',
-                        'ارجاع': 'external',
-                        'داخل': 'internal',
-                        'آماده بکار': 'ready',
-                        'عودتی سالم': 'returned_good',
-                        'عودتی فرسوده': 'returned_worn',
-                        'repair': 'repair',
-                        'upgrade': 'upgrade',
-                        'external': 'external',
-                        'internal': 'internal',
-                        'ready': 'ready',
-                        'returned_good': 'returned_good',
-                        'returned_worn': 'returned_worn'
-                    }
-                    
-                    model_sub_status = sub_status_mapping.get(item_data['status_sub'], None) if item_data['status_sub'] else None
-
-                    # تبدیل تعداد به عدد
-                    try:
-                        number = int(item_data['number']) if item_data['number'] else 1
-                    except ValueError:
-                        number = 1
-
-                    # یافتن دارنده حساب (اختیاری)
-                    personal_info = None
-                    if item_data['holder_info']:
-                        # جستجو بر اساس شماره پرسنلی یا نام
-                        try:
-                            # اگر شماره پرسنلی است (9 رقم)
-                            if item_data['holder_info'].isdigit() and len(item_data['holder_info']) == 9:
-                                personal_info = PersonalInfo.objects.get(Personnel_number=item_data['holder_info'])
-                            else:
-                                # جستجو بر اساس نام و نام خانوادگی
-                                name_parts = item_data['holder_info'].split()
-                                if len(name_parts) >= 2:
-                                    personal_info = PersonalInfo.objects.filter(
-                                        name__icontains=name_parts[0],
-                                        family__icontains=name_parts[1]
-                                    ).first()
-                        except PersonalInfo.DoesNotExist:
-                            pass
-
-                    # بررسی تکراری بودن شماره سریال فقط برای کالاهای فنی
-                    if item_data['serial_number'] and model_item_type == 'Technical':
-                        if Items.objects.filter(serial_number=item_data['serial_number']).exists():
-                            errors.append(f"ردیف {item_data['row']}: شماره سریال '{item_data['serial_number']}' قبلاً در سیستم موجود است")
-                            error_count += 1
-                            continue
-
-                    # ایجاد کالای جدید
-                    # برای کالاهای غیر فنی، شماره سریال همیشه None است
-                    serial_number_value = None
-                    if model_item_type == 'Technical' and item_data['serial_number']:
-                        serial_number_value = item_data['serial_number']
-                    
-                    new_item = Items(
-                        Technical_items=item_data['item_name'] or None,
-                        type_Item=model_item_type,
-                        brand=item_data['brand'] or None,
-                        Product_code=item_data['product_code'],
-                        serial_number=serial_number_value,
-                        status_item=model_status,
-                        status_sub_item=model_sub_status,
-                        Number=number,
-                        Configuration=item_data['configuration'] or None,
-                        PersonalInfo=personal_info
-                    )
-
-                    # ذخیره کالا
-                    new_item.save()
-                    success_count += 1
-
-                except Exception as e:
-                    error_count += 1
-                    row = item_data.get('row', item_index)
-                    errors.append(f"ردیف {row}: خطا در ذخیره - {str(e)}")
+            result = add_items_batch(selected_items)
+            if run is not None and result.created_keys:
+                ComparisonEntry.objects.filter(pk__in=result.created_keys).update(resolved=True)
+
+        if is_ajax:
+            return JsonResponse({
+                'success': True,
+                'success_count': len(result.created_keys),
+                'error_count': len(result.errors),
+                'rows': result.outcomes,
+            })
 
         # نمایش نتایج
+        success_count = len(result.created_keys)
+        error_count = len(result.errors)
+        errors = result.errors
         if success_count > 0:
             messages.success(request, f'{success_count} کالا با موفقیت به دیتابیس اضافه شد.')
         
@@ -164,8 +295,12 @@ def add_selected_items(request):
             messages.error(request, error_message)
 
     except Exception as e:
+        if is_ajax:
+            return JsonResponse({'success': False, 'message': f'خطای کلی در پردازش: {str(e)}'})
         messages.error(request, f'خطای کلی در پردازش: {str(e)}')
 
+    if run is not None:
+        return redirect(f"{reverse('account:comparison_run', args=[run.pk])}?category={ComparisonEntry.CATEGORY_NEW}")
     return redirect('account:import_excel')
 
 
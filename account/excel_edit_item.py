@@ -3,7 +3,10 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.http import JsonResponse
 from holder.models import Items, PersonalInfo, ItemChangeRequest
+from shared.approval_utils import new_transfer_group
+from .comparison_runs import difference_entry_for_item
 from .forms import ItemForm
+from .models import ComparisonEntry
 import json
 
 @login_required
@@ -58,6 +61,9 @@ def edit_item_from_comparison(request, item_id):
                         if new_owner:
                             description += f" به {new_owner.name} {new_owner.family}"
                         
+                        # شناسه مشترک درخواست‌های انتقال و دریافت
+                        transfer_group = new_transfer_group() if new_owner else None
+                        
                         # ایجاد درخواست برای مالک فعلی
                         ItemChangeRequest.objects.create(
                             item=original_obj,
@@ -65,7 +71,8 @@ def edit_item_from_comparison(request, item_id):
                             admin_user=request.user.username,
                             action_type=action_type,
                             proposed_changes=changes,
-                            description=description
+                            description=description,
+                            transfer_group=transfer_group
                         )
                         
                         if new_owner:
@@ -76,7 +83,8 @@ def edit_item_from_comparison(request, item_id):
                                 admin_user=request.user.username,
                                 action_type='receive',
                                 proposed_changes=changes,
-                                description=f"درخواست دریافت کالا {original_obj.Technical_items} توسط مدیر {request.user.username}"
+                                description=f"درخواست دریافت کالا {original_obj.Technical_items} توسط مدیر {request.user.username}",
+                                transfer_group=transfer_group
                             )
                             
                             message = (f"درخواست انتقال کالا {original_obj.Technical_items} "
@@ -215,15 +223,11 @@ def edit_item_from_comparison(request, item_id):
     else:
         form = ItemForm(instance=item)
     
-    # دریافت داده‌های Excel اگر در session موجود باشد
+    # داده‌های Excel این کالا از مقایسه مشخص شده در آدرس یا آخرین مقایسه کاربر
     excel_data = None
-    if 'comparison_excel_data' in request.session:
-        comparison_data = request.session['comparison_excel_data']
-        # پیدا کردن داده‌های Excel مربوط به این کالا
-        for diff_item in comparison_data.get('differences', []):
-            if diff_item['system_data']['id'] == item.id:
-                excel_data = diff_item['excel_data']
-                break
+    entry = difference_entry_for_item(request.user, item.id, request.GET.get('run'))
+    if entry is not None:
+        excel_data = entry.data['excel_data']
     
     context = {
         'form': form,
@@ -264,8 +268,14 @@ def apply_excel_data_to_item(request, item_id):
     item = get_object_or_404(Items, id=item_id)
     
     try:
-        # دریافت داده‌های Excel از درخواست
+        # دریافت داده‌های Excel از درخواست؛ با run_id از ردیف تفاوت مقایسه ذخیره شده خوانده می‌شوند
         excel_data = json.loads(request.body)
+        entry = None
+        if excel_data.get('run_id'):
+            entry = difference_entry_for_item(request.user, item.id, excel_data['run_id'])
+            if entry is None:
+                return JsonResponse({'success': False, 'message': 'این کالا در نتیجه مقایسه یافت نشد.'})
+            excel_data = entry.data['excel_data']
         
         # تبدیل داده‌های فارسی به انگلیسی
         def convert_persian_to_english(field_type, value):
@@ -356,6 +366,8 @@ def apply_excel_data_to_item(request, item_id):
         
         # ذخیره تغییرات
         item.save()
+        if entry is not None:
+            ComparisonEntry.objects.filter(pk=entry.pk).update(resolved=True)
         
         return JsonResponse({
             'success': True,
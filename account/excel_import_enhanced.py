@@ -1,10 +1,21 @@
-from django.shortcuts import render, redirect
+from django.shortcuts import get_object_or_404, render, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.core.paginator import Paginator
 from django.http import JsonResponse
+from django.urls import reverse
 from holder.models import Items, PersonalInfo
-import openpyxl
+from shared.bulk_lookup import lookup_first_by, existing_values
 import json
+from .excel_ingest import (
+    iter_excel_records, holder_personnel_number, parse_number,
+    to_item_type_code, to_status_main_code, to_status_sub_code,
+)
+from .import_staging import (
+    stage_import, import_batch_summary, import_review_page_size, people_options,
+    save_review_page, apply_import_batch,
+)
+from .models import ImportBatch
 
 @login_required
 def process_excel_enhanced(request):
@@ -25,162 +36,73 @@ def process_excel_enhanced(request):
         return redirect('account:import_excel')
     
     try:
-        # خواندن فایل Excel
-        wb = openpyxl.load_workbook(excel_file)
-        ws = wb.active
-        
         # لیست برای ذخیره داده‌های پردازش شده
         processed_items = []
         errors = []
         
-        # خواندن هدرها از ردیف اول
-        headers = []
-        header_row = next(ws.iter_rows(min_row=1, max_row=1, values_only=True), None)
-        if header_row:
-            headers = [str(cell).strip() if cell else '' for cell in header_row]
-        
-        # تعریف نقشه‌برداری هدرها به فیلدهای مدل
-        header_mapping = {
-            # نام کالا
-            'نام کالا': 'item_name',
-            'نام': 'item_name',
-            'کالا': 'item_name',
-            'Technical_items': 'item_name',
-            
-            # نوع کالا
-            'نوع کالا': 'item_type',
-            'نوع': 'item_type',
-            'type_Item': 'item_type',
-            
-            # برند
-            'برند': 'brand',
-            'brand': 'brand',
-            
-            # پیکربندی
-            'پیکربندی': 'configuration',
-            'Configuration': 'configuration',
-            'تنظیمات': 'configuration',
-            
-            # وضعیت اصلی
-            'وضعیت کالا': 'status_main',
-            'وضعیت اصلی': 'status_main',
-            'وضعیت': 'status_main',
-            'status_item': 'status_main',
-            
-            # زیر وضعیت
-            'زیر وضعیت': 'status_sub',
-            'زیرمجموعه وضعیت': 'status_sub',
-            'status_sub_item': 'status_sub',
-            
-            # شماره سریال
-            'شماره سریال': 'serial_number',
-            'سریال': 'serial_number',
-            'serial_number': 'serial_number',
-            
-            # کد محصول
-            'کد محصول': 'product_code',
-            'کد کالا': 'product_code',
-            'کد': 'product_code',
-            'Product_code': 'product_code',
-            
-            # دارنده
-            'دارنده': 'holder_info',
-            'دارنده حساب': 'holder_info',
-            'PersonalInfo': 'holder_info',
-            'شخص': 'holder_info',
-            
-            # تعداد
-            'تعداد': 'number',
-            'تعداد کالا': 'number',
-            'Number': 'number'
-        }
-        
-        # ایجاد نقشه ایندکس ستون‌ها
-        column_indices = {}
-        for i, header in enumerate(headers):
-            if header in header_mapping:
-                column_indices[header_mapping[header]] = i
+        # مرحله اول: خواندن جریانی ردیف‌ها و جمع‌آوری سریال‌ها، کدهای محصول و شماره‌های پرسنلی
+        parsed_rows = []
+        serial_numbers = set()
+        product_codes = set()
+        personnel_numbers = set()
         
-        # خواندن داده‌ها از ردیف دوم (ردیف اول هدر است)
-        for row_num, row in enumerate(ws.iter_rows(min_row=2, values_only=True), start=2):
-            if not any(row):  # اگر ردیف خالی باشد
-                continue
-                
+        for row_num, values in iter_excel_records(excel_file):
             try:
-                # استخراج داده‌ها بر اساس نقشه ستون‌ها
-                def get_cell_value(field_name):
-                    """دریافت مقدار سلول بر اساس نام فیلد"""
-                    if field_name in column_indices:
-                        index = column_indices[field_name]
-                        if index < len(row):
-                            value = row[index]
-                            # تبدیل مقادیر خالی به None
-                            if value is None or str(value).strip() == '':
-                                return None
-                            return str(value).strip()
-                    return None
+                # کالای موجود بر اساس شماره سریال یا (در نبود سریال) کد محصول پیدا می‌شود
+                if values['serial_number']:
+                    serial_numbers.add(values['serial_number'])
+                elif values['product_code']:
+                    product_codes.add(values['product_code'])
                 
-                item_name = get_cell_value('item_name')
-                item_type = get_cell_value('item_type')
-                brand = get_cell_value('brand')
-                configuration = get_cell_value('configuration')
-                status_main = get_cell_value('status_main')
-                status_sub = get_cell_value('status_sub')
-                serial_number = get_cell_value('serial_number')
-                product_code = get_cell_value('product_code')
-                holder_info = get_cell_value('holder_info')
-                number = get_cell_value('number')
+                # استخراج شماره پرسنلی دارنده از داخل پرانتز
+                values['personnel_number'] = holder_personnel_number(values['holder_info'])
+                if values['personnel_number']:
+                    personnel_numbers.add(values['personnel_number'])
                 
-                # تبدیل نوع کالا از فارسی به انگلیسی
-                type_mapping = {
-                    'فنی': 'Technical',
-                    'غیر فنی': 'Non-technical'
-                }
-                item_type_en = type_mapping.get(item_type, 'Technical')
+                parsed_rows.append((row_num, values))
                 
-                # تبدیل وضعیت اصلی از فارسی به انگلیسی
-                status_main_mapping = {
-                    'سخت افزار (تعمیری)': 'hardware',
-                    'تعمیری': 'hardware',
-                    'سخت افزار': 'hardware',
-                    'تحویل': 'Delivery',
-                    'انبار': 'warehouse'
-                }
-                status_main_en = status_main_mapping.get(status_main, 'warehouse')
+            except Exception as e:
+                errors.append(f'خطا در ردیف {row_num}: {str(e)}')
+        
+        # مرحله دوم: دریافت کالاها و افراد موجود با چند کوئری __in به جای کوئری برای هر ردیف
+        item_fields = ['id', 'Technical_items']
+        items_by_serial = lookup_first_by(Items.objects.all(), 'serial_number', serial_numbers, item_fields)
+        items_by_code = lookup_first_by(Items.objects.all(), 'Product_code', product_codes, item_fields)
+        existing_personnel_numbers = existing_values(PersonalInfo.objects.all(), 'Personnel_number', personnel_numbers)
+        
+        for row_num, values in parsed_rows:
+            try:
+                item_name = values['item_name']
+                item_type = values['item_type']
+                brand = values['brand']
+                configuration = values['configuration']
+                status_main = values['status_main']
+                status_sub = values['status_sub']
+                serial_number = values['serial_number']
+                product_code = values['product_code']
+                holder_info = values['holder_info']
+                number = values['number']
                 
-                # تبدیل زیر وضعیت از فارسی به انگلیسی
-                status_sub_mapping = {
-                    'تعمیر': 'repair',
-                    'ارتقا': 'upgrade',
-                    'خارج': 'external',
-                    'داخل': 'internal',
-                    'آماده بکار': 'ready',
-                    'عودتی سالم': 'returned_good',
-                    'عودتی فرسوده': 'returned_worn'
-                }
-                status_sub_en = status_sub_mapping.get(status_sub, None) if status_sub else None
+                item_type_en = to_item_type_code(item_type)
+                status_main_en = to_status_main_code(status_main)
+                status_sub_en = to_status_sub_code(status_sub) if status_sub else None
                 
                 # بررسی وجود کالا بر اساس شماره سریال یا کد محصول
                 existing_item = None
                 action_type = 'create'
                 
                 if serial_number:
-                    existing_item = Items.objects.filter(serial_number=serial_number).first()
+                    existing_item = items_by_serial.get(serial_number)
                 elif product_code:
-                    existing_item = Items.objects.filter(Product_code=product_code).first()
+                    existing_item = items_by_code.get(product_code)
                 
                 if existing_item:
                     action_type = 'update'
                 
                 # پردازش اطلاعات دارنده
-                personal_info = None
-                if holder_info and holder_info != 'بدون دارنده':
-                    # استخراج شماره پرسنلی از داخل پرانتز
-                    import re
-                    personnel_match = re.search(r'\((\d+)\)', str(holder_info))
-                    if personnel_match:
-                        personnel_number = personnel_match.group(1)
-                        personal_info = PersonalInfo.objects.filter(Personnel_number=personnel_number).first()
+                personnel_number = values['personnel_number']
+                if personnel_number not in existing_personnel_numbers:
+                    personnel_number = None
                 
                 # ایجاد ساختار داده با فیلدهای قابل تأیید جداگانه
                 field_confirmations = {
@@ -259,16 +181,16 @@ def process_excel_enhanced(request):
                         'type': 'text'
                     },
                     'PersonalInfo': {
-                        'value': personal_info.Personnel_number if personal_info else None,
+                        'value': personnel_number,
                         'display': holder_info or 'بدون دارنده',
-                        'confirmed': bool(personal_info),
+                        'confirmed': bool(personnel_number),
                         'required': False,
                         'label': 'دارنده حساب',
                         'type': 'select',
                         'options': []  # Will be populated with all PersonalInfo
                     },
                     'Number': {
-                        'value': int(number) if number and str(number).isdigit() else 1,
+                        'value': parse_number(number),
                         'display': number or '1',
                         'confirmed': bool(number),
                         'required': False,
@@ -298,8 +220,8 @@ def process_excel_enhanced(request):
                 processed_item = {
                     'row_number': row_num,
                     'action_type': action_type,
-                    'existing_item_id': existing_item.id if existing_item else None,
-                    'existing_item_name': existing_item.Technical_items if existing_item else None,
+                    'existing_item_id': existing_item['id'] if existing_item else None,
+                    'existing_item_name': existing_item['Technical_items'] if existing_item else None,
                     'field_confirmations': field_confirmations,
                     'has_warnings': any(not field['confirmed'] and field['value'] for field in field_confirmations.values()),
                     'has_errors': any(not field['value'] and field['required'] for field in field_confirmations.values())
@@ -318,104 +240,79 @@ def process_excel_enhanced(request):
             messages.warning(request, 'هیچ داده معتبری در فایل یافت نشد.')
             return redirect('account:import_excel')
         
-        # دریافت تمام افراد برای انتخاب دارنده
-        all_people = PersonalInfo.objects.all().order_by('name', 'family')
-        people_options = [{'value': '', 'label': 'بدون دارنده'}]
-        for person in all_people:
-            people_options.append({
-                'value': person.Personnel_number,
-                'label': f"{person.name} {person.family} ({person.Personnel_number})"
-            })
-        
-        # اضافه کردن گزینه‌های افراد به همه آیتم‌ها
-        for item in processed_items:
-            item['field_confirmations']['PersonalInfo']['options'] = people_options
-        
-        # ذخیره داده‌ها در session برای مرحله تأیید
-        request.session['import_data'] = processed_items
-        
-        context = {
-            'processed_items': processed_items,
-            'total_items': len(processed_items),
-            'create_count': len([item for item in processed_items if item['action_type'] == 'create']),
-            'update_count': len([item for item in processed_items if item['action_type'] == 'update']),
-            'warning_count': len([item for item in processed_items if item['has_warnings']]),
-            'error_count': len([item for item in processed_items if item['has_errors']])
-        }
-        
-        return render(request, 'registration/confirm_import_enhanced.html', context)
+        # ذخیره ردیف‌ها در جدول موقت ورود (به جای session) و انتقال به صفحه تأیید
+        batch = stage_import(request.user, excel_file.name, processed_items)
+        return redirect('account:import_batch', batch_id=batch.pk)
         
     except Exception as e:
         messages.error(request, f'خطا در پردازش فایل: {str(e)}')
         return redirect('account:import_excel')
 
+def _pending_batch_or_redirect(request, batch_id):
+    """دسته ورود در انتظار کاربر، یا پاسخ انتقال اگر قبلاً اعمال شده باشد"""
+    batch = get_object_or_404(ImportBatch, pk=batch_id, user=request.user)
+    if batch.status != ImportBatch.STATUS_PENDING:
+        messages.info(request, 'این دسته ورود قبلاً اعمال شده است.')
+        return batch, redirect('account:import_excel')
+    return batch, None
+
+@login_required
+def review_import_batch(request, batch_id):
+    """نمایش صفحه‌بندی شده ردیف‌های دسته ورود برای تأیید فیلد به فیلد"""
+    batch, response = _pending_batch_or_redirect(request, batch_id)
+    if response:
+        return response
+    
+    paginator = Paginator(batch.rows.order_by('row_number'), import_review_page_size())
+    page_obj = paginator.get_page(request.GET.get('page'))
+    
+    # گزینه‌های دارنده یک بار ساخته و فقط به ردیف‌های همین صفحه اضافه می‌شوند
+    options = people_options()
+    for row in page_obj:
+        row.field_confirmations['PersonalInfo']['options'] = options
+    
+    context = {
+        'batch': batch,
+        'processed_items': page_obj,
+        'page_obj': page_obj,
+        'paginator': paginator,
+        'is_paginated': page_obj.has_other_pages(),
+    }
+    context.update(import_batch_summary(batch))
+    return render(request, 'registration/confirm_import_enhanced.html', context)
+
 @login_required
-def confirm_import_enhanced(request):
-    """تأیید و اعمال تغییرات با تأیید فیلد به فیلد"""
+def confirm_import_enhanced(request, batch_id):
+    """ذخیره ویرایش‌های صفحه جاری و در صورت درخواست، اعمال تغییرات دسته ورود"""
     if request.method != 'POST':
         messages.error(request, 'روش درخواست نامعتبر است.')
         return redirect('account:home')
     
-    import_data = request.session.get('import_data')
-    if not import_data:
-        messages.error(request, 'داده‌های وارداتی یافت نشد.')
-        return redirect('account:import_excel')
-    
-    # دریافت داده‌های فرم
-    confirmed_items = request.POST.getlist('confirmed_items')
+    batch, response = _pending_batch_or_redirect(request, batch_id)
+    if response:
+        return response
     
-    success_count = 0
-    error_count = 0
+    save_review_page(batch, request.POST)
     
-    for item_data in import_data:
-        row_number = str(item_data['row_number'])
-        
-        if row_number in confirmed_items:
-            try:
-                # جمع‌آوری داده‌های تأیید شده از فرم
-                confirmed_data = {}
-                
-                for field_name, field_info in item_data['field_confirmations'].items():
-                    form_field_name = f"field_{row_number}_{field_name}"
-                    
-                    if form_field_name in request.POST:
-                        value = request.POST[form_field_name]
-                        
-                        # پردازش مقادیر خاص
-                        if field_name == 'PersonalInfo':
-                            if value:
-                                try:
-                                    personal_info = PersonalInfo.objects.get(Personnel_number=value)
-                                    confirmed_data['PersonalInfo'] = personal_info
-                                except PersonalInfo.DoesNotExist:
-                                    confirmed_data['PersonalInfo'] = None
-                            else:
-                                confirmed_data['PersonalInfo'] = None
-                        elif value:  # فقط مقادیر غیر خالی
-                            confirmed_data[field_name] = value
-                
-                if item_data['action_type'] == 'create':
-                    # ایجاد کالای جدید
-                    Items.objects.create(**confirmed_data)
-                    success_count += 1
-                    
-                elif item_data['action_type'] == 'update':
-                    # دریافت کالای موجود و به‌روزرسانی
-                    existing_item = Items.objects.get(id=item_data['existing_item_id'])
-                    
-                    for key, value in confirmed_data.items():
-                        setattr(existing_item, key, value)
-                    
-                    existing_item.save()
-                    success_count += 1
-                    
-            except Exception as e:
-                error_count += 1
-                messages.error(request, f'خطا در پردازش ردیف {row_number}: {str(e)}')
+    # جابجایی بین صفحات بدون اعمال تغییرات
+    if 'goto_page' in request.POST:
+        goto_page = request.POST['goto_page']
+        page = goto_page if goto_page.isdigit() else 1
+        return redirect(f"{reverse('account:import_batch', args=[batch.pk])}?page={page}")
     
-    # پاک کردن داده‌ها از session
-    if 'import_data' in request.session:
-        del request.session['import_data']
+    try:
+        result = apply_import_batch(batch)
+        if result is None:
+            messages.info(request, 'این دسته ورود قبلاً اعمال شده است.')
+            return redirect('account:import_excel')
+        success_count = result.success_count
+        error_count = len(result.errors)
+        for row_number, error in result.errors:
+            messages.error(request, f'خطا در پردازش ردیف {row_number}: {error}')
+    except Exception as e:
+        success_count = 0
+        error_count = batch.rows.filter(selected=True).count()
+        messages.error(request, f'خطا در ثبت داده‌ها: {str(e)}')
     
     if success_count > 0:
         messages.success(request, f'{success_count} مورد با موفقیت پردازش شد.')
@@ -425,6 +322,18 @@ def confirm_import_enhanced(request):
     
     return redirect('account:home')
 
+@login_required
+def discard_import_batch(request, batch_id):
+    """حذف دسته ورود در انتظار"""
+    if request.method != 'POST':
+        messages.error(request, 'روش درخواست نامعتبر است.')
+        return redirect('account:import_excel')
+    
+    batch = get_object_or_404(ImportBatch, pk=batch_id, user=request.user, status=ImportBatch.STATUS_PENDING)
+    batch.delete()
+    messages.success(request, 'دسته ورود حذف شد.')
+    return redirect('account:import_excel')
+
 @login_required
 def get_sub_status_options(request):
     """دریافت گزینه‌های زیر وضعیت بر اساس وضعیت اصلی"""
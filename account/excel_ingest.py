@@ -0,0 +1,234 @@
+"""
+خواندن مشترک فایل‌های Excel ورودی (ورود کالاها و مقایسه با سیستم)
+
+فایل در حالت read_only باز می‌شود تا ردیف‌ها به صورت جریانی از فایل خوانده شوند
+و حافظه مصرفی به اندازه شیت وابسته نباشد. نقشه هدرها یک بار به اندیس ستون‌ها
+کامپایل می‌شود و برای هر ردیف فقط یک دیکشنری با مقادیر نرمال‌شده ساخته می‌شود.
+"""
+
+import re
+
+import openpyxl
+
+# متن هدر -> کلید فیلد در رکوردهای خروجی
+HEADER_ALIASES = {
+    # نام کالا
+    'نام کالا': 'item_name',
+    'نام': 'item_name',
+    'کالا': 'item_name',
+    'Technical_items': 'item_name',
+
+    # نوع کالا
+    'نوع کالا': 'item_type',
+    'نوع': 'item_type',
+    'type_Item': 'item_type',
+
+    # برند
+    'برند': 'brand',
+    'brand': 'brand',
+
+    # پیکربندی
+    'پیکربندی': 'configuration',
+    'Configuration': 'configuration',
+    'تنظیمات': 'configuration',
+
+    # وضعیت اصلی
+    'وضعیت کالا': 'status_main',
+    'وضعیت اصلی': 'status_main',
+    'وضعیت': 'status_main',
+    'status_item': 'status_main',
+
+    # زیر وضعیت
+    'زیر وضعیت': 'status_sub',
+    'زیرمجموعه وضعیت': 'status_sub',
+    'status_sub_item': 'status_sub',
+
+    # شماره سریال
+    'شماره سریال': 'serial_number',
+    'سریال': 'serial_number',
+    'serial_number': 'serial_number',
+
+    # کد محصول
+    'کد محصول': 'product_code',
+    'کد کالا': 'product_code',
+    'کد': 'product_code',
+    'Product_code': 'product_code',
+
+    # دارنده
+    'دارنده': 'holder_info',
+    'دارنده حساب': 'holder_info',
+    'PersonalInfo': 'holder_info',
+    'شخص': 'holder_info',
+
+    # تعداد
+    'تعداد': 'number',
+    'تعداد کالا': 'number',
+    'Number': 'number',
+}
+
+# کلید فیلدهای رکوردهای کالا
+ITEM_RECORD_FIELDS = (
+    'item_name', 'item_type', 'brand', 'configuration', 'status_main',
+    'status_sub', 'serial_number', 'product_code', 'holder_info', 'number',
+)
+
+# تبدیل برچسب‌های فارسی به کد گزینه‌های مدل
+ITEM_TYPE_CODES = {
+    'فنی': 'Technical',
+    'غیر فنی': 'Non-technical',
+}
+
+STATUS_MAIN_CODES = {
+    'سخت افزار (تعمیری)': 'hardware',
+    'تعمیری': 'hardware',
+    'سخت افزار': 'hardware',
+    'تحویل': 'Delivery',
+    'انبار': 'warehouse',
+}
+
+STATUS_SUB_CODES = {
+    'تعمیر': 'repair',
+    'ارتقا': 'upgrade',
+    'خارج': 'external',
+    'داخل': 'internal',
+    'آماده بکار': 'ready',
+    'عودتی سالم': 'returned_good',
+    'عودتی فرسوده': 'returned_worn',
+}
+
+# تبدیل مقادیر فایل (کد یا برچسب) به نمایش فارسی برای مقایسه
+ITEM_TYPE_LABELS = {
+    'Technical': 'فنی',
+    'Non-technical': 'غیر فنی',
+    'فنی': 'فنی',
+    'غیر فنی': 'غیر فنی',
+}
+
+STATUS_MAIN_LABELS = {
+    'hardware': 'سخت افزار',
+    'Delivery': 'تحویل',
+    'warehouse': 'انبار',
+    'سخت افزار ': 'سخت افزار',
+    'تحویل': 'تحویل',
+    'انبار': 'انبار',
+}
+
+STATUS_SUB_LABELS = {
+    **{code: label for label, code in STATUS_SUB_CODES.items()},
+    **{label: label for label in STATUS_SUB_CODES},
+}
+
+# شماره پرسنلی داخل پرانتز در متن دارنده، مثلاً «علی رضایی (123456789)»
+PERSONNEL_NUMBER_RE = re.compile(r'\((\d+)\)')
+
+NO_HOLDER_LABEL = 'بدون دارنده'
+
+
+def clean_cell(value):
+    """مقدار متنی سلول بدون فاصله‌های ابتدا و انتها (None برای سلول خالی)"""
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def choice_converter(mapping, default=None):
+    """تابع تبدیل برچسب به کد گزینه (default برای مقادیر ناشناخته)"""
+    def convert(value):
+        return mapping.get(value, default)
+    return convert
+
+
+def display_converter(mapping):
+    """تابع تبدیل مقدار به نمایش فارسی (مقادیر ناشناخته بدون تغییر باقی می‌مانند)"""
+    def convert(value):
+        if not value:
+            return value
+        return mapping.get(value, value)
+    return convert
+
+
+to_item_type_code = choice_converter(ITEM_TYPE_CODES, 'Technical')
+to_status_main_code = choice_converter(STATUS_MAIN_CODES, 'warehouse')
+to_status_sub_code = choice_converter(STATUS_SUB_CODES)
+to_item_type_label = display_converter(ITEM_TYPE_LABELS)
+to_status_main_label = display_converter(STATUS_MAIN_LABELS)
+to_status_sub_label = display_converter(STATUS_SUB_LABELS)
+
+
+def parse_number(value):
+    """تعداد کالا (پیش‌فرض 1 برای مقادیر خالی یا غیر عددی)"""
+    return int(value) if value and str(value).isdigit() else 1
+
+
+def holder_personnel_number(holder_info):
+    """شماره پرسنلی داخل متن دارنده یا None"""
+    if not holder_info or holder_info == NO_HOLDER_LABEL:
+        return None
+    match = PERSONNEL_NUMBER_RE.search(str(holder_info))
+    return match.group(1) if match else None
+
+
+class ColumnMap:
+    """
+    نقشه کامپایل شده ستون‌ها
+
+    Attributes:
+        indices: کلید فیلد -> اندیس ستون
+    """
+
+    def __init__(self, indices, fields=ITEM_RECORD_FIELDS, convert=clean_cell):
+        self.indices = dict(indices)
+        self.fields = tuple(fields)
+        self._columns = tuple((field, self.indices.get(field)) for field in self.fields)
+        self._convert = convert
+
+    @classmethod
+    def from_headers(cls, header_row, aliases=HEADER_ALIASES, fields=ITEM_RECORD_FIELDS):
+        """ساخت نقشه از ردیف هدر؛ در صورت تکرار یک فیلد، آخرین ستون استفاده می‌شود"""
+        indices = {}
+        for index, header in enumerate(header_row or ()):
+            field = aliases.get(str(header).strip() if header else '')
+            if field:
+                indices[field] = index
+        return cls(indices, fields)
+
+    def record(self, row):
+        """رکورد یک ردیف: کلید فیلد -> مقدار (None برای ستون‌های نبود یا خالی)"""
+        convert = self._convert
+        size = len(row)
+        record = {}
+        for field, index in self._columns:
+            if index is None or index >= size:
+                record[field] = None
+            else:
+                record[field] = convert(row[index]) if convert else row[index]
+        return record
+
+
+def iter_excel_records(excel_file, column_map=None, min_row=2):
+    """
+    خواندن جریانی ردیف‌های شیت فعال
+
+    Args:
+        excel_file: فایل Excel (مسیر یا فایل آپلود شده)
+        column_map: ColumnMap ثابت؛ در صورت None از ردیف اول (هدرها) ساخته می‌شود
+        min_row: اولین ردیف داده
+
+    Yields:
+        tuple: (شماره ردیف، رکورد) برای ردیف‌های غیر خالی
+    """
+    wb = openpyxl.load_workbook(excel_file, read_only=True)
+    try:
+        ws = wb.active
+        if column_map is None:
+            header_row = next(ws.iter_rows(min_row=1, max_row=1, values_only=True), None)
+            column_map = ColumnMap.from_headers(header_row)
+
+        for row_num, row in enumerate(ws.iter_rows(min_row=min_row, values_only=True), start=min_row):
+            if not any(row):  # اگر ردیف خالی باشد
+                continue
+            yield row_num, column_map.record(row)
+    finally:
+        # در حالت read_only فایل تا بستن workbook باز می‌ماند
+        wb.close()
@@ -0,0 +1,194 @@
+"""
+ساخت فایل Excel خروجی کالاها با workbook حالت write-only
+
+ردیف‌ها هنگام افزودن مستقیماً در فایل مقصد نوشته می‌شوند و استایل‌ها به صورت
+NamedStyle در زمان نوشتن اعمال می‌شوند؛ بنابراین مصرف حافظه به تعداد ردیف‌ها وابسته نیست.
+"""
+
+from datetime import datetime
+
+import openpyxl
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font, NamedStyle, PatternFill
+from openpyxl.utils import get_column_letter
+
+from holder.models import Items
+from shared.item_filters import apply_item_filters
+from .export_columns import compile_columns
+
+EXCEL_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# تعداد ردیف‌های خوانده شده از پایگاه داده در هر مرحله
+EXPORT_CHUNK_SIZE = 2000
+
+# تعریف تمام فیلدهای ممکن خروجی Excel (به ترتیب ستون‌ها)
+EXCEL_EXPORT_FIELDS = {
+    'row_number': {'header': 'ردیف', 'width': 8},
+    'name': {'header': 'نام کالا', 'width': 25},
+    'type': {'header': 'نوع کالا', 'width': 15},
+    'brand': {'header': 'برند', 'width': 15},
+    'configuration': {'header': 'پیکربندی', 'width': 30},
+    'status': {'header': 'وضعیت کالا', 'width': 15},
+    'sub_status': {'header': 'زیر وضعیت', 'width': 15},
+    'serial': {'header': 'شماره سریال', 'width': 20},
+    'product_code': {'header': 'کد محصول', 'width': 15},
+    'holder': {'header': 'دارنده حساب', 'width': 25},
+    'register_date': {'header': 'تاریخ ثبت', 'width': 20},
+    'update_date': {'header': 'تاریخ بروزرسانی', 'width': 20},
+}
+
+HEADER_STYLE_NAME = 'items_header'
+BODY_STYLE_NAME = 'items_body'
+
+
+def add_export_styles(workbook):
+    """ثبت استایل‌های هدر و داده در workbook"""
+    header_style = NamedStyle(name=HEADER_STYLE_NAME)
+    header_style.font = Font(bold=True, color="FFFFFF")
+    header_style.fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+    header_style.alignment = Alignment(horizontal="center", vertical="center")
+    workbook.add_named_style(header_style)
+
+    body_style = NamedStyle(name=BODY_STYLE_NAME)
+    body_style.alignment = Alignment(horizontal="center", vertical="center")
+    workbook.add_named_style(body_style)
+
+
+def write_items_workbook(target, columns, rows, title="لیست کالاها"):
+    """
+    نوشتن فایل Excel با workbook حالت write-only
+
+    Args:
+        target: مسیر یا فایل باینری مقصد
+        columns: لیست تاپل‌های (عنوان ستون، عرض ستون)
+        rows: iterable از ردیف‌ها (هر ردیف دنباله‌ای از مقادیر به ترتیب ستون‌ها)
+        title: نام worksheet
+
+    Returns:
+        int: تعداد ردیف‌های داده نوشته شده
+    """
+    workbook = openpyxl.Workbook(write_only=True)
+    add_export_styles(workbook)
+    worksheet = workbook.create_sheet(title)
+
+    # تنظیم RTL (راست به چپ) برای worksheet
+    worksheet.sheet_view.rightToLeft = True
+
+    # عرض ستون‌ها باید پیش از نوشتن اولین ردیف تنظیم شود
+    for index, (header, width) in enumerate(columns, 1):
+        worksheet.column_dimensions[get_column_letter(index)].width = width
+
+    header_cells = []
+    for header, width in columns:
+        cell = WriteOnlyCell(worksheet, value=header)
+        cell.style = HEADER_STYLE_NAME
+        header_cells.append(cell)
+    worksheet.append(header_cells)
+
+    # هر ردیف هنگام append نوشته می‌شود، پس سلول‌های استایل‌دار هر ستون قابل استفاده مجدد هستند
+    body_cells = []
+    for column in columns:
+        cell = WriteOnlyCell(worksheet)
+        cell.style = BODY_STYLE_NAME
+        body_cells.append(cell)
+
+    row_count = 0
+    for values in rows:
+        for cell, value in zip(body_cells, values):
+            cell.value = value
+        worksheet.append(body_cells)
+        row_count += 1
+
+    workbook.save(target)
+    return row_count
+
+
+def excel_export_filename(params):
+    """
+    نام فایل خروجی Excel بر اساس فیلترهای اعمال شده
+
+    Args:
+        params: دیکشنری پارامترهای فیلتر (request.GET، request.POST یا پارامترهای ذخیره شده)
+    """
+    current_time = datetime.now().strftime('%Y%m%d_%H%M%S')
+    filename_parts = ['کالاها']
+
+    # اضافه کردن فیلترها به نام فایل
+    if params.get('search'):
+        filename_parts.append(f"نام_{params.get('search')}")
+    if params.get('brand_search'):
+        filename_parts.append(f"برند_{params.get('brand_search')}")
+    if params.get('serial_search'):
+        filename_parts.append(f"سریال_{params.get('serial_search')}")
+    if params.get('code_search'):
+        filename_parts.append(f"کد_{params.get('code_search')}")
+    if params.get('holder_search'):
+        filename_parts.append(f"دارنده_{params.get('holder_search')}")
+
+    type_filter = params.get('type_filter')
+    if type_filter:
+        type_name = 'فنی' if type_filter == 'Technical' else 'غیرفنی'
+        filename_parts.append(f'نوع_{type_name}')
+
+    status_filter = params.get('status_filter')
+    if status_filter:
+        status_names = {
+            'hardware': 'سخت_افزار',
+            'Delivery': 'تحویل',
+            'warehouse': 'انبار'
+        }
+        filename_parts.append(f'وضعیت_{status_names.get(status_filter, status_filter)}')
+
+    sub_status_filter = params.get('sub_status_filter')
+    if sub_status_filter:
+        sub_status_names = {
+            'repair': 'تعمیر',
+            'upgrade': 'ارتقا',
+            'external': 'خارج',
+            'internal': 'داخل',
+            'ready': 'آماده_بکار',
+            'returned_good': 'عودتی_سالم',
+            'returned_worn': 'عودتی_فرسوده'
+        }
+        filename_parts.append(f'زیروضعیت_{sub_status_names.get(sub_status_filter, sub_status_filter)}')
+
+    filename_parts.append(current_time)
+    return '_'.join(filename_parts) + '.xlsx'
+
+
+def excel_export_columns(selected_fields=None):
+    """
+    ستون‌های خروجی Excel
+
+    Args:
+        selected_fields: کلید فیلدهای انتخاب شده (None برای همه فیلدها)
+
+    Returns:
+        tuple: (لیست (عنوان، عرض) ستون‌ها، لیست کلید فیلدها)
+    """
+    if selected_fields is None:
+        selected_fields = list(EXCEL_EXPORT_FIELDS)
+    field_keys = [field for field in selected_fields if field in EXCEL_EXPORT_FIELDS]
+    columns = [(EXCEL_EXPORT_FIELDS[field]['header'], EXCEL_EXPORT_FIELDS[field]['width']) for field in field_keys]
+    return columns, field_keys
+
+
+def build_excel_export(target, params, selected_fields=None, progress=None):
+    """
+    ساخت فایل Excel لیست کالاها با فیلترها و فیلدهای داده شده
+
+    Args:
+        target: مسیر یا فایل باینری مقصد
+        params: دیکشنری پارامترهای فیلتر
+        selected_fields: کلید فیلدهای انتخاب شده (None برای همه فیلدها)
+        progress: تابع اختیاری گزارش تعداد ردیف‌های نوشته شده
+
+    Returns:
+        int: تعداد ردیف‌های داده نوشته شده
+    """
+    queryset = apply_item_filters(Items.objects.all(), params)
+    columns, field_keys = excel_export_columns(selected_fields)
+
+    # ردیف‌ها هنگام نوشتن فایل به صورت دسته‌ای و فقط با ستون‌های لازم خوانده می‌شوند
+    rows = compile_columns(field_keys).iter_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE, progress=progress)
+    return write_items_workbook(target, columns, rows)
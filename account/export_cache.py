@@ -0,0 +1,159 @@
+"""
+ذخیره فایل‌های خروجی Excel / PDF روی دیسک بر اساس اثر انگشت فیلترها
+
+کلید هر فایل، hash نوع خروجی، فیلترهای نرمال‌شده و فیلدهای انتخاب شده است و
+نسخه داده‌های موجودی (holder.versioning) در نام فایل قرار می‌گیرد؛ با هر تغییر در
+کالاها یا دارندگان، نسخه افزایش یافته و فایل‌های قبلی دیگر استفاده نمی‌شوند.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+from django.conf import settings
+from django.http import FileResponse
+
+from holder.versioning import get_data_version
+from shared.item_filters import item_filter_params
+
+EXPORT_EXTENSIONS = {
+    'excel_fields': 'xlsx',
+    'excel_full': 'xlsx',
+    'pdf_fields': 'pdf',
+    'pdf_full': 'pdf',
+}
+
+
+# فایل‌های موقت قدیمی‌تر از این مدت (ثانیه) رها شده محسوب می‌شوند
+STALE_TEMP_FILE_AGE = 3600
+
+
+def export_cache_dir():
+    """مسیر پوشه فایل‌های خروجی ذخیره شده (خارج از MEDIA_ROOT تا مستقیماً قابل دسترسی نباشد)"""
+    return settings.EXPORT_CACHE_DIR
+
+
+def normalize_export_params(params):
+    """فیلترهای غیرخالی با حذف فاصله‌های ابتدا و انتها"""
+    normalized = {}
+    for name, value in item_filter_params(params).items():
+        value = str(value).strip()
+        if value:
+            normalized[name] = value
+    return normalized
+
+
+def export_fingerprint(kind, params, selected_fields=None):
+    """
+    اثر انگشت یک خروجی
+
+    Args:
+        kind: نوع خروجی (ExportJob.KIND_*)
+        params: دیکشنری پارامترهای فیلتر
+        selected_fields: کلید فیلدهای انتخاب شده (ترتیب آن‌ها در خروجی مهم است)
+
+    Returns:
+        str: hash هگزادسیمال sha256
+    """
+    payload = json.dumps(
+        {
+            'kind': kind,
+            'params': normalize_export_params(params),
+            'fields': list(selected_fields or []),
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(',', ':'),
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _remove_stale_versions(directory, fingerprint, keep):
+    """حذف فایل‌های همین خروجی با نسخه‌های قبلی داده"""
+    for name in os.listdir(directory):
+        if name.startswith(f'{fingerprint}-') and name != keep:
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                # فایل ممکن است در حال ارسال یا حذف شده توسط پروسه دیگری باشد
+                pass
+
+
+def cached_export(kind, params, selected_fields, build):
+    """
+    مسیر فایل خروجی ذخیره شده؛ در صورت نبود، فایل با build ساخته و ذخیره می‌شود
+
+    نسخه داده پیش از ساخت خوانده می‌شود، بنابراین اگر داده‌ها در حین ساخت تغییر کنند
+    فایل با نسخه قدیمی ذخیره شده و در درخواست بعدی دوباره ساخته می‌شود.
+
+    Args:
+        kind: نوع خروجی (ExportJob.KIND_*)
+        params: دیکشنری پارامترهای فیلتر
+        selected_fields: کلید فیلدهای انتخاب شده
+        build: تابعی که فایل باینری مقصد را دریافت کرده و خروجی را در آن می‌نویسد
+
+    Returns:
+        tuple: (مسیر فایل، آیا از فایل ذخیره شده استفاده شد)
+    """
+    directory = export_cache_dir()
+    os.makedirs(directory, exist_ok=True)
+
+    fingerprint = export_fingerprint(kind, params, selected_fields)
+    name = f'{fingerprint}-v{get_data_version()}.{EXPORT_EXTENSIONS[kind]}'
+    path = os.path.join(directory, name)
+    if os.path.exists(path):
+        return path, True
+
+    # نوشتن در فایل موقت همان پوشه و جایگزینی اتمیک، تا فایل ناقص هرگز ارسال نشود
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as temp_file:
+            build(temp_file)
+        os.replace(temp_path, path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    _remove_stale_versions(directory, fingerprint, name)
+    return path, False
+
+
+def cached_export_response(kind, params, selected_fields, build, filename, content_type):
+    """ارسال خروجی ذخیره شده (یا ساخته شده) به صورت stream"""
+    path, hit = cached_export(kind, params, selected_fields, build)
+    response = FileResponse(open(path, 'rb'), as_attachment=True, filename=filename, content_type=content_type)
+    response['Cache-Control'] = 'no-cache, no-store, must-revalidate'
+    response['X-Export-Cache'] = 'hit' if hit else 'miss'
+    return response
+
+
+def prune_export_cache():
+    """
+    حذف فایل‌های خروجی ذخیره شده با نسخه‌های قبلی داده و فایل‌های موقت رها شده
+
+    Returns:
+        int: تعداد فایل‌های حذف شده
+    """
+    directory = export_cache_dir()
+    if not os.path.isdir(directory):
+        return 0
+
+    current_suffix = f'-v{get_data_version()}.'
+    removed = 0
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        try:
+            if name.startswith('.tmp-'):
+                # فایل موقت ممکن است در حال نوشتن توسط پروسه دیگری باشد
+                if time.time() - os.path.getmtime(path) < STALE_TEMP_FILE_AGE:
+                    continue
+            elif current_suffix in name:
+                continue
+            os.remove(path)
+            removed += 1
+        except OSError:
+            pass
+    return removed
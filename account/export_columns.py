@@ -0,0 +1,183 @@
+"""
+کامپایل ستون‌های خروجی کالاها (Excel و PDF)
+
+لیست فیلدهای انتخاب شده یک بار به تابع‌های استخراج هر ستون تبدیل می‌شود و فقط
+ستون‌های لازم با values_list از پایگاه داده خوانده می‌شوند؛ در حلقه اصلی خروجی
+برای هر ردیف فقط یک tuple ساخته می‌شود و به نمونه‌های مدل دسترسی نیست.
+"""
+
+from operator import itemgetter
+
+from extensions.utils import jalali_converter
+from holder.models import Items
+
+TYPE_DISPLAY = {
+    'Technical': 'فنی',
+    'Non-technical': 'غیر فنی',
+}
+
+STATUS_DISPLAY = {
+    'hardware': 'سخت افزار (تعمیری)',
+    'Delivery': 'تحویل',
+    'warehouse': 'انبار',
+    'Healthy': 'سالم',
+    'Repairing': 'تعمیری',
+    'worn out': 'فرسوده',
+    'other': 'سایر',
+}
+
+# نمایش کوتاه وضعیت در گزارش PDF کلی
+SHORT_STATUS_DISPLAY = {
+    'hardware': 'سخت افزار',
+    'Delivery': 'تحویل',
+    'warehouse': 'انبار',
+}
+
+SUB_STATUS_DISPLAY = {
+    code: name
+    for choices in Items.STATUS_SUB_MAPPING.values()
+    for code, name in choices
+}
+
+
+def _or_default(default):
+    return lambda value: value or default
+
+
+def _type_display(value):
+    return TYPE_DISPLAY.get(value, 'نامشخص')
+
+
+def _status_display(value):
+    return STATUS_DISPLAY.get(value, 'نامشخص')
+
+
+def _sub_status_display(value):
+    return SUB_STATUS_DISPLAY.get(value, value) if value else 'ندارد'
+
+
+def _status_with_sub_display(status, sub_status):
+    display = SHORT_STATUS_DISPLAY.get(status, 'نامشخص')
+    if sub_status:
+        display += f" - {SUB_STATUS_DISPLAY.get(sub_status, sub_status)}"
+    return display
+
+
+def _holder_display(holder_id, name, family):
+    if holder_id is None:
+        return 'بدون دارنده'
+    return f"{name} {family} ({holder_id})"
+
+
+def _holder_name_display(holder_id, name, family):
+    if holder_id is None:
+        return 'بدون دارنده'
+    return f"{name} {family}"
+
+
+def _jalali_or_default(value):
+    return jalali_converter(value) if value else 'ندارد'
+
+
+def _datetime_or_default(value):
+    return value.strftime('%Y/%m/%d %H:%M') if value else 'ندارد'
+
+
+HOLDER_FIELDS = ('PersonalInfo', 'PersonalInfo__name', 'PersonalInfo__family')
+
+# کلید ستون -> (فیلدهای values_list، تابع تبدیل مقادیر آن فیلدها به مقدار خروجی)
+COLUMN_SPECS = {
+    'name': (('Technical_items',), _or_default('تعریف نشده')),
+    'type': (('type_Item',), _type_display),
+    'brand': (('brand',), _or_default('تعریف نشده')),
+    'configuration': (('Configuration',), _or_default('ندارد')),
+    'status': (('status_item',), _status_display),
+    'sub_status': (('status_sub_item',), _sub_status_display),
+    'status_with_sub': (('status_item', 'status_sub_item'), _status_with_sub_display),
+    'serial': (('serial_number',), _or_default('ندارد')),
+    'product_code': (('Product_code',), _or_default('ندارد')),
+    'holder': (HOLDER_FIELDS, _holder_display),
+    'holder_name': (HOLDER_FIELDS, _holder_name_display),
+    'register_date': (('register_date',), _jalali_or_default),
+    'update_date': (('update_date',), _datetime_or_default),
+}
+
+# تفاوت‌های قالب PDF با Excel
+PDF_COLUMN_OVERRIDES = {
+    'update_date': (('update_date',), _jalali_or_default),
+}
+
+ROW_NUMBER = 'row_number'
+
+# فاصله گزارش پیشرفت (تعداد ردیف) در خروجی‌های پس‌زمینه
+PROGRESS_STEP = 500
+
+
+class CompiledColumns:
+    """
+    ستون‌های کامپایل شده یک خروجی
+
+    Attributes:
+        keys: کلید ستون‌ها به ترتیب خروجی
+        fields: فیلدهای لازم برای values_list (بدون تکرار)
+    """
+
+    def __init__(self, keys, overrides=None):
+        specs = dict(COLUMN_SPECS)
+        specs.update(overrides or {})
+
+        self.keys = [key for key in keys if key == ROW_NUMBER or key in specs]
+        self.fields = []
+        positions = {}
+        extractors = []
+
+        for key in self.keys:
+            if key == ROW_NUMBER:
+                extractors.append(None)
+                continue
+            field_names, convert = specs[key]
+            for field_name in field_names:
+                if field_name not in positions:
+                    positions[field_name] = len(self.fields)
+                    self.fields.append(field_name)
+            getter = itemgetter(*[positions[field_name] for field_name in field_names])
+            if len(field_names) == 1:
+                extractors.append(lambda values, getter=getter, convert=convert: convert(getter(values)))
+            else:
+                extractors.append(lambda values, getter=getter, convert=convert: convert(*getter(values)))
+
+        self._extractors = tuple(extractors)
+
+    def row(self, values, row_number):
+        """ساخت ردیف خروجی از tuple مقادیر values_list"""
+        return tuple(
+            row_number if extract is None else extract(values)
+            for extract in self._extractors
+        )
+
+    def iter_rows(self, queryset, chunk_size=2000, start=1, progress=None):
+        """
+        خواندن دسته‌ای queryset با values_list و تولید ردیف‌های خروجی
+
+        Args:
+            queryset: queryset مرتب شده کالاها
+            chunk_size: تعداد ردیف‌های خوانده شده در هر مرحله
+            start: شماره اولین ردیف
+            progress: تابع اختیاری که هر PROGRESS_STEP ردیف با تعداد ردیف‌های ساخته شده صدا زده می‌شود
+        """
+        values_queryset = queryset.values_list(*self.fields) if self.fields else queryset.values_list('pk')
+        for count, values in enumerate(values_queryset.iterator(chunk_size=chunk_size), 1):
+            yield self.row(values, count + start - 1)
+            if progress is not None and count % PROGRESS_STEP == 0:
+                progress(count)
+
+
+def compile_columns(keys, overrides=None):
+    """
+    کامپایل لیست کلید ستون‌ها به CompiledColumns
+
+    Args:
+        keys: کلید ستون‌ها (مثلاً فیلدهای انتخاب شده در فرم خروجی)
+        overrides: جایگزینی تعریف برخی ستون‌ها (مثلاً PDF_COLUMN_OVERRIDES)
+    """
+    return CompiledColumns(keys, overrides)
@@ -0,0 +1,274 @@
+"""
+کارهای پس‌زمینه خروجی Excel / PDF لیست کالاها
+
+خروجی‌های بزرگ به جای اجرا در worker درخواست وب، به صورت ExportJob ثبت و در یک
+pool محلی از thread ها (بدون broker خارجی) ساخته می‌شوند. فایل نتیجه در
+MEDIA_ROOT/exports ذخیره و پس از EXPORT_JOB_TTL_HOURS با دستور cleanup_export_jobs حذف می‌شود.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.core.files import File
+from django.db import close_old_connections, transaction
+from django.http import FileResponse, Http404, JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
+from django.utils import timezone
+from django.views.decorators.http import require_POST
+
+from holder.models import Items
+from shared.item_filters import apply_item_filters, item_filter_params
+from .export_cache import cached_export, prune_export_cache
+from .excel_stream import EXCEL_CONTENT_TYPE, build_excel_export, excel_export_filename
+from .models import ExportJob
+from .pdf_export import build_items_pdf, build_selected_fields_pdf, items_pdf_filename, selected_fields_pdf_filename
+
+logger = logging.getLogger(__name__)
+
+# نوع کار -> (تابع ساخت فایل، تابع نام فایل، نوع محتوا)
+EXPORT_BUILDERS = {
+    ExportJob.KIND_EXCEL_FIELDS: (
+        lambda target, job, progress: build_excel_export(target, job.params, job.selected_fields, progress),
+        excel_export_filename,
+        EXCEL_CONTENT_TYPE,
+    ),
+    ExportJob.KIND_EXCEL_FULL: (
+        lambda target, job, progress: build_excel_export(target, job.params, None, progress),
+        excel_export_filename,
+        EXCEL_CONTENT_TYPE,
+    ),
+    ExportJob.KIND_PDF_FIELDS: (
+        lambda target, job, progress: build_selected_fields_pdf(target, job.params, job.selected_fields, progress),
+        selected_fields_pdf_filename,
+        'application/pdf',
+    ),
+    ExportJob.KIND_PDF_FULL: (
+        lambda target, job, progress: build_items_pdf(target, job.params, progress),
+        items_pdf_filename,
+        'application/pdf',
+    ),
+}
+
+# انواعی که بدون فیلد انتخاب شده قابل اجرا نیستند
+FIELD_SELECTION_KINDS = (ExportJob.KIND_EXCEL_FIELDS, ExportJob.KIND_PDF_FIELDS)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """pool مشترک thread های اجرای کارهای خروجی در این پروسه"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'EXPORT_JOB_WORKERS', 2),
+                thread_name_prefix='export-job',
+            )
+        return _executor
+
+
+def export_job_ttl():
+    """مدت نگهداری فایل خروجی"""
+    return timedelta(hours=getattr(settings, 'EXPORT_JOB_TTL_HOURS', 24))
+
+
+def enqueue_export_job(user, kind, params, selected_fields=None):
+    """
+    ثبت کار خروجی و ارسال آن به pool پس از commit تراکنش
+
+    Args:
+        user: کاربر درخواست دهنده
+        kind: نوع خروجی (ExportJob.KIND_*)
+        params: دیکشنری پارامترهای فیلتر (خروجی item_filter_params)
+        selected_fields: کلید فیلدهای انتخاب شده
+
+    Returns:
+        ExportJob
+    """
+    job = ExportJob.objects.create(
+        user=user,
+        kind=kind,
+        params=params,
+        selected_fields=list(selected_fields or []),
+    )
+    transaction.on_commit(lambda: get_executor().submit(run_export_job, job.pk))
+    return job
+
+
+def run_export_job(job_id):
+    """
+    اجرای یک کار خروجی (در thread های pool)
+
+    کار فقط در صورتی شروع می‌شود که هنوز در صف باشد؛ پیشرفت با update مستقیم
+    ذخیره می‌شود تا درخواست‌های polling بتوانند آن را بخوانند.
+    """
+    close_old_connections()
+    try:
+        started = ExportJob.objects.filter(pk=job_id, status=ExportJob.STATUS_QUEUED).update(
+            status=ExportJob.STATUS_RUNNING, started_at=timezone.now()
+        )
+        if not started:
+            return
+        job = ExportJob.objects.get(pk=job_id)
+        build, make_filename, content_type = EXPORT_BUILDERS[job.kind]
+
+        total_rows = apply_item_filters(Items.objects.all(), job.params).count()
+        ExportJob.objects.filter(pk=job_id).update(total_rows=total_rows)
+
+        def progress(count):
+            ExportJob.objects.filter(pk=job_id).update(progress=count)
+
+        # خروجی ذخیره شده همین فیلترها و فیلدها (در صورت وجود) بدون ساخت مجدد کپی می‌شود
+        path, _ = cached_export(
+            job.kind, job.params, job.selected_fields,
+            lambda target: build(target, job, progress),
+        )
+        filename = make_filename(job.params)
+        extension = filename.rsplit('.', 1)[-1]
+        with open(path, 'rb') as export_file:
+            job.file.save(f'{job.pk}.{extension}', File(export_file), save=False)
+
+        finished_at = timezone.now()
+        ExportJob.objects.filter(pk=job_id).update(
+            status=ExportJob.STATUS_DONE,
+            file=job.file.name,
+            filename=filename,
+            progress=total_rows,
+            finished_at=finished_at,
+            expires_at=finished_at + export_job_ttl(),
+        )
+    except Exception as e:
+        logger.exception('Export job %s failed', job_id)
+        ExportJob.objects.filter(pk=job_id).update(
+            status=ExportJob.STATUS_FAILED,
+            error=str(e),
+            finished_at=timezone.now(),
+        )
+    finally:
+        close_old_connections()
+
+
+def cleanup_export_jobs(now=None):
+    """
+    حذف کارهای منقضی شده و فایل‌های آن‌ها، ناموفق کردن کارهای رها شده
+    (کارهایی که به دلیل راه‌اندازی مجدد پروسه هرگز تمام نشده‌اند) و حذف
+    خروجی‌های ذخیره شده با نسخه‌های قبلی داده
+
+    Returns:
+        tuple: (تعداد کارهای حذف شده، تعداد کارهای رها شده، تعداد فایل‌های ذخیره شده حذف شده)
+    """
+    now = now or timezone.now()
+
+    abandoned = ExportJob.objects.filter(
+        status__in=[ExportJob.STATUS_QUEUED, ExportJob.STATUS_RUNNING],
+        created_at__lt=now - export_job_ttl(),
+    ).update(
+        status=ExportJob.STATUS_FAILED,
+        error='کار خروجی در زمان مقرر تمام نشد.',
+        finished_at=now,
+        expires_at=now,
+    )
+
+    expired = ExportJob.objects.filter(expires_at__lt=now).exclude(
+        status__in=[ExportJob.STATUS_QUEUED, ExportJob.STATUS_RUNNING]
+    )
+    deleted = 0
+    for job in expired.iterator():
+        if job.file:
+            job.file.delete(save=False)
+        job.delete()
+        deleted += 1
+    return deleted, abandoned, prune_export_cache()
+
+
+def export_job_data(job):
+    """اطلاعات وضعیت کار برای پاسخ JSON"""
+    expired = bool(job.expires_at and job.expires_at < timezone.now())
+    data = {
+        'id': str(job.pk),
+        'kind': job.kind,
+        'kind_display': job.get_kind_display(),
+        'status': job.status,
+        'status_display': job.get_status_display(),
+        'progress': job.progress,
+        'total': job.total_rows,
+        'percent': job.percent,
+        'filename': job.filename,
+        'error': job.error,
+        'expired': expired,
+        'download_url': None,
+    }
+    if job.status == ExportJob.STATUS_DONE and not expired:
+        data['download_url'] = reverse('account:export_job_download', args=[job.pk])
+    return data
+
+
+@login_required
+@require_POST
+def create_export_job(request):
+    """ثبت کار خروجی پس‌زمینه با فیلترها و فیلدهای ارسال شده"""
+    kind = request.POST.get('kind')
+    selected_fields = request.POST.getlist('selected_fields')
+    is_ajax = request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+
+    error = None
+    if kind not in EXPORT_BUILDERS:
+        error = 'نوع خروجی نامعتبر است.'
+    elif kind in FIELD_SELECTION_KINDS and not selected_fields:
+        error = 'لطفاً حداقل یک فیلد را انتخاب کنید.'
+
+    if error:
+        if is_ajax:
+            return JsonResponse({'success': False, 'error': error}, status=400)
+        messages.error(request, error)
+        return redirect('account:home')
+
+    job = enqueue_export_job(request.user, kind, item_filter_params(request.POST), selected_fields)
+
+    if is_ajax:
+        return JsonResponse({'success': True, 'job': export_job_data(job)})
+    messages.success(request, 'خروجی در صف ساخت قرار گرفت. پس از آماده شدن از همین صفحه قابل دانلود است.')
+    return redirect('account:export_jobs')
+
+
+@login_required
+def export_jobs_list(request):
+    """لیست کارهای خروجی کاربر"""
+    jobs = ExportJob.objects.filter(user=request.user)[:50]
+    context = {
+        'jobs': jobs,
+        'ttl_hours': getattr(settings, 'EXPORT_JOB_TTL_HOURS', 24),
+    }
+    return render(request, 'registration/export_jobs.html', context)
+
+
+@login_required
+def export_job_status(request, job_id):
+    """وضعیت و پیشرفت کار خروجی (JSON برای polling)"""
+    job = get_object_or_404(ExportJob, pk=job_id, user=request.user)
+    return JsonResponse(export_job_data(job))
+
+
+@login_required
+def export_job_download(request, job_id):
+    """دانلود فایل کار خروجی آماده شده"""
+    job = get_object_or_404(ExportJob, pk=job_id, user=request.user)
+    if job.status != ExportJob.STATUS_DONE or not job.file:
+        raise Http404('فایل خروجی هنوز آماده نشده است.')
+    if job.expires_at and job.expires_at < timezone.now():
+        messages.error(request, 'مهلت دانلود این خروجی به پایان رسیده است.')
+        return redirect('account:export_jobs')
+
+    content_type = EXPORT_BUILDERS[job.kind][2]
+    try:
+        file_handle = job.file.open('rb')
+    except FileNotFoundError:
+        raise Http404('فایل خروجی یافت نشد.')
+    return FileResponse(file_handle, as_attachment=True, filename=job.filename, content_type=content_type)
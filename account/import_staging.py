@@ -0,0 +1,194 @@
+"""
+نگهداری ردیف‌های ورود Excel در جدول موقت (ImportBatch / ImportStagingRow)
+
+ردیف‌های پردازش شده فایل به جای request.session در پایگاه داده و با شناسه دسته
+ذخیره می‌شوند؛ بنابراین session کاربر کوچک می‌ماند، صفحه تأیید صفحه‌بندی می‌شود و
+کاربر می‌تواند بررسی یک دسته را بعداً ادامه دهد.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from holder.bulk_import import import_items
+from holder.models import PersonalInfo
+from .models import ImportBatch, ImportStagingRow
+
+
+def import_review_page_size():
+    """تعداد ردیف‌های هر صفحه تأیید"""
+    return getattr(settings, 'IMPORT_REVIEW_PAGE_SIZE', 50)
+
+
+def import_batch_ttl():
+    """مدت نگهداری دسته‌های ورود"""
+    return timedelta(hours=getattr(settings, 'IMPORT_BATCH_TTL_HOURS', 72))
+
+
+def _row_flags(field_confirmations):
+    """(دارای هشدار، دارای خطا) برای فیلدهای یک ردیف"""
+    fields = field_confirmations.values()
+    has_warnings = any(not field['confirmed'] and field['value'] for field in fields)
+    has_errors = any(not field['value'] and field['required'] for field in fields)
+    return has_warnings, has_errors
+
+
+def stage_import(user, filename, processed_items):
+    """
+    ذخیره ردیف‌های پردازش شده فایل در یک دسته ورود جدید
+
+    Args:
+        user: کاربر بارگذاری کننده
+        filename: نام فایل Excel
+        processed_items: ردیف‌های خروجی process_excel_enhanced
+
+    Returns:
+        ImportBatch
+    """
+    with transaction.atomic():
+        batch = ImportBatch.objects.create(
+            user=user,
+            filename=filename[:255],
+            total_rows=len(processed_items),
+        )
+        ImportStagingRow.objects.bulk_create(
+            [
+                ImportStagingRow(
+                    batch=batch,
+                    row_number=item['row_number'],
+                    action_type=item['action_type'],
+                    existing_item_id=item['existing_item_id'],
+                    existing_item_name=item['existing_item_name'],
+                    field_confirmations=item['field_confirmations'],
+                    has_warnings=item['has_warnings'],
+                    has_errors=item['has_errors'],
+                    selected=not item['has_errors'],
+                )
+                for item in processed_items
+            ],
+            batch_size=getattr(settings, 'IMPORT_BULK_BATCH_SIZE', 500),
+        )
+    return batch
+
+
+def import_batch_summary(batch):
+    """آمار ردیف‌های دسته با یک کوئری"""
+    return batch.rows.aggregate(
+        total_items=Count('pk'),
+        create_count=Count('pk', filter=Q(action_type=ImportStagingRow.ACTION_CREATE)),
+        update_count=Count('pk', filter=Q(action_type=ImportStagingRow.ACTION_UPDATE)),
+        warning_count=Count('pk', filter=Q(has_warnings=True)),
+        error_count=Count('pk', filter=Q(has_errors=True)),
+        selected_count=Count('pk', filter=Q(selected=True)),
+    )
+
+
+def people_options():
+    """گزینه‌های انتخاب دارنده (یک بار برای هر صفحه، نه برای هر ردیف)"""
+    options = [{'value': '', 'label': 'بدون دارنده'}]
+    people = PersonalInfo.objects.order_by('name', 'family').values_list('Personnel_number', 'name', 'family')
+    for personnel_number, name, family in people:
+        options.append({
+            'value': personnel_number,
+            'label': f"{name} {family} ({personnel_number})"
+        })
+    return options
+
+
+def save_review_page(batch, data):
+    """
+    ذخیره ویرایش‌ها و انتخاب‌های یک صفحه تأیید
+
+    Args:
+        batch: دسته ورود
+        data: داده‌های فرم (شامل page_rows برای ردیف‌های نمایش داده شده در صفحه)
+
+    Returns:
+        int: تعداد ردیف‌های ذخیره شده
+    """
+    page_rows = [int(value) for value in data.getlist('page_rows') if value.isdigit()]
+    if not page_rows:
+        return 0
+    confirmed_items = set(data.getlist('confirmed_items'))
+
+    rows = list(batch.rows.filter(row_number__in=page_rows, status=ImportStagingRow.STATUS_PENDING))
+    for row in rows:
+        row_number = str(row.row_number)
+        row.selected = row_number in confirmed_items
+        for field_name, field_info in row.field_confirmations.items():
+            form_field_name = f"field_{row_number}_{field_name}"
+            if form_field_name in data:
+                field_info['value'] = data[form_field_name] or None
+        row.has_warnings, row.has_errors = _row_flags(row.field_confirmations)
+
+    ImportStagingRow.objects.bulk_update(rows, ['selected', 'field_confirmations', 'has_warnings', 'has_errors'])
+    if rows:
+        # ثبت زمان آخرین فعالیت برای حذف دسته‌های رها شده
+        ImportBatch.objects.filter(pk=batch.pk).update(updated_at=timezone.now())
+    return len(rows)
+
+
+def _row_import_data(row):
+    """داده‌های قابل ثبت یک ردیف (مانند مقادیر ارسالی فرم تأیید)"""
+    confirmed_data = {}
+    for field_name, field_info in row.field_confirmations.items():
+        value = field_info['value']
+        # دارنده با شماره پرسنلی (یا خالی برای بدون دارنده) ثبت می‌شود
+        if field_name == 'PersonalInfo':
+            confirmed_data['PersonalInfo'] = value or None
+        elif value:  # فقط مقادیر غیر خالی
+            confirmed_data[field_name] = value
+    return confirmed_data
+
+
+def apply_import_batch(batch):
+    """
+    ثبت ردیف‌های انتخاب شده دسته و علامت‌گذاری نتیجه هر ردیف
+
+    دسته فقط یک بار اعمال می‌شود؛ در صورت خطای کلی تراکنش برگشت خورده و دسته
+    در انتظار تأیید باقی می‌ماند.
+
+    Returns:
+        BulkImportResult یا None اگر دسته قبلاً اعمال شده باشد
+    """
+    with transaction.atomic():
+        applied = ImportBatch.objects.filter(pk=batch.pk, status=ImportBatch.STATUS_PENDING).update(
+            status=ImportBatch.STATUS_APPLIED, applied_at=timezone.now()
+        )
+        if not applied:
+            return None
+
+        staged_rows = batch.rows.filter(
+            selected=True, status=ImportStagingRow.STATUS_PENDING
+        ).order_by('row_number').only('row_number', 'action_type', 'existing_item_id', 'field_confirmations')
+        rows = [
+            {
+                'row_number': row.row_number,
+                'action_type': row.action_type,
+                'existing_item_id': row.existing_item_id,
+                'data': _row_import_data(row),
+            }
+            for row in staged_rows.iterator()
+        ]
+        result = import_items(rows)
+
+        # ردیف‌های ناموفق معمولاً معدود هستند؛ بقیه ردیف‌های ارسال شده با یک کوئری علامت‌گذاری می‌شوند
+        for row_number, error in result.errors:
+            batch.rows.filter(row_number=row_number).update(status=ImportStagingRow.STATUS_FAILED, error=error)
+        staged_rows.filter(status=ImportStagingRow.STATUS_PENDING).update(status=ImportStagingRow.STATUS_APPLIED)
+    return result
+
+
+def cleanup_import_batches(now=None):
+    """
+    حذف دسته‌های ورود اعمال شده یا رها شده قدیمی‌تر از IMPORT_BATCH_TTL_HOURS
+
+    Returns:
+        int: تعداد دسته‌های حذف شده
+    """
+    now = now or timezone.now()
+    deleted, per_model = ImportBatch.objects.filter(updated_at__lt=now - import_batch_ttl()).delete()
+    return per_model.get(ImportBatch._meta.label, 0)
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from account.comparison_runs import cleanup_comparison_runs
+
+
+class Command(BaseCommand):
+    help = 'حذف نتایج مقایسه Excel قدیمی'
+
+    def handle(self, *args, **options):
+        deleted = cleanup_comparison_runs()
+        self.stdout.write(self.style.SUCCESS(f'{deleted} نتیجه مقایسه Excel حذف شد.'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from account.export_jobs import cleanup_export_jobs
+
+
+class Command(BaseCommand):
+    help = 'حذف کارهای خروجی منقضی شده و فایل‌های آن‌ها و خروجی‌های ذخیره شده قدیمی'
+
+    def handle(self, *args, **options):
+        deleted, abandoned, pruned = cleanup_export_jobs()
+        self.stdout.write(self.style.SUCCESS(
+            f'{deleted} کار خروجی منقضی حذف و {abandoned} کار رها شده ناموفق علامت‌گذاری شد؛ '
+            f'{pruned} فایل خروجی ذخیره شده قدیمی حذف شد.'
+        ))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from account.import_staging import cleanup_import_batches
+
+
+class Command(BaseCommand):
+    help = 'حذف دسته‌های ورود Excel اعمال شده یا رها شده قدیمی'
+
+    def handle(self, *args, **options):
+        deleted = cleanup_import_batches()
+        self.stdout.write(self.style.SUCCESS(f'{deleted} دسته ورود Excel حذف شد.'))
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.1 on 2026-10-18 13:07
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('excel_fields', 'Excel (فیلدهای انتخابی)'), ('excel_full', 'Excel (همه فیلدها)'), ('pdf_fields', 'PDF (فیلدهای انتخابی)'), ('pdf_full', 'PDF (گزارش کلی)')], max_length=20, verbose_name='نوع خروجی')),
+                ('params', models.JSONField(blank=True, default=dict, verbose_name='فیلترها')),
+                ('selected_fields', models.JSONField(blank=True, default=list, verbose_name='فیلدهای انتخاب شده')),
+                ('status', models.CharField(choices=[('queued', 'در صف'), ('running', 'در حال اجرا'), ('done', 'آماده دانلود'), ('failed', 'ناموفق')], default='queued', max_length=20, verbose_name='وضعیت')),
+                ('progress', models.PositiveIntegerField(default=0, verbose_name='ردیف\u200cهای پردازش شده')),
+                ('total_rows', models.PositiveIntegerField(blank=True, null=True, verbose_name='تعداد کل ردیف\u200cها')),
+                ('file', models.FileField(blank=True, upload_to='exports/', verbose_name='فایل خروجی')),
+                ('filename', models.CharField(blank=True, max_length=255, verbose_name='نام فایل')),
+                ('error', models.TextField(blank=True, verbose_name='خطا')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='تاریخ ایجاد')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='زمان شروع')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='زمان پایان')),
+                ('expires_at', models.DateTimeField(blank=True, null=True, verbose_name='زمان انقضا')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='export_jobs', to=settings.AUTH_USER_MODEL, verbose_name='کاربر')),
+            ],
+            options={
+                'verbose_name': 'کار خروجی',
+                'verbose_name_plural': 'کارهای خروجی',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['user', '-created_at'], name='export_job_user_idx'), models.Index(fields=['status', 'expires_at'], name='export_job_status_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.1 on 2026-10-18 13:20
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportBatch',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(blank=True, max_length=255, verbose_name='نام فایل')),
+                ('status', models.CharField(choices=[('pending', 'در انتظار تأیید'), ('applied', 'اعمال شده')], default='pending', max_length=20, verbose_name='وضعیت')),
+                ('total_rows', models.PositiveIntegerField(default=0, verbose_name='تعداد ردیف\u200cها')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='تاریخ ایجاد')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='آخرین تغییر')),
+                ('applied_at', models.DateTimeField(blank=True, null=True, verbose_name='زمان اعمال')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='import_batches', to=settings.AUTH_USER_MODEL, verbose_name='کاربر')),
+            ],
+            options={
+                'verbose_name': 'دسته ورود Excel',
+                'verbose_name_plural': 'دسته\u200cهای ورود Excel',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ImportStagingRow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('row_number', models.PositiveIntegerField(verbose_name='شماره ردیف')),
+                ('action_type', models.CharField(choices=[('create', 'ایجاد'), ('update', 'به\u200cروزرسانی')], max_length=10, verbose_name='نوع عملیات')),
+                ('existing_item_id', models.IntegerField(blank=True, null=True, verbose_name='شناسه کالای موجود')),
+                ('existing_item_name', models.CharField(blank=True, max_length=255, null=True, verbose_name='نام کالای موجود')),
+                ('field_confirmations', models.JSONField(default=dict, verbose_name='فیلدها')),
+                ('has_warnings', models.BooleanField(default=False, verbose_name='دارای هشدار')),
+                ('has_errors', models.BooleanField(default=False, verbose_name='دارای خطا')),
+                ('selected', models.BooleanField(default=True, verbose_name='انتخاب شده')),
+                ('status', models.CharField(choices=[('pending', 'در انتظار'), ('applied', 'ثبت شده'), ('failed', 'ناموفق')], default='pending', max_length=20, verbose_name='وضعیت')),
+                ('error', models.TextField(blank=True, verbose_name='خطا')),
+                ('batch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rows', to='account.importbatch', verbose_name='دسته ورود')),
+            ],
+            options={
+                'verbose_name': 'ردیف ورود Excel',
+                'verbose_name_plural': 'ردیف\u200cهای ورود Excel',
+                'ordering': ['batch', 'row_number'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='importbatch',
+            index=models.Index(fields=['user', 'status', '-created_at'], name='import_batch_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='importbatch',
+            index=models.Index(fields=['status', 'updated_at'], name='import_batch_status_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='importstagingrow',
+            constraint=models.UniqueConstraint(fields=('batch', 'row_number'), name='import_row_batch_number_uniq'),
+        ),
+    ]
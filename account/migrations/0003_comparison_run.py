@@ -0,0 +1,71 @@
+# Generated by Django 5.2.1 on 2026-10-18 13:26
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0002_import_batch'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ComparisonRun',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(blank=True, max_length=255, verbose_name='نام فایل')),
+                ('comparison_type', models.CharField(choices=[('all', 'مقایسه کامل'), ('new_items', 'فقط کالاهای جدید'), ('existing_items', 'فقط کالاهای موجود'), ('differences', 'فقط تفاوت\u200cها'), ('system_only', 'فقط کالاهای سیستم')], default='all', max_length=20, verbose_name='نوع مقایسه')),
+                ('new_items_count', models.PositiveIntegerField(default=0, verbose_name='کالاهای جدید')),
+                ('existing_items_count', models.PositiveIntegerField(default=0, verbose_name='کالاهای موجود')),
+                ('differences_count', models.PositiveIntegerField(default=0, verbose_name='کالاهای دارای تفاوت')),
+                ('system_only_count', models.PositiveIntegerField(default=0, verbose_name='کالاهای فقط در سیستم')),
+                ('excel_errors_count', models.PositiveIntegerField(default=0, verbose_name='خطاهای فایل')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='تاریخ ایجاد')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='comparison_runs', to=settings.AUTH_USER_MODEL, verbose_name='کاربر')),
+            ],
+            options={
+                'verbose_name': 'مقایسه Excel',
+                'verbose_name_plural': 'مقایسه\u200cهای Excel',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ComparisonEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(choices=[('new_items', 'کالاهای جدید'), ('existing_items', 'کالاهای موجود و یکسان'), ('differences', 'کالاهای دارای تفاوت'), ('system_only', 'کالاهای فقط در سیستم'), ('excel_errors', 'خطاهای فایل Excel')], max_length=20, verbose_name='دسته')),
+                ('position', models.PositiveIntegerField(verbose_name='ترتیب')),
+                ('row_number', models.PositiveIntegerField(blank=True, null=True, verbose_name='ردیف Excel')),
+                ('item_id', models.IntegerField(blank=True, null=True, verbose_name='شناسه کالای سیستم')),
+                ('data', models.JSONField(default=dict, verbose_name='داده\u200cها')),
+                ('resolved', models.BooleanField(default=False, verbose_name='اعمال شده')),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entries', to='account.comparisonrun', verbose_name='مقایسه')),
+            ],
+            options={
+                'verbose_name': 'ردیف مقایسه Excel',
+                'verbose_name_plural': 'ردیف\u200cهای مقایسه Excel',
+                'ordering': ['run', 'category', 'position'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='comparisonrun',
+            index=models.Index(fields=['user', '-created_at'], name='comparison_run_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comparisonrun',
+            index=models.Index(fields=['created_at'], name='comparison_run_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comparisonentry',
+            index=models.Index(fields=['run', 'item_id'], name='comparison_entry_item_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='comparisonentry',
+            constraint=models.UniqueConstraint(fields=('run', 'category', 'position'), name='comparison_entry_position_uniq'),
+        ),
+    ]
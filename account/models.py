@@ -1,3 +1,235 @@
+import uuid
+
+from django.conf import settings
 from django.db import models
+from extensions.utils import jalali_converter
+
+
+class ExportJob(models.Model):
+    """کار پس‌زمینه خروجی Excel / PDF لیست کالاها"""
+
+    KIND_EXCEL_FIELDS = 'excel_fields'
+    KIND_EXCEL_FULL = 'excel_full'
+    KIND_PDF_FIELDS = 'pdf_fields'
+    KIND_PDF_FULL = 'pdf_full'
+
+    KIND_CHOICES = [
+        (KIND_EXCEL_FIELDS, 'Excel (فیلدهای انتخابی)'),
+        (KIND_EXCEL_FULL, 'Excel (همه فیلدها)'),
+        (KIND_PDF_FIELDS, 'PDF (فیلدهای انتخابی)'),
+        (KIND_PDF_FULL, 'PDF (گزارش کلی)'),
+    ]
+
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'در صف'),
+        (STATUS_RUNNING, 'در حال اجرا'),
+        (STATUS_DONE, 'آماده دانلود'),
+        (STATUS_FAILED, 'ناموفق'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='export_jobs', verbose_name="کاربر")
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, verbose_name="نوع خروجی")
+    params = models.JSONField(default=dict, blank=True, verbose_name="فیلترها")
+    selected_fields = models.JSONField(default=list, blank=True, verbose_name="فیلدهای انتخاب شده")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_QUEUED, verbose_name="وضعیت")
+    progress = models.PositiveIntegerField(default=0, verbose_name="ردیف‌های پردازش شده")
+    total_rows = models.PositiveIntegerField(null=True, blank=True, verbose_name="تعداد کل ردیف‌ها")
+    file = models.FileField(upload_to='exports/', blank=True, verbose_name="فایل خروجی")
+    filename = models.CharField(max_length=255, blank=True, verbose_name="نام فایل")
+    error = models.TextField(blank=True, verbose_name="خطا")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="تاریخ ایجاد")
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name="زمان شروع")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="زمان پایان")
+    expires_at = models.DateTimeField(null=True, blank=True, verbose_name="زمان انقضا")
+
+    def __str__(self):
+        return f"{self.get_kind_display()} - {self.get_status_display()}"
+
+    def jinfo(self):
+        return jalali_converter(self.created_at)
+    jinfo.short_description = "تاریخ ایجاد"
+
+    @property
+    def percent(self):
+        """درصد پیشرفت کار"""
+        if self.status == self.STATUS_DONE:
+            return 100
+        if not self.total_rows:
+            return 0
+        return min(99, self.progress * 100 // self.total_rows)
+
+    class Meta:
+        verbose_name = "کار خروجی"
+        verbose_name_plural = "کارهای خروجی"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='export_job_user_idx'),
+            models.Index(fields=['status', 'expires_at'], name='export_job_status_idx'),
+        ]
+
+
+class ImportBatch(models.Model):
+    """دسته ورود Excel در انتظار بررسی و تأیید (به جای نگهداری ردیف‌ها در session)"""
+
+    STATUS_PENDING = 'pending'
+    STATUS_APPLIED = 'applied'
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'در انتظار تأیید'),
+        (STATUS_APPLIED, 'اعمال شده'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='import_batches', verbose_name="کاربر")
+    filename = models.CharField(max_length=255, blank=True, verbose_name="نام فایل")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING, verbose_name="وضعیت")
+    total_rows = models.PositiveIntegerField(default=0, verbose_name="تعداد ردیف‌ها")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="تاریخ ایجاد")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="آخرین تغییر")
+    applied_at = models.DateTimeField(null=True, blank=True, verbose_name="زمان اعمال")
+
+    def __str__(self):
+        return f"{self.filename} - {self.get_status_display()}"
+
+    def jinfo(self):
+        return jalali_converter(self.created_at)
+    jinfo.short_description = "تاریخ ایجاد"
+
+    class Meta:
+        verbose_name = "دسته ورود Excel"
+        verbose_name_plural = "دسته‌های ورود Excel"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'status', '-created_at'], name='import_batch_user_idx'),
+            models.Index(fields=['status', 'updated_at'], name='import_batch_status_idx'),
+        ]
+
+
+class ImportStagingRow(models.Model):
+    """یک ردیف فایل ورودی در انتظار تأیید"""
+
+    ACTION_CREATE = 'create'
+    ACTION_UPDATE = 'update'
+
+    ACTION_CHOICES = [
+        (ACTION_CREATE, 'ایجاد'),
+        (ACTION_UPDATE, 'به‌روزرسانی'),
+    ]
+
+    STATUS_PENDING = 'pending'
+    STATUS_APPLIED = 'applied'
+    STATUS_FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'در انتظار'),
+        (STATUS_APPLIED, 'ثبت شده'),
+        (STATUS_FAILED, 'ناموفق'),
+    ]
+
+    batch = models.ForeignKey(ImportBatch, on_delete=models.CASCADE, related_name='rows', verbose_name="دسته ورود")
+    row_number = models.PositiveIntegerField(verbose_name="شماره ردیف")
+    action_type = models.CharField(max_length=10, choices=ACTION_CHOICES, verbose_name="نوع عملیات")
+    existing_item_id = models.IntegerField(null=True, blank=True, verbose_name="شناسه کالای موجود")
+    existing_item_name = models.CharField(max_length=255, null=True, blank=True, verbose_name="نام کالای موجود")
+    field_confirmations = models.JSONField(default=dict, verbose_name="فیلدها")
+    has_warnings = models.BooleanField(default=False, verbose_name="دارای هشدار")
+    has_errors = models.BooleanField(default=False, verbose_name="دارای خطا")
+    selected = models.BooleanField(default=True, verbose_name="انتخاب شده")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING, verbose_name="وضعیت")
+    error = models.TextField(blank=True, verbose_name="خطا")
+
+    def __str__(self):
+        return f"{self.batch_id} - {self.row_number}"
+
+    class Meta:
+        verbose_name = "ردیف ورود Excel"
+        verbose_name_plural = "ردیف‌های ورود Excel"
+        ordering = ['batch', 'row_number']
+        constraints = [
+            models.UniqueConstraint(fields=['batch', 'row_number'], name='import_row_batch_number_uniq'),
+        ]
+
+
+class ComparisonRun(models.Model):
+    """نتیجه ذخیره شده مقایسه یک فایل Excel با کالاهای سیستم"""
+
+    TYPE_CHOICES = [
+        ('all', 'مقایسه کامل'),
+        ('new_items', 'فقط کالاهای جدید'),
+        ('existing_items', 'فقط کالاهای موجود'),
+        ('differences', 'فقط تفاوت‌ها'),
+        ('system_only', 'فقط کالاهای سیستم'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='comparison_runs', verbose_name="کاربر")
+    filename = models.CharField(max_length=255, blank=True, verbose_name="نام فایل")
+    comparison_type = models.CharField(max_length=20, choices=TYPE_CHOICES, default='all', verbose_name="نوع مقایسه")
+    new_items_count = models.PositiveIntegerField(default=0, verbose_name="کالاهای جدید")
+    existing_items_count = models.PositiveIntegerField(default=0, verbose_name="کالاهای موجود")
+    differences_count = models.PositiveIntegerField(default=0, verbose_name="کالاهای دارای تفاوت")
+    system_only_count = models.PositiveIntegerField(default=0, verbose_name="کالاهای فقط در سیستم")
+    excel_errors_count = models.PositiveIntegerField(default=0, verbose_name="خطاهای فایل")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="تاریخ ایجاد")
+
+    def __str__(self):
+        return f"{self.filename} - {self.get_comparison_type_display()}"
+
+    def jinfo(self):
+        return jalali_converter(self.created_at)
+    jinfo.short_description = "تاریخ ایجاد"
+
+    class Meta:
+        verbose_name = "مقایسه Excel"
+        verbose_name_plural = "مقایسه‌های Excel"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='comparison_run_user_idx'),
+            models.Index(fields=['created_at'], name='comparison_run_created_idx'),
+        ]
+
+
+class ComparisonEntry(models.Model):
+    """یک ردیف نتیجه مقایسه (کالای جدید، موجود، دارای تفاوت، فقط در سیستم یا خطای فایل)"""
+
+    CATEGORY_NEW = 'new_items'
+    CATEGORY_EXISTING = 'existing_items'
+    CATEGORY_DIFFERENCE = 'differences'
+    CATEGORY_SYSTEM_ONLY = 'system_only'
+    CATEGORY_ERROR = 'excel_errors'
+
+    CATEGORY_CHOICES = [
+        (CATEGORY_NEW, 'کالاهای جدید'),
+        (CATEGORY_EXISTING, 'کالاهای موجود و یکسان'),
+        (CATEGORY_DIFFERENCE, 'کالاهای دارای تفاوت'),
+        (CATEGORY_SYSTEM_ONLY, 'کالاهای فقط در سیستم'),
+        (CATEGORY_ERROR, 'خطاهای فایل Excel'),
+    ]
+
+    run = models.ForeignKey(ComparisonRun, on_delete=models.CASCADE, related_name='entries', verbose_name="مقایسه")
+    category = models.CharField(max_length=20, choices=CATEGORY_CHOICES, verbose_name="دسته")
+    position = models.PositiveIntegerField(verbose_name="ترتیب")
+    row_number = models.PositiveIntegerField(null=True, blank=True, verbose_name="ردیف Excel")
+    item_id = models.IntegerField(null=True, blank=True, verbose_name="شناسه کالای سیستم")
+    data = models.JSONField(default=dict, verbose_name="داده‌ها")
+    resolved = models.BooleanField(default=False, verbose_name="اعمال شده")
+
+    def __str__(self):
+        return f"{self.get_category_display()} - {self.position}"
 
-# Create your models here.
+    class Meta:
+        verbose_name = "ردیف مقایسه Excel"
+        verbose_name_plural = "ردیف‌های مقایسه Excel"
+        ordering = ['run', 'category', 'position']
+        constraints = [
+            models.UniqueConstraint(fields=['run', 'category', 'position'], name='comparison_entry_position_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['run', 'item_id'], name='comparison_entry_item_idx'),
+        ]
@@ -1,142 +1,58 @@
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import HttpResponse
-from django.db.models import Q
-from holder.models import Items, PersonalInfo
+from holder.models import Items
+from shared.item_filters import apply_item_filters
+from .export_columns import compile_columns, PDF_COLUMN_OVERRIDES
+from .export_cache import cached_export_response
+from .models import ExportJob
+from .pdf_resources import get_pdf_resources
+from .pdf_text import fix_persian_text, has_arabic_script, shaping_cache_info
 from reportlab.lib.pagesizes import A4, landscape
 from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
-from reportlab.pdfbase import pdfmetrics
 from extensions.utils import jalali_converter
-
-# Import های سازگار با نسخه‌های مختلف ReportLab
-try:
-    from reportlab.pdfbase.ttfonts import TTFont
-except ImportError:
-    # برای نسخه‌های جدیدتر ReportLab
-    try:
-        from reportlab.lib.fonts import TTFont
-    except ImportError:
-        TTFont = None
-
-try:
-    from reportlab.lib.enums import TA_CENTER, TA_RIGHT
-except ImportError:
-    # برای نسخه‌های جدیدتر ReportLab
-    try:
-        from reportlab.lib.styles import TA_CENTER, TA_RIGHT
-    except ImportError:
-        # تعریف ثابت‌ها به صورت دستی
-        TA_CENTER = 1
-        TA_RIGHT = 2
+from holder.versioning import get_data_version_time
+from django.utils import timezone
 
 from datetime import datetime
-import os
+import logging
 import urllib.parse
 
-# برای پشتیبانی از متن فارسی
-try:
-    from arabic_reshaper import reshape
-    from bidi.algorithm import get_display
-    PERSIAN_SUPPORT = True
-except ImportError:
-    PERSIAN_SUPPORT = False
-    print("برای نمایش صحیح فارسی، لطفاً پکیج‌های arabic-reshaper و python-bidi را نصب کنید:")
-    print("pip install arabic-reshaper python-bidi")
-
-def fix_persian_text(text):
-    """تصحیح متن فارسی برای نمایش صحیح در PDF"""
-    if not text or not PERSIAN_SUPPORT:
-        return text
-    
-    try:
-        # تبدیل متن فارسی به فرمت قابل نمایش
-        reshaped_text = reshape(text)
-        bidi_text = get_display(reshaped_text)
-        return bidi_text
-    except Exception as e:
-        print(f"خطا در تصحیح متن فارسی: {e}")
-        return text
+logger = logging.getLogger(__name__)
 
 # تنظیم فونت فارسی
 def setup_persian_font():
-    """تنظیم فونت فارسی برای PDF"""
-    if TTFont is None:
-        return 'Helvetica'
-    
-    try:
-        # مسیرهای مختلف فونت‌های فارسی
-        font_paths = [
-            # فونت‌های فارسی در Linux
-            "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf",
-            "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
-            "/usr/share/fonts/TTF/NotoSansFarsi-Regular.ttf",
-            "/usr/share/fonts/truetype/noto/NotoSans-Regular.ttf",
-            # فونت‌های در macOS
-            "/System/Library/Fonts/Arial.ttf",
-            "/Library/Fonts/Arial.ttf",
-            # فونت‌های در Windows
-            "C:\\Windows\\Fonts\\arial.ttf",
-            "C:\\Windows\\Fonts\\tahoma.ttf",
-        ]
-        
-        for font_path in font_paths:
-            if os.path.exists(font_path):
-                try:
-                    pdfmetrics.registerFont(TTFont('PersianFont', font_path))
-                    return 'PersianFont'
-                except Exception as e:
-                    continue
-        
-        # اگر هیچ فونت خاصی پیدا نشد، از فونت پیش‌فرض استفاده کن
-        return 'Helvetica'
-    except Exception as e:
-        print(f"خطا در تنظیم فونت: {e}")
-        return 'Helvetica'
+    """نام فونت فارسی ثبت شده برای PDF (فونت یک بار در هر پروسه ثبت می‌شود)"""
+    return get_pdf_resources().font_name
 
-@login_required
-def export_pdf(request):
-    """خروجی PDF از لیست کالاها با در نظر گیری جستجو و فیلترها"""
-    
-    # دریافت همان queryset که در HomeView استفاده می‌شود
-    queryset = Items.objects.select_related('PersonalInfo').all()
-    search_query = request.GET.get('search')
-    brand_search = request.GET.get('brand_search')
-    serial_search = request.GET.get('serial_search')
-    code_search = request.GET.get('code_search')
-    holder_search = request.GET.get('holder_search')
-    type_filter = request.GET.get('type_filter')
-    status_filter = request.GET.get('status_filter')
-    sub_status_filter = request.GET.get('sub_status_filter')
-    
-    # اعمال فیلترها (همان منطق HomeView)
-    if search_query:
-        queryset = queryset.filter(Technical_items__icontains=search_query)
-    if brand_search:
-        queryset = queryset.filter(brand__icontains=brand_search)
-    if serial_search:
-        queryset = queryset.filter(serial_number__icontains=serial_search)
-    if code_search:
-        queryset = queryset.filter(Product_code__icontains=code_search)
-    if holder_search:
-        queryset = queryset.filter(
-            Q(PersonalInfo__name__icontains=holder_search) |
-            Q(PersonalInfo__family__icontains=holder_search) |
-            Q(PersonalInfo__Personnel_number__icontains=holder_search)
-        )
-    if type_filter:
-        queryset = queryset.filter(type_Item=type_filter)
-    if status_filter:
-        queryset = queryset.filter(status_item=status_filter)
-    if sub_status_filter:
-        queryset = queryset.filter(status_sub_item=sub_status_filter)
-    
-    queryset = queryset.order_by('-register_date')
+def report_info_text(item_count):
+    """
+    خط اطلاعات گزارش
+
+    فایل‌های PDF تا تغییر نسخه داده‌ها ذخیره و دوباره ارسال می‌شوند، بنابراین به جای
+    زمان ساخت فایل، زمان آخرین تغییر داده‌ها نمایش داده می‌شود (زمان دریافت در نام فایل است).
+    """
+    parts = []
+    data_time = get_data_version_time()
+    if data_time:
+        parts.append(f"آخرین تغییر داده‌ها: {jalali_converter(timezone.localtime(data_time))}")
+    if item_count > 0:
+        parts.append(f"تعداد کالاها: {item_count}")
+    return fix_persian_text(" | ".join(parts))
+
+def items_pdf_filename(params):
+    """نام فایل PDF گزارش کلی کالاها بر اساس فیلترهای اعمال شده"""
+    search_query = params.get('search')
+    brand_search = params.get('brand_search')
+    serial_search = params.get('serial_search')
+    code_search = params.get('code_search')
+    holder_search = params.get('holder_search')
+    type_filter = params.get('type_filter')
+    status_filter = params.get('status_filter')
+    sub_status_filter = params.get('sub_status_filter')
     
-    # تنظیم نام فایل
     current_time = datetime.now().strftime('%Y%m%d_%H%M%S')
     filename_parts = ['goods_list']
     
@@ -174,21 +90,49 @@ def export_pdf(request):
         filename_parts.append(f'substatus_{sub_status_names.get(sub_status_filter, sub_status_filter)}')
     
     filename_parts.append(current_time)
-    filename = '_'.join(filename_parts) + '.pdf'
+    return '_'.join(filename_parts) + '.pdf'
+
+@login_required
+def export_pdf(request):
+    """خروجی PDF از لیست کالاها با در نظر گیری جستجو و فیلترها"""
+    # ساخت PDF، یا ارسال فایل ذخیره شده همین فیلترها
+    return cached_export_response(
+        ExportJob.KIND_PDF_FULL, request.GET, None,
+        lambda target: build_items_pdf(target, request.GET),
+        items_pdf_filename(request.GET), 'application/pdf',
+    )
+
+def build_items_pdf(target, params, progress=None):
+    """
+    ساخت PDF گزارش کلی کالاها با فیلترهای داده شده
+
+    Args:
+        target: فایل یا response مقصد
+        params: دیکشنری پارامترهای فیلتر
+        progress: تابع اختیاری گزارش تعداد ردیف‌های ساخته شده
+
+    Returns:
+        int: تعداد کالاهای گزارش
+    """
+    search_query = params.get('search')
+    brand_search = params.get('brand_search')
+    serial_search = params.get('serial_search')
+    code_search = params.get('code_search')
+    holder_search = params.get('holder_search')
+    type_filter = params.get('type_filter')
+    status_filter = params.get('status_filter')
+    sub_status_filter = params.get('sub_status_filter')
     
-    # ایجاد response با تنظیمات صحیح برای دانلود
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    response['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-    response['Pragma'] = 'no-cache'
-    response['Expires'] = '0'
+    # اعمال فیلترها (همان منطق HomeView)
+    queryset = apply_item_filters(Items.objects.all(), params)
     
-    # تنظیم فونت
-    font_name = setup_persian_font()
+    # فونت و استایل‌های ثبت شده پروسه
+    resources = get_pdf_resources()
+    font_name = resources.font_name
     
     # ایجاد PDF
     doc = SimpleDocTemplate(
-        response,
+        target,
         pagesize=landscape(A4),
         rightMargin=0.5*inch,
         leftMargin=0.5*inch,
@@ -196,28 +140,9 @@ def export_pdf(request):
         bottomMargin=0.5*inch
     )
     
-    # تنظیم استایل‌ها
-    styles = getSampleStyleSheet()
-    
-    # استایل عنوان
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontName=font_name,
-        fontSize=16,
-        alignment=TA_CENTER,
-        spaceAfter=20,
-        textColor=colors.darkblue
-    )
-    
-    # استایل متن عادی
-    normal_style = ParagraphStyle(
-        'CustomNormal',
-        parent=styles['Normal'],
-        fontName=font_name,
-        fontSize=8,
-        alignment=TA_CENTER
-    )
+    # استایل‌های آماده
+    title_style = resources.title_style
+    normal_style = resources.normal_style
     
     # محتوای PDF
     story = []
@@ -228,11 +153,8 @@ def export_pdf(request):
     story.append(title)
     
     # اطلاعات گزارش
-    report_info = f"تاریخ تولید گزارش: {jalali_converter(datetime.now())}"
-    if queryset.count() > 0:
-        report_info += f" | تعداد کالاها: {queryset.count()}"
-    
-    report_info = fix_persian_text(report_info)
+    item_count = queryset.count()
+    report_info = report_info_text(item_count)
     info_para = Paragraph(report_info, normal_style)
     story.append(info_para)
     story.append(Spacer(1, 20))
@@ -279,7 +201,7 @@ def export_pdf(request):
         story.append(filter_para)
         story.append(Spacer(1, 15))
     
-    if queryset.exists():
+    if item_count > 0:
         # ایجاد جدول
         data = []
         
@@ -297,66 +219,24 @@ def export_pdf(request):
         ]
         data.append(headers)
         
-        # داده‌های جدول
-        for index, item in enumerate(queryset, 1):
-            # نام کالا
-            item_name = fix_persian_text(item.Technical_items or 'تعریف نشده')
-            
-            # نوع کالا
-            item_type = fix_persian_text('فنی' if item.type_Item == 'Technical' else 'غیر فنی' if item.type_Item == 'Non-technical' else 'نامشخص')
-            
-            # برند
-            brand = fix_persian_text(item.brand or 'تعریف نشده')
-            
-            # وضعیت
-            status_display = {
-                'hardware': 'سخت افزار',
-                'Delivery': 'تحویل',
-                'warehouse': 'انبار'
-            }.get(item.status_item, 'نامشخص')
-            
-            if item.status_sub_item:
-                sub_status_display = {
-                    'repair': 'تعمیر',
-                    'upgrade': 'ارتقا',
-                    'external': 'خارج',
-                    'internal': 'داخل',
-                    'ready': 'آماده بکار',
-                    'returned_good': 'عودتی سالم',
-                    'returned_worn': 'عودتی فرسوده'
-                }.get(item.status_sub_item, item.status_sub_item)
-                status_display += f" - {sub_status_display}"
-            
-            status_display = fix_persian_text(status_display)
-            
-            # شماره سریال
-            serial = item.serial_number or 'ندارد'
-            
-            # کد محصول
-            product_code = item.Product_code or 'ندارد'
-            
-            # دارنده حساب
-            if item.PersonalInfo:
-                holder = f"{item.PersonalInfo.name} {item.PersonalInfo.family}"
-                holder = fix_persian_text(holder)
-            else:
-                holder = fix_persian_text('بدون دارنده')
-            
-            # تاریخ ثبت
-            register_date = str(item.jinfo)
-            
-            row = [
-                str(index),
-                item_name[:20] + '...' if len(item_name) > 20 else item_name,
-                item_type,
-                brand[:15] + '...' if len(brand) > 15 else brand,
-                status_display[:20] + '...' if len(status_display) > 20 else status_display,
-                serial[:15] + '...' if len(serial) > 15 else serial,
-                product_code[:12] + '...' if len(product_code) > 12 else product_code,
-                holder[:20] + '...' if len(holder) > 20 else holder,
-                register_date
-            ]
-            data.append(row)
+        # داده‌های جدول - فقط ستون‌های لازم با values_list خوانده می‌شوند
+        columns = compile_columns([
+            'row_number', 'name', 'type', 'brand', 'status_with_sub',
+            'serial', 'product_code', 'holder_name', 'register_date'
+        ])
+        # (تصحیح متن فارسی، حداکثر طول) برای هر ستون
+        cell_formats = [
+            (False, None), (True, 20), (True, None), (True, 15), (True, 20),
+            (False, 15), (False, 12), (True, 20), (True, None),
+        ]
+        for row in columns.iter_rows(queryset, progress=progress):
+            cells = []
+            for value, (persian, max_length) in zip(row, cell_formats):
+                value = fix_persian_text(value) if persian else str(value)
+                if max_length and len(value) > max_length:
+                    value = value[:max_length] + '...'
+                cells.append(value)
+            data.append(cells)
         
         # ایجاد جدول
         table = Table(data, repeatRows=1)
@@ -395,8 +275,9 @@ def export_pdf(request):
     
     # ساخت PDF
     doc.build(story)
+    logger.debug('PDF text shaping cache: %s', shaping_cache_info())
     
-    return response
+    return item_count
 
 @login_required
 def export_pdf_fields_selection(request):
@@ -413,72 +294,28 @@ def export_pdf_fields_selection(request):
     }
     return render(request, 'registration/pdf_fields_selection.html', context)
 
-@login_required
-def generate_pdf(request):
-    """تولید فایل PDF با فیلدهای انتخاب شده"""
-    if request.method != 'POST':
-        return redirect('account:export_pdf_fields_selection')
-    
-    selected_fields = request.POST.getlist('selected_fields')
-    if not selected_fields:
-        messages.error(request, 'لطفاً حداقل یک فیلد را انتخاب کنید.')
-        return redirect('account:export_pdf_fields_selection')
-    
-    # دریافت همان queryset که در HomeView استفاده می‌شود
-    queryset = Items.objects.select_related('PersonalInfo').all()
-    search_query = request.POST.get('search')
-    brand_search = request.POST.get('brand_search')
-    serial_search = request.POST.get('serial_search')
-    code_search = request.POST.get('code_search')
-    holder_search = request.POST.get('holder_search')
-    type_filter = request.POST.get('type_filter')
-    status_filter = request.POST.get('status_filter')
-    sub_status_filter = request.POST.get('sub_status_filter')
-    
-    # اعمال فیلترها
-    if search_query:
-        queryset = queryset.filter(Technical_items__icontains=search_query)
-    if brand_search:
-        queryset = queryset.filter(brand__icontains=brand_search)
-    if serial_search:
-        queryset = queryset.filter(serial_number__icontains=serial_search)
-    if code_search:
-        queryset = queryset.filter(Product_code__icontains=code_search)
-    if holder_search:
-        queryset = queryset.filter(
-            Q(PersonalInfo__name__icontains=holder_search) |
-            Q(PersonalInfo__family__icontains=holder_search) |
-            Q(PersonalInfo__Personnel_number__icontains=holder_search)
-        )
-    if type_filter:
-        queryset = queryset.filter(type_Item=type_filter)
-    if status_filter:
-        queryset = queryset.filter(status_item=status_filter)
-    if sub_status_filter:
-        queryset = queryset.filter(status_sub_item=sub_status_filter)
-    
-    queryset = queryset.order_by('-register_date')
-    
-    # تعریف تمام فیلدهای ممکن
-    all_fields = {
-        'row_number': 'ردیف',
-        'name': 'نام کالا',
-        'type': 'نوع کالا',
-        'brand': 'برند',
-        'configuration': 'پیکربندی',
-        'status': 'وضعیت کالا',
-        'sub_status': 'زیر وضعیت',
-        'serial': 'شماره سریال',
-        'product_code': 'کد محصول',
-        'holder': 'دارنده حساب',
-        'register_date': 'تاریخ ثبت',
-        'update_date': 'تاریخ بروزرسانی',
-    }
-    
-    # فیلتر کردن فیلدهای انتخاب شده
-    selected_field_configs = [(field, all_fields[field]) for field in selected_fields if field in all_fields]
+# تعریف تمام فیلدهای ممکن خروجی PDF
+PDF_EXPORT_FIELDS = {
+    'row_number': 'ردیف',
+    'name': 'نام کالا',
+    'type': 'نوع کالا',
+    'brand': 'برند',
+    'configuration': 'پیکربندی',
+    'status': 'وضعیت کالا',
+    'sub_status': 'زیر وضعیت',
+    'serial': 'شماره سریال',
+    'product_code': 'کد محصول',
+    'holder': 'دارنده حساب',
+    'register_date': 'تاریخ ثبت',
+    'update_date': 'تاریخ بروزرسانی',
+}
+
+def selected_fields_pdf_filename(params):
+    """نام فایل PDF با فیلدهای انتخابی بر اساس فیلترهای اعمال شده"""
+    search_query = params.get('search')
+    brand_search = params.get('brand_search')
+    type_filter = params.get('type_filter')
     
-    # تنظیم نام فایل
     current_time = datetime.now().strftime('%Y%m%d_%H%M%S')
     filename_parts = ['goods_list_custom']
     
@@ -492,21 +329,54 @@ def generate_pdf(request):
         filename_parts.append(f'type_{type_name}')
     
     filename_parts.append(current_time)
-    filename = '_'.join(filename_parts) + '.pdf'
+    return '_'.join(filename_parts) + '.pdf'
+
+@login_required
+def generate_pdf(request):
+    """تولید فایل PDF با فیلدهای انتخاب شده"""
+    if request.method != 'POST':
+        return redirect('account:export_pdf_fields_selection')
+    
+    selected_fields = request.POST.getlist('selected_fields')
+    if not selected_fields:
+        messages.error(request, 'لطفاً حداقل یک فیلد را انتخاب کنید.')
+        return redirect('account:export_pdf_fields_selection')
+    
+    selected_fields = [field for field in selected_fields if field in PDF_EXPORT_FIELDS]
+    
+    # ساخت PDF، یا ارسال فایل ذخیره شده همین فیلترها و فیلدها
+    return cached_export_response(
+        ExportJob.KIND_PDF_FIELDS, request.POST, selected_fields,
+        lambda target: build_selected_fields_pdf(target, request.POST, selected_fields),
+        selected_fields_pdf_filename(request.POST), 'application/pdf',
+    )
+
+def build_selected_fields_pdf(target, params, selected_fields, progress=None):
+    """
+    ساخت PDF کالاها با فیلدهای انتخاب شده
+
+    Args:
+        target: فایل یا response مقصد
+        params: دیکشنری پارامترهای فیلتر
+        selected_fields: کلید فیلدهای انتخاب شده
+        progress: تابع اختیاری گزارش تعداد ردیف‌های ساخته شده
+
+    Returns:
+        int: تعداد کالاهای گزارش
+    """
+    # اعمال فیلترها (همان منطق HomeView)
+    queryset = apply_item_filters(Items.objects.all(), params)
     
-    # ایجاد response با تنظیمات صحیح برای دانلود
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    response['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-    response['Pragma'] = 'no-cache'
-    response['Expires'] = '0'
+    # فیلتر کردن فیلدهای انتخاب شده
+    selected_field_configs = [(field, PDF_EXPORT_FIELDS[field]) for field in selected_fields if field in PDF_EXPORT_FIELDS]
     
-    # تنظیم فونت
-    font_name = setup_persian_font()
+    # فونت و استایل‌های ثبت شده پروسه
+    resources = get_pdf_resources()
+    font_name = resources.font_name
     
     # ایجاد PDF
     doc = SimpleDocTemplate(
-        response,
+        target,
         pagesize=landscape(A4),
         rightMargin=0.5*inch,
         leftMargin=0.5*inch,
@@ -514,26 +384,9 @@ def generate_pdf(request):
         bottomMargin=0.5*inch
     )
     
-    # تنظیم استایل‌ها
-    styles = getSampleStyleSheet()
-    
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontName=font_name,
-        fontSize=16,
-        alignment=TA_CENTER,
-        spaceAfter=20,
-        textColor=colors.darkblue
-    )
-    
-    normal_style = ParagraphStyle(
-        'CustomNormal',
-        parent=styles['Normal'],
-        fontName=font_name,
-        fontSize=8,
-        alignment=TA_CENTER
-    )
+    # استایل‌های آماده
+    title_style = resources.title_style
+    normal_style = resources.normal_style
     
     # محتوای PDF
     story = []
@@ -544,16 +397,13 @@ def generate_pdf(request):
     story.append(title)
     
     # اطلاعات گزارش
-    report_info = f"تاریخ تولید گزارش: {jalali_converter(datetime.now())}"
-    if queryset.count() > 0:
-        report_info += f" | تعداد کالاها: {queryset.count()}"
-    
-    report_info = fix_persian_text(report_info)
+    item_count = queryset.count()
+    report_info = report_info_text(item_count)
     info_para = Paragraph(report_info, normal_style)
     story.append(info_para)
     story.append(Spacer(1, 20))
     
-    if queryset.exists():
+    if item_count > 0:
         # ایجاد جدول با فیلدهای انتخابی
         data = []
         
@@ -561,19 +411,23 @@ def generate_pdf(request):
         headers = [fix_persian_text(field_config[1]) for field_config in selected_field_configs]
         data.append(headers)
         
-        # داده‌های جدول
-        for index, item in enumerate(queryset, 1):
-            row = []
-            for field_key, field_label in selected_field_configs:
-                value = get_pdf_field_value(item, field_key, index)
+        # داده‌های جدول - فقط ستون‌های لازم با values_list خوانده می‌شوند
+        columns = compile_columns(
+            [field_key for field_key, field_label in selected_field_configs],
+            PDF_COLUMN_OVERRIDES
+        )
+        for row in columns.iter_rows(queryset, progress=progress):
+            cells = []
+            for value in row:
                 # تصحیح متن فارسی
-                if isinstance(value, str) and any('\u0600' <= char <= '\u06FF' for char in value):
+                if isinstance(value, str) and has_arabic_script(value):
                     value = fix_persian_text(value)
                 # محدود کردن طول متن برای نمایش بهتر
-                if len(str(value)) > 25:
-                    value = str(value)[:22] + '...'
-                row.append(str(value))
-            data.append(row)
+                value = str(value)
+                if len(value) > 25:
+                    value = value[:22] + '...'
+                cells.append(value)
+            data.append(cells)
         
         # ایجاد جدول
         table = Table(data, repeatRows=1)
@@ -604,45 +458,6 @@ def generate_pdf(request):
     
     # ساخت PDF
     doc.build(story)
+    logger.debug('PDF text shaping cache: %s', shaping_cache_info())
     
-    return response
-
-def get_pdf_field_value(item, field_key, row_index):
-    """دریافت مقدار فیلد برای یک آیتم در PDF"""
-    if field_key == 'row_number':
-        return row_index
-    elif field_key == 'name':
-        return item.Technical_items or 'تعریف نشده'
-    elif field_key == 'type':
-        return 'فنی' if item.type_Item == 'Technical' else 'غیر فنی' if item.type_Item == 'Non-technical' else 'نامشخص'
-    elif field_key == 'brand':
-        return item.brand or 'تعریف نشده'
-    elif field_key == 'configuration':
-        return item.Configuration or 'ندارد'
-    elif field_key == 'status':
-        status_display = {
-            'hardware': 'سخت افزار (تعمیری)',
-            'Delivery': 'تحویل',
-            'warehouse': 'انبار'
-        }.get(item.status_item, 'نامشخص')
-        return status_display
-    elif field_key == 'sub_status':
-        return item.get_status_sub_item_display() if item.status_sub_item else 'ندارد'
-    elif field_key == 'serial':
-        return item.serial_number or 'ندارد'
-    elif field_key == 'product_code':
-        return item.Product_code or 'ندارد'
-    elif field_key == 'holder':
-        if item.PersonalInfo:
-            return f"{item.PersonalInfo.name} {item.PersonalInfo.family} ({item.PersonalInfo.Personnel_number})"
-        else:
-            return 'بدون دارنده'
-    elif field_key == 'register_date':
-        return str(item.jinfo)
-    elif field_key == 'update_date':
-        if item.update_date:
-            return jalali_converter(item.update_date)
-        else:
-            return 'ندارد'
-    else:
-        return ''
\ No newline at end of file
+    return item_count
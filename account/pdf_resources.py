@@ -0,0 +1,148 @@
+"""
+منابع مشترک ساخت PDF در سطح پروسه (فونت فارسی و استایل‌های پاراگراف)
+
+یافتن و خواندن فایل TTF و ساخت استایل‌ها فقط یک بار در هر پروسه انجام می‌شود
+(در AccountConfig.ready یا اولین خروجی PDF) و همه خروجی‌ها از همین نمونه استفاده
+می‌کنند.
+"""
+
+import os
+import threading
+
+from django.conf import settings
+from reportlab.lib import colors
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.pdfbase import pdfmetrics
+
+# Import های سازگار با نسخه‌های مختلف ReportLab
+try:
+    from reportlab.pdfbase.ttfonts import TTFont
+except ImportError:
+    # برای نسخه‌های جدیدتر ReportLab
+    try:
+        from reportlab.lib.fonts import TTFont
+    except ImportError:
+        TTFont = None
+
+try:
+    from reportlab.lib.enums import TA_CENTER, TA_RIGHT
+except ImportError:
+    # برای نسخه‌های جدیدتر ReportLab
+    try:
+        from reportlab.lib.styles import TA_CENTER, TA_RIGHT
+    except ImportError:
+        # تعریف ثابت‌ها به صورت دستی
+        TA_CENTER = 1
+        TA_RIGHT = 2
+
+PERSIAN_FONT_NAME = 'PersianFont'
+DEFAULT_FONT_NAME = 'Helvetica'
+
+# مسیرهای جستجوی فونت در صورت تعیین نشدن PDF_PERSIAN_FONT_PATH
+FONT_SEARCH_PATHS = (
+    # فونت‌های فارسی در Linux
+    "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/TTF/NotoSansFarsi-Regular.ttf",
+    "/usr/share/fonts/truetype/noto/NotoSans-Regular.ttf",
+    # فونت‌های در macOS
+    "/System/Library/Fonts/Arial.ttf",
+    "/Library/Fonts/Arial.ttf",
+    # فونت‌های در Windows
+    "C:\\Windows\\Fonts\\arial.ttf",
+    "C:\\Windows\\Fonts\\tahoma.ttf",
+)
+
+
+class PdfResources:
+    """
+    فونت ثبت شده و استایل‌های آماده PDF
+
+    Attributes:
+        font_name: نام فونت ثبت شده (یا Helvetica)
+        font_path: مسیر فایل فونت (None برای فونت پیش‌فرض)
+        title_style: استایل عنوان گزارش
+        normal_style: استایل متن عادی
+    """
+
+    def __init__(self, font_name, font_path=None):
+        self.font_name = font_name
+        self.font_path = font_path
+
+        styles = getSampleStyleSheet()
+
+        # استایل عنوان
+        self.title_style = ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontName=font_name,
+            fontSize=16,
+            alignment=TA_CENTER,
+            spaceAfter=20,
+            textColor=colors.darkblue
+        )
+
+        # استایل متن عادی
+        self.normal_style = ParagraphStyle(
+            'CustomNormal',
+            parent=styles['Normal'],
+            fontName=font_name,
+            fontSize=8,
+            alignment=TA_CENTER
+        )
+
+
+_resources = None
+_lock = threading.Lock()
+
+
+def font_candidates():
+    """مسیرهای فونت به ترتیب اولویت (ابتدا PDF_PERSIAN_FONT_PATH)"""
+    configured = getattr(settings, 'PDF_PERSIAN_FONT_PATH', None)
+    if configured:
+        return (configured,) + FONT_SEARCH_PATHS
+    return FONT_SEARCH_PATHS
+
+
+def register_persian_font():
+    """
+    ثبت اولین فونت موجود
+
+    Returns:
+        tuple: (نام فونت، مسیر فونت یا None)
+    """
+    if TTFont is None:
+        return DEFAULT_FONT_NAME, None
+
+    for font_path in font_candidates():
+        if os.path.exists(font_path):
+            try:
+                pdfmetrics.registerFont(TTFont(PERSIAN_FONT_NAME, font_path))
+                return PERSIAN_FONT_NAME, font_path
+            except Exception:
+                continue
+
+    # اگر هیچ فونت خاصی پیدا نشد، از فونت پیش‌فرض استفاده کن
+    return DEFAULT_FONT_NAME, None
+
+
+def get_pdf_resources():
+    """منابع PDF پروسه (در اولین فراخوانی ساخته می‌شوند)"""
+    global _resources
+    if _resources is None:
+        with _lock:
+            if _resources is None:
+                try:
+                    font_name, font_path = register_persian_font()
+                except Exception as e:
+                    print(f"خطا در تنظیم فونت: {e}")
+                    font_name, font_path = DEFAULT_FONT_NAME, None
+                _resources = PdfResources(font_name, font_path)
+    return _resources
+
+
+def reset_pdf_resources():
+    """حذف منابع ساخته شده (مثلاً پس از تغییر PDF_PERSIAN_FONT_PATH)"""
+    global _resources
+    with _lock:
+        _resources = None
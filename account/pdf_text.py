@@ -0,0 +1,63 @@
+"""
+تصحیح متن فارسی سلول‌های PDF (reshape و bidi) با حافظه نهان
+
+بیشتر مقادیر سلول‌ها از واژگان محدودی هستند (برچسب‌های نوع و وضعیت، برندها و
+نام دارندگان)، بنابراین نتیجه تصحیح هر متن در یک حافظه نهان LRU با اندازه محدود
+نگهداری می‌شود و متن‌های بدون حروف عربی/فارسی اصلاً پردازش نمی‌شوند.
+"""
+
+import re
+from functools import lru_cache
+
+from django.conf import settings
+
+# برای پشتیبانی از متن فارسی
+try:
+    from arabic_reshaper import reshape
+    from bidi.algorithm import get_display
+    PERSIAN_SUPPORT = True
+except ImportError:
+    PERSIAN_SUPPORT = False
+    print("برای نمایش صحیح فارسی، لطفاً پکیج‌های arabic-reshaper و python-bidi را نصب کنید:")
+    print("pip install arabic-reshaper python-bidi")
+
+# حروف خط عربی/فارسی (بلوک عربی، مکمل‌ها و شکل‌های نمایشی)
+ARABIC_SCRIPT_RE = re.compile('[\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF\uFB50-\uFDFF\uFE70-\uFEFF]')
+
+
+def has_arabic_script(text):
+    """وجود حداقل یک حرف عربی/فارسی در متن"""
+    return ARABIC_SCRIPT_RE.search(text) is not None
+
+
+def _shape(text):
+    try:
+        # تبدیل متن فارسی به فرمت قابل نمایش
+        return get_display(reshape(text))
+    except Exception as e:
+        print(f"خطا در تصحیح متن فارسی: {e}")
+        return text
+
+
+_shape_cached = lru_cache(maxsize=getattr(settings, 'PDF_TEXT_CACHE_SIZE', 4096))(_shape)
+
+
+def fix_persian_text(text):
+    """تصحیح متن فارسی برای نمایش صحیح در PDF"""
+    if not text or not PERSIAN_SUPPORT:
+        return text
+    if not isinstance(text, str):
+        return _shape(text)
+    if not has_arabic_script(text):
+        return text
+    return _shape_cached(text)
+
+
+def shaping_cache_info():
+    """آمار حافظه نهان تصحیح متن (hits, misses, maxsize, currsize)"""
+    return _shape_cached.cache_info()
+
+
+def clear_shaping_cache():
+    """خالی کردن حافظه نهان تصحیح متن"""
+    _shape_cached.cache_clear()
@@ -11,13 +11,17 @@ from .views import (
 from .viewsreq import (
     ItemUpdateViewWithApproval, change_requests_list, change_request_detail, 
     approve_change_request_admin, reject_change_request_admin, bulk_transfer_items,
-    approve_change_request_user, reject_change_request_user, delete_change_request
+    approve_change_request_user, reject_change_request_user, delete_change_request,
+    bulk_approve_change_requests_admin, bulk_reject_change_requests_admin
 )
-from .excel_import_enhanced import process_excel_enhanced, confirm_import_enhanced, get_sub_status_options
-from .excel_comparison import compare_excel_with_items
+from .excel_import_enhanced import (
+    process_excel_enhanced, review_import_batch, confirm_import_enhanced, discard_import_batch, get_sub_status_options
+)
+from .excel_comparison import compare_excel_with_items, comparison_run_detail, apply_comparison_differences
 from .excel_add_items import add_selected_items, get_item_preview
 from .excel_edit_item import edit_item_from_comparison, get_sub_status_options_for_edit, apply_excel_data_to_item
 from .pdf_export import export_pdf, export_pdf_fields_selection, generate_pdf
+from .export_jobs import create_export_job, export_jobs_list, export_job_status, export_job_download
 
 app_name = "account"
 urlpatterns = [
@@ -65,10 +69,18 @@ urlpatterns += [
     path("export/pdf/fields/", export_pdf_fields_selection, name="export_pdf_fields_selection"),
     path("export/pdf/generate/", generate_pdf, name="generate_pdf"),
     path("export/pdf/", export_pdf, name="export_pdf"),
+    path("export/jobs/", export_jobs_list, name="export_jobs"),
+    path("export/jobs/create/", create_export_job, name="create_export_job"),
+    path("export/jobs/<uuid:job_id>/status/", export_job_status, name="export_job_status"),
+    path("export/jobs/<uuid:job_id>/download/", export_job_download, name="export_job_download"),
     path("import/excel/", import_excel, name="import_excel"),
     path("process/excel/", process_excel_enhanced, name="process_excel"),
-    path("confirm/import/", confirm_import_enhanced, name="confirm_import"),
+    path("import/<uuid:batch_id>/", review_import_batch, name="import_batch"),
+    path("import/<uuid:batch_id>/confirm/", confirm_import_enhanced, name="confirm_import"),
+    path("import/<uuid:batch_id>/discard/", discard_import_batch, name="discard_import_batch"),
     path("compare/excel/", compare_excel_with_items, name="compare_excel"),
+    path("compare/<uuid:run_id>/", comparison_run_detail, name="comparison_run"),
+    path("compare/<uuid:run_id>/apply-differences/", apply_comparison_differences, name="apply_comparison_differences"),
     path("add/selected-items/", add_selected_items, name="add_selected_items"),
     path("ajax/item-preview/", get_item_preview, name="get_item_preview"),
     path("ajax/sub-status-options/", get_sub_status_options, name="get_sub_status_options"),
@@ -105,5 +117,7 @@ urlpatterns += [
     path("change-request/<int:request_id>/approve-user/", approve_change_request_user, name="approve_change_request_user"),
     path("change-request/<int:request_id>/reject-user/", reject_change_request_user, name="reject_change_request_user"),
     path("change-request/<int:request_id>/delete/", delete_change_request, name="delete_change_request"),
+    path("change-requests/bulk-approve/", bulk_approve_change_requests_admin, name="bulk_approve_change_requests_admin"),
+    path("change-requests/bulk-reject/", bulk_reject_change_requests_admin, name="bulk_reject_change_requests_admin"),
     path("bulk-transfer/", bulk_transfer_items, name="bulk_transfer_items"),
 ]
\ No newline at end of file
@@ -4,94 +4,42 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView
 from django.urls import reverse_lazy
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse
 from django.db.models import Q, Count
 from django.views.decorators.http import require_POST
 from django.utils import timezone
+from django.conf import settings
 from holder.models import Items, ItemHistory, PersonalInfo, ItemChangeRequest
+from holder.bulk_import import import_items
+from holder.inbox import total_pending_request_count
 from .forms import ItemForm
-import openpyxl
-from openpyxl.styles import Font, Alignment, PatternFill
-from openpyxl.worksheet.properties import WorksheetProperties, PageSetupProperties
-from datetime import datetime
+from .excel_stream import EXCEL_CONTENT_TYPE, build_excel_export, excel_export_columns, excel_export_filename
+from .excel_ingest import ColumnMap, iter_excel_records, holder_personnel_number, to_item_type_code
+from .export_cache import cached_export_response
+from .models import ExportJob, ImportBatch
+from shared.inventory_stats import get_inventory_breakdown, get_item_totals
+from shared.item_filters import apply_item_filters, estimate_filtered_total
+from shared.pagination import keyset_paginate
+from holder.search import search_items_q, find_item_ids
 import json
 
 @login_required
 def dashboard(request):
     """صفحه داشبورد با آمار و نمودارهای کالاها"""
-    # آمار کلی کالاها
-    total_items = Items.objects.count()
-    technical_items = Items.objects.filter(type_Item='Technical').count()
-    non_technical_items = Items.objects.filter(type_Item='Non-technical').count()
+    # آمار کلی کالاها، وضعیت‌ها و زیر وضعیت‌ها از شمارنده‌های موجودی
+    breakdown = get_inventory_breakdown()
+    total_items = breakdown['total_items']
+    technical_items = breakdown['technical_items']
+    non_technical_items = breakdown['non_technical_items']
+    status_stats = breakdown['status_stats']
     
     # آمار درخواست‌های تغییر
     total_change_requests = ItemChangeRequest.objects.count()
-    pending_change_requests = ItemChangeRequest.objects.filter(status='pending').count()
+    pending_change_requests = total_pending_request_count()
     recent_change_requests = ItemChangeRequest.objects.filter(
         created_at__gte=timezone.now() - timezone.timedelta(days=7)
     ).order_by('-created_at')[:5]
     
-    # آمار وضعیت کالاها - تبدیل به لیست برای استفاده در تمپلیت
-    status_stats = []
-    for status_code, status_name in Items.STATUS_CHOICES:
-        count = Items.objects.filter(status_item=status_code).count()
-        percentage = (count / total_items * 100) if total_items > 0 else 0
-        
-        # محاسبه زیر وضعیت‌ها برای این وضعیت
-        sub_statuses = []
-        if status_code in Items.STATUS_SUB_MAPPING:
-            # محاسبه تعداد کل آیتم‌هایی که دارای زیر وضعیت هستند
-            items_with_sub_status = Items.objects.filter(
-                status_item=status_code, 
-                status_sub_item__isnull=False
-            ).count()
-            
-            # محاسبه تعداد آیتم‌هایی که زیر وضعیت ندارند
-            items_without_sub_status = Items.objects.filter(
-                status_item=status_code, 
-                status_sub_item__isnull=True
-            ).count()
-            
-            for sub_code, sub_name in Items.STATUS_SUB_MAPPING[status_code]:
-                sub_count = Items.objects.filter(status_item=status_code, status_sub_item=sub_code).count()
-                # درصد نسبت به کل کالاها
-                percentage_total = (sub_count / total_items * 100) if total_items > 0 else 0
-                # درصد نسبت به وضعیت بالادستی (فقط آیتم‌هایی که دارای زیر وضعیت هستند)
-                percentage_parent = (sub_count / count * 100) if count > 0 else 0
-                # درصد نسبت به آیتم‌هایی که دارای زیر وضعیت هستند
-                percentage_parent_with_sub = (sub_count / items_with_sub_status * 100) if items_with_sub_status > 0 else 0
-                
-                sub_statuses.append({
-                    'code': sub_code,
-                    'name': sub_name,
-                    'count': sub_count,
-                    'percentage_total': round(percentage_total, 2),
-                    'percentage_parent': round(percentage_parent, 2),
-                    'percentage_parent_with_sub': round(percentage_parent_with_sub, 2)
-                })
-            
-            # اضافه کردن آیتم‌هایی که زیر وضعیت ندارند
-            if items_without_sub_status > 0:
-                percentage_total_no_sub = (items_without_sub_status / total_items * 100) if total_items > 0 else 0
-                percentage_parent_no_sub = (items_without_sub_status / count * 100) if count > 0 else 0
-                
-                sub_statuses.append({
-                    'code': 'no_sub_status',
-                    'name': 'بدون زیر وضعیت',
-                    'count': items_without_sub_status,
-                    'percentage_total': round(percentage_total_no_sub, 2),
-                    'percentage_parent': round(percentage_parent_no_sub, 2),
-                    'percentage_parent_with_sub': 0
-                })
-        
-        status_stats.append({
-            'code': status_code,
-            'name': status_name,
-            'count': count,
-            'percentage': round(percentage, 2),
-            'sub_statuses': sub_statuses
-        })
-    
     # دریافت اقلام کاربر جاری
     try:
         current_user = PersonalInfo.objects.get(Personnel_number=request.user.username)
@@ -148,63 +96,42 @@ class HomeView(LoginRequiredMixin, ListView):
     
     def get_queryset(self):
         queryset = Items.objects.select_related('PersonalInfo').all()
-        search_query = self.request.GET.get('search')
-        brand_search = self.request.GET.get('brand_search')
-        serial_search = self.request.GET.get('serial_search')
-        code_search = self.request.GET.get('code_search')
-        holder_search = self.request.GET.get('holder_search')
-        type_filter = self.request.GET.get('type_filter')
-        status_filter = self.request.GET.get('status_filter')
-        sub_status_filter = self.request.GET.get('sub_status_filter')
-        
-        # جستجو در نام کالا
-        if search_query:
-            queryset = queryset.filter(Technical_items__icontains=search_query)
-        
-        # جستجو در برند
-        if brand_search:
-            queryset = queryset.filter(brand__icontains=brand_search)
-        
-        # جستجو در شماره سریال
-        if serial_search:
-            queryset = queryset.filter(serial_number__icontains=serial_search)
-        
-        # جستجو در کد محصول
-        if code_search:
-            queryset = queryset.filter(Product_code__icontains=code_search)
-        
-        # جستجو در دارنده حساب
-        if holder_search:
-            queryset = queryset.filter(
-                Q(PersonalInfo__name__icontains=holder_search) |
-                Q(PersonalInfo__family__icontains=holder_search) |
-                Q(PersonalInfo__Personnel_number__icontains=holder_search)
-            )
-        
-        # یلتر بر اساس نوع کالا
-        if type_filter:
-            queryset = queryset.filter(type_Item=type_filter)
-        
-        # فیلتر بر اساس وضعیت کالا
-        if status_filter:
-            queryset = queryset.filter(status_item=status_filter)
-        
-        # فیلتر بر اساس زیر وضعیت کالا
-        if sub_status_filter:
-            queryset = queryset.filter(status_sub_item=sub_status_filter)
+        return apply_item_filters(queryset, self.request.GET)
+    
+    def use_keyset_pagination(self):
+        """صفحه‌بندی کلیدی با تنظیمات پروژه یا با وجود پارامتر cursor در آدرس فعال می‌شود"""
+        return getattr(settings, 'ITEM_LIST_KEYSET_PAGINATION', False) or 'cursor' in self.request.GET
+    
+    def paginate_queryset(self, queryset, page_size):
+        if not self.use_keyset_pagination():
+            return super().paginate_queryset(queryset, page_size)
         
-        return queryset.order_by('-register_date')
+        # صفحه‌بندی کلیدی روی (register_date, id) بدون COUNT و OFFSET
+        page = keyset_paginate(queryset, token=self.request.GET.get('cursor'), per_page=page_size)
+        return (None, page, page.object_list, False)
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        # آمار کالاها
-        total_items = Items.objects.count()
-        technical_items = Items.objects.filter(type_Item='Technical').count()
-        non_technical_items = Items.objects.filter(type_Item='Non-technical').count()
+        if self.use_keyset_pagination():
+            # پارامترهای فیلتر برای ساخت لینک صفحه بعد/قبل
+            query_params = self.request.GET.copy()
+            query_params.pop('cursor', None)
+            query_params.pop('page', None)
+            context.update({
+                'keyset_page': context['page_obj'],
+                'keyset_query': query_params.urlencode(),
+                'estimated_total': estimate_filtered_total(self.request.GET),
+            })
+        
+        # آمار کالاها از شمارنده‌های موجودی
+        item_totals = get_item_totals()
+        total_items = item_totals['total_items']
+        technical_items = item_totals['technical_items']
+        non_technical_items = item_totals['non_technical_items']
         
         # آمار درخواست‌های تغییر
-        pending_change_requests = ItemChangeRequest.objects.filter(status='pending').count()
+        pending_change_requests = total_pending_request_count()
         
         # لیست افراد برای انتقال دسته‌ای
         all_people = PersonalInfo.objects.all().order_by('name', 'family')
@@ -271,11 +198,10 @@ def ajax_search_items(request):
     search_query = request.GET.get('q', '')
     
     if search_query:
-        items = Items.objects.filter(
-            Q(Technical_items__icontains=search_query) |
-            Q(serial_number__icontains=search_query) |
-            Q(Product_code__icontains=search_query)
-        )[:10]
+        # جستجو از طریق نمایه n-gram بدون مرتب‌سازی، تا فقط ۱۰ نتیجه اول خوانده شود
+        item_ids = find_item_ids(search_query, ['name', 'serial', 'code'], limit=10)
+        items_by_id = Items.objects.in_bulk(item_ids)
+        items = [items_by_id[item_id] for item_id in item_ids if item_id in items_by_id]
         
         results = []
         for item in items:
@@ -348,11 +274,7 @@ def history_view(request):
     
     if search_query:
         items_queryset = items_queryset.filter(
-            Q(Technical_items__icontains=search_query) |
-            Q(serial_number__icontains=search_query) |
-            Q(Product_code__icontains=search_query) |
-            Q(PersonalInfo__name__icontains=search_query) |
-            Q(PersonalInfo__family__icontains=search_query)
+            search_items_q(search_query, ['name', 'serial', 'code', 'holder'])
         )
     
     # فیلتر بر اساس نوع کالا (فنی/غیر فنی)
@@ -376,9 +298,19 @@ def history_view(request):
             item_history = None
     
     # آمار کالاها برای نمایش در فیلتر
-    total_items = items_queryset.count()
-    technical_items = items_queryset.filter(type_Item='Technical').count()
-    non_technical_items = items_queryset.filter(type_Item='Non-technical').count()
+    if search_query:
+        total_items = items_queryset.count()
+        technical_items = items_queryset.filter(type_Item='Technical').count()
+        non_technical_items = items_queryset.filter(type_Item='Non-technical').count()
+    else:
+        # بدون جستجو، آمار از شمارنده‌های موجودی خوانده می‌شود
+        item_totals = get_item_totals()
+        technical_items = item_totals['technical_items'] if type_filter in ('', 'Technical') else 0
+        non_technical_items = item_totals['non_technical_items'] if type_filter in ('', 'Non-technical') else 0
+        if type_filter:
+            total_items = technical_items + non_technical_items
+        else:
+            total_items = item_totals['total_items']
     
     context = {
         'items': items,
@@ -420,395 +352,48 @@ def generate_excel(request):
         messages.error(request, 'لطفاً حداقل یک فیلد را انتخاب کنید.')
         return redirect('account:export_excel_fields_selection')
     
-    # دریافت همان queryset که در HomeView استفاده می‌شود
-    queryset = Items.objects.select_related('PersonalInfo').all()
-    search_query = request.POST.get('search')
-    brand_search = request.POST.get('brand_search')
-    serial_search = request.POST.get('serial_search')
-    code_search = request.POST.get('code_search')
-    holder_search = request.POST.get('holder_search')
-    type_filter = request.POST.get('type_filter')
-    status_filter = request.POST.get('status_filter')
-    sub_status_filter = request.POST.get('sub_status_filter')
-    
-    # اعمال فیلترها (همان منطق HomeView)
-    if search_query:
-        queryset = queryset.filter(Technical_items__icontains=search_query)
-    if brand_search:
-        queryset = queryset.filter(brand__icontains=brand_search)
-    if serial_search:
-        queryset = queryset.filter(serial_number__icontains=serial_search)
-    if code_search:
-        queryset = queryset.filter(Product_code__icontains=code_search)
-    if holder_search:
-        queryset = queryset.filter(
-            Q(PersonalInfo__name__icontains=holder_search) |
-            Q(PersonalInfo__family__icontains=holder_search) |
-            Q(PersonalInfo__Personnel_number__icontains=holder_search)
-        )
-    if type_filter:
-        queryset = queryset.filter(type_Item=type_filter)
-    if status_filter:
-        queryset = queryset.filter(status_item=status_filter)
-    if sub_status_filter:
-        queryset = queryset.filter(status_sub_item=sub_status_filter)
-    
-    queryset = queryset.order_by('-register_date')
-    
-    # تعریف تمام فیلدهای ممکن
-    all_fields = {
-        'row_number': {'header': 'ردیف', 'width': 8},
-        'name': {'header': 'نام کالا', 'width': 25},
-        'type': {'header': 'نوع کالا', 'width': 15},
-        'brand': {'header': 'برند', 'width': 15},
-        'configuration': {'header': 'پیکربندی', 'width': 30},
-        'status': {'header': 'وضعیت کالا', 'width': 15},
-        'sub_status': {'header': 'زیر وضعیت', 'width': 15},
-        'serial': {'header': 'شماره سریال', 'width': 20},
-        'product_code': {'header': 'کد محصول', 'width': 15},
-        'holder': {'header': 'دارنده حساب', 'width': 25},
-        'register_date': {'header': 'تاریخ ثبت', 'width': 20},
-        'update_date': {'header': 'تاریخ بروزرسانی', 'width': 20},
-    }
-    
     # فیلتر کردن فیلدهای انتخاب شده
-    selected_field_configs = [(field, all_fields[field]) for field in selected_fields if field in all_fields]
-    
-    # ایجاد workbook و worksheet
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "لیست کالاها"
-    
-    # تنظیم RTL (راست به چپ) برای worksheet
-    ws.sheet_view.rightToLeft = True
-    
-    # تنظیم عرض ستون‌ها
-    for i, (field_key, field_config) in enumerate(selected_field_configs, 1):
-        ws.column_dimensions[openpyxl.utils.get_column_letter(i)].width = field_config['width']
-    
-    # استایل هدر
-    header_font = Font(bold=True, color="FFFFFF")
-    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-    header_alignment = Alignment(horizontal="center", vertical="center")
-    
-    # نوشتن هدرها
-    for col, (field_key, field_config) in enumerate(selected_field_configs, 1):
-        cell = ws.cell(row=1, column=col, value=field_config['header'])
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = header_alignment
-    
-    # نوشتن داده‌ها
-    for row_num, item in enumerate(queryset, 2):
-        for col, (field_key, field_config) in enumerate(selected_field_configs, 1):
-            value = get_field_value(item, field_key, row_num - 1)
-            ws.cell(row=row_num, column=col, value=value)
-    
-    # تنظیم alignment برای همه سلول‌ها
-    for row in ws.iter_rows():
-        for cell in row:
-            if cell.row > 1:  # به جز هدر
-                cell.alignment = Alignment(horizontal="center", vertical="center")
-    
-    # تنظیم نام فایل
-    current_time = datetime.now().strftime('%Y%m%d_%H%M%S')
-    filename_parts = ['کالاها']
-    
-    # اضافه کردن فیلترها به نام فایل
-    if search_query:
-        filename_parts.append(f'نام_{search_query}')
-    if brand_search:
-        filename_parts.append(f'برند_{brand_search}')
-    if serial_search:
-        filename_parts.append(f'سریال_{serial_search}')
-    if code_search:
-        filename_parts.append(f'کد_{code_search}')
-    if holder_search:
-        filename_parts.append(f'دارنده_{holder_search}')
-    if type_filter:
-        type_name = 'فنی' if type_filter == 'Technical' else 'غیرفنی'
-        filename_parts.append(f'نوع_{type_name}')
-    if status_filter:
-        status_names = {
-            'hardware': 'سخت_افزار',
-            'Delivery': 'تحویل',
-            'warehouse': 'انبار'
-        }
-        filename_parts.append(f'وضعیت_{status_names.get(status_filter, status_filter)}')
-    if sub_status_filter:
-        sub_status_names = {
-            'repair': 'تعمیر',
-            'upgrade': 'ارتقا',
-            'external': 'خارج',
-            'internal': 'داخل',
-            'ready': 'آماده_بکار',
-            'returned_good': 'عودتی_سالم',
-            'returned_worn': 'عودتی_فرسوده'
-        }
-        filename_parts.append(f'زیروضعیت_{sub_status_names.get(sub_status_filter, sub_status_filter)}')
-    
-    filename_parts.append(current_time)
-    filename = '_'.join(filename_parts) + '.xlsx'
+    columns, field_keys = excel_export_columns(selected_fields)
     
-    # ایجاد response
-    response = HttpResponse(
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    # ساخت فایل با workbook حالت write-only، یا ارسال فایل ذخیره شده همین فیلترها و فیلدها
+    return cached_export_response(
+        ExportJob.KIND_EXCEL_FIELDS, request.POST, field_keys,
+        lambda target: build_excel_export(target, request.POST, field_keys),
+        excel_export_filename(request.POST), EXCEL_CONTENT_TYPE,
     )
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    
-    # ذخیره workbook در response
-    wb.save(response)
-    
-    return response
-
-def get_field_value(item, field_key, row_index):
-    """دریافت مقدار فیلد برای یک آیتم"""
-    if field_key == 'row_number':
-        return row_index + 1
-    elif field_key == 'name':
-        return item.Technical_items or 'تعریف نشده'
-    elif field_key == 'type':
-        return 'فنی' if item.type_Item == 'Technical' else 'غیر فنی' if item.type_Item == 'Non-technical' else 'نامشخص'
-    elif field_key == 'brand':
-        return item.brand or 'تعریف نشده'
-    elif field_key == 'configuration':
-        return item.Configuration or 'ندارد'
-    elif field_key == 'status':
-        status_display = {
-            'hardware': 'سخت افزار (تعمیری)',
-            'Delivery': 'تحویل',
-            'warehouse': 'انبار',
-            'Healthy': 'سالم',
-            'Repairing': 'تعمیری', 
-            'worn out': 'فرسوده',
-            'other': 'سایر'
-        }.get(item.status_item, 'نامشخص')
-        return status_display
-    elif field_key == 'sub_status':
-        return item.get_status_sub_item_display() if item.status_sub_item else 'ندارد'
-    elif field_key == 'serial':
-        return item.serial_number or 'ندارد'
-    elif field_key == 'product_code':
-        return item.Product_code or 'ندارد'
-    elif field_key == 'holder':
-        if item.PersonalInfo:
-            return f"{item.PersonalInfo.name} {item.PersonalInfo.family} ({item.PersonalInfo.Personnel_number})"
-        else:
-            return 'بدون دارنده'
-    elif field_key == 'register_date':
-        return str(item.jinfo)
-    elif field_key == 'update_date':
-        if item.update_date:
-            return item.update_date.strftime('%Y/%m/%d %H:%M')
-        else:
-            return 'ندارد'
-    else:
-        return ''
 
 @login_required
 def export_excel(request):
     """خروجی Excel از لیست کالاها با در نظر گیری جستجو و فیلترها - نسخه قدیمی"""
     
-    # دریا��ت همان queryset که در HomeView استفاده می‌شود
-    queryset = Items.objects.select_related('PersonalInfo').all()
-    search_query = request.GET.get('search')
-    brand_search = request.GET.get('brand_search')
-    serial_search = request.GET.get('serial_search')
-    code_search = request.GET.get('code_search')
-    holder_search = request.GET.get('holder_search')
-    type_filter = request.GET.get('type_filter')
-    status_filter = request.GET.get('status_filter')
-    sub_status_filter = request.GET.get('sub_status_filter')
-    
-    # جستجو در نام کالا
-    if search_query:
-        queryset = queryset.filter(Technical_items__icontains=search_query)
-    
-    # جستجو در برند
-    if brand_search:
-        queryset = queryset.filter(brand__icontains=brand_search)
-    
-    # جستجو در شماره سریال
-    if serial_search:
-        queryset = queryset.filter(serial_number__icontains=serial_search)
-    
-    # جستجو در کد محصول
-    if code_search:
-        queryset = queryset.filter(Product_code__icontains=code_search)
-    
-    # ��ستجو در دارنده حساب
-    if holder_search:
-        queryset = queryset.filter(
-            Q(PersonalInfo__name__icontains=holder_search) |
-            Q(PersonalInfo__family__icontains=holder_search) |
-            Q(PersonalInfo__Personnel_number__icontains=holder_search)
-        )
-    
-    # فیلتر بر اساس نوع کالا
-    if type_filter:
-        queryset = queryset.filter(type_Item=type_filter)
-    
-    # فیلتر بر اساس وضعیت کالا
-    if status_filter:
-        queryset = queryset.filter(status_item=status_filter)
-    
-    # فیلتر بر اساس زیر وضعیت کالا
-    if sub_status_filter:
-        queryset = queryset.filter(status_sub_item=sub_status_filter)
-    
-    queryset = queryset.order_by('-register_date')
-    
-    # ایجاد workbook و worksheet
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "لیست کالاها"
-    
-    # تنظیم RTL (راست به چپ) برای worksheet
-    ws.sheet_view.rightToLeft = True
-    
-    # تنظیم عرض ستون‌ها
-    column_widths = [8, 25, 15, 15, 30, 15, 15, 20, 15, 25, 20, 20]
-    for i, width in enumerate(column_widths, 1):
-        ws.column_dimensions[openpyxl.utils.get_column_letter(i)].width = width
-    
-    # استایل هدر
-    header_font = Font(bold=True, color="FFFFFF")
-    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-    header_alignment = Alignment(horizontal="center", vertical="center")
-    
-    # هدرهای جدول
-    headers = [
-        'ردیف', 'نام کالا', 'نوع کالا', 'برند', 'پیکربندی', 
-        'وضعیت کالا', 'زیر وضعیت', 'شماره سریال', 'کد محصول', 'دارنده حساب', 
-        'تاریخ ثبت', 'تاریخ بروزرسانی'
-    ]
-    
-    # نوشتن هدرها
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=header)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = header_alignment
-    
-    # نوشتن داده‌ها
-    for row_num, item in enumerate(queryset, 2):
-        # ردیف
-        ws.cell(row=row_num, column=1, value=row_num - 1)
-        
-        # نام کالا
-        ws.cell(row=row_num, column=2, value=item.Technical_items or 'تعریف نشده')
-        
-        # نوع کالا
-        type_display = 'فنی' if item.type_Item == 'Technical' else 'غیر فنی' if item.type_Item == 'Non-technical' else 'نامشخص'
-        ws.cell(row=row_num, column=3, value=type_display)
-        
-        # برند
-        ws.cell(row=row_num, column=4, value=item.brand or 'تعریف نشده')
-        
-        # پیکربندی
-        ws.cell(row=row_num, column=5, value=item.Configuration or 'ندارد')
-        
-        # وضعیت کالا
-        status_display = {
-            'hardware': 'سخت افزار (تعمیری)',
-            'Delivery': 'تحویل',
-            'warehouse': 'انبار',
-            'Healthy': 'سالم',
-            'Repairing': 'تعمیری', 
-            'worn out': 'فرسوده',
-            'other': 'سایر'
-        }.get(item.status_item, 'نامشخص')
-        ws.cell(row=row_num, column=6, value=status_display)
-        
-        # زیر وضعیت کالا
-        sub_status_display = item.get_status_sub_item_display() if item.status_sub_item else 'ندارد'
-        ws.cell(row=row_num, column=7, value=sub_status_display)
-        
-        # شماره سریال
-        ws.cell(row=row_num, column=8, value=item.serial_number or 'ندارد')
-        
-        # کد محصول
-        ws.cell(row=row_num, column=9, value=item.Product_code or 'ندارد')
-        
-        # دارنده حساب
-        if item.PersonalInfo:
-            holder_name = f"{item.PersonalInfo.name} {item.PersonalInfo.family} ({item.PersonalInfo.Personnel_number})"
-        else:
-            holder_name = 'بدون دارنده'
-        ws.cell(row=row_num, column=10, value=holder_name)
-        
-        # تاریخ ثبت
-        ws.cell(row=row_num, column=11, value=str(item.jinfo))
-        
-        # تاریخ بروزرسانی
-        if item.update_date:
-            update_date_str = item.update_date.strftime('%Y/%m/%d %H:%M')
-        else:
-            update_date_str = 'ندارد'
-        ws.cell(row=row_num, column=12, value=update_date_str)
-    
-    # تنظیم alignment برای همه سلول‌ها
-    for row in ws.iter_rows():
-        for cell in row:
-            if cell.row > 1:  # به جز هدر
-                cell.alignment = Alignment(horizontal="center", vertical="center")
-    
-    # تنظیم نام فایل
-    current_time = datetime.now().strftime('%Y%m%d_%H%M%S')
-    filename_parts = ['کالاها']
-    
-    if search_query:
-        filename_parts.append(f'نام_{search_query}')
-    if brand_search:
-        filename_parts.append(f'برند_{brand_search}')
-    if serial_search:
-        filename_parts.append(f'سریال_{serial_search}')
-    if code_search:
-        filename_parts.append(f'کد_{code_search}')
-    if holder_search:
-        filename_parts.append(f'دارنده_{holder_search}')
-    if type_filter:
-        type_name = 'فنی' if type_filter == 'Technical' else 'غیرفنی'
-        filename_parts.append(f'نوع_{type_name}')
-    if status_filter:
-        status_names = {
-            'hardware': 'سخت_افزار',
-            'Delivery': 'تحویل',
-            'warehouse': 'انبار'
-        }
-        filename_parts.append(f'وضعیت_{status_names.get(status_filter, status_filter)}')
-    
-    if sub_status_filter:
-        sub_status_names = {
-            'repair': 'تعمیر',
-            'upgrade': 'ارتقا',
-            'external': 'خارج',
-            'internal': 'داخل',
-            'ready': 'آماده بکار',
-            'returned_good': 'عودتی_سالم',
-            'returned_worn': 'عودتی_فرسوده'
-        }
-        filename_parts.append(f'زیروضعیت_{sub_status_names.get(sub_status_filter, sub_status_filter)}')
-    
-    filename_parts.append(current_time)
-    filename = '_'.join(filename_parts) + '.xlsx'
-    
-    # ایجاد response
-    response = HttpResponse(
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    # ساخت فایل با همه ستون‌ها، یا ارسال فایل ذخیره شده همین فیلترها
+    return cached_export_response(
+        ExportJob.KIND_EXCEL_FULL, request.GET, None,
+        lambda target: build_excel_export(target, request.GET),
+        excel_export_filename(request.GET), EXCEL_CONTENT_TYPE,
     )
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    
-    # ذخیره workbook در response
-    wb.save(response)
-    
-    return response
-
 
 @login_required
 def import_excel(request):
     """صفحه آپلود فایل Excel"""
-    return render(request, 'registration/import_excel.html')
+    # دسته‌های ورودی که بررسی آن‌ها هنوز تمام نشده و قابل ادامه هستند
+    pending_batches = ImportBatch.objects.filter(
+        user=request.user, status=ImportBatch.STATUS_PENDING
+    )[:10]
+    return render(request, 'registration/import_excel.html', {'pending_batches': pending_batches})
+
+# ترتیب ثابت ستون‌های قالب قدیمی ورود (ستون A شماره ردیف است)؛ مقادیر بدون تغییر خوانده می‌شوند
+LEGACY_IMPORT_COLUMNS = ColumnMap(
+    {
+        'item_name': 1, 'item_type': 2, 'brand': 3, 'configuration': 4,
+        'status': 5, 'serial_number': 6, 'product_code': 7, 'holder_info': 8,
+    },
+    fields=(
+        'item_name', 'item_type', 'brand', 'configuration',
+        'status', 'serial_number', 'product_code', 'holder_info',
+    ),
+    convert=None,
+)
 
 @login_required
 def process_excel(request):
@@ -829,36 +414,24 @@ def process_excel(request):
         return redirect('account:import_excel')
     
     try:
-        # خواندن فایل Excel
-        wb = openpyxl.load_workbook(excel_file)
-        ws = wb.active
-        
         # لیست برای ذخیره داده‌های پردازش شده
         processed_items = []
         errors = []
         
-        # خواندن داده‌ها از ردیف دوم (ردیف اول هدر است)
-        for row_num, row in enumerate(ws.iter_rows(min_row=2, values_only=True), start=2):
-            if not any(row):  # اگر ردیف خالی باشد
-                continue
-                
+        # خواندن جریانی داده‌ها از ردیف دوم (ردیف اول هدر است) با ترتیب ثابت ستون‌ها
+        for row_num, values in iter_excel_records(excel_file, LEGACY_IMPORT_COLUMNS):
             try:
-                # استخراج داده‌ها از ستون‌ها
-                item_name = row[1] if len(row) > 1 else None
-                item_type = row[2] if len(row) > 2 else None
-                brand = row[3] if len(row) > 3 else None
-                configuration = row[4] if len(row) > 4 else None
-                status = row[5] if len(row) > 5 else None
-                serial_number = row[6] if len(row) > 6 else None
-                product_code = row[7] if len(row) > 7 else None
-                holder_info = row[8] if len(row) > 8 else None
+                item_name = values['item_name']
+                item_type = values['item_type']
+                brand = values['brand']
+                configuration = values['configuration']
+                status = values['status']
+                serial_number = values['serial_number']
+                product_code = values['product_code']
+                holder_info = values['holder_info']
                 
                 # تبدیل نوع کالا از فارسی به انگلیسی
-                type_mapping = {
-                    'فنی': 'Technical',
-                    'غیر فنی': 'Non-technical'
-                }
-                item_type_en = type_mapping.get(item_type, 'Technical')
+                item_type_en = to_item_type_code(item_type)
                 
                 # تبدیل وضعیت از فارسی به انگلیسی
                 status_mapping = {
@@ -884,13 +457,9 @@ def process_excel(request):
                 
                 # پردازش اطلاعات دارنده
                 personal_info = None
-                if holder_info and holder_info != 'بدون دارنده':
-                    # استخراج شماره پرسنلی از داخل پرانتز
-                    import re
-                    personnel_match = re.search(r'\((\d+)\)', str(holder_info))
-                    if personnel_match:
-                        personnel_number = personnel_match.group(1)
-                        personal_info = PersonalInfo.objects.filter(Personnel_number=personnel_number).first()
+                personnel_number = holder_personnel_number(holder_info)
+                if personnel_number:
+                    personal_info = PersonalInfo.objects.filter(Personnel_number=personnel_number).first()
                 
                 processed_item = {
                     'row_number': row_num,
@@ -959,61 +528,40 @@ def confirm_import(request):
         messages.error(request, 'داده‌های وارداتی یافت نشد.')
         return redirect('account:import_excel')
     
-    confirmed_items = request.POST.getlist('confirmed_items')
-    
-    success_count = 0
-    error_count = 0
+    confirmed_items = set(request.POST.getlist('confirmed_items'))
     
+    # آماده‌سازی ردیف‌های تأیید شده برای ثبت دسته‌ای
+    rows = []
     for item_data in import_data:
         row_number = str(item_data['row_number'])
         
         if row_number in confirmed_items:
-            try:
-                if item_data['action_type'] == 'create':
-                    # آماده‌سازی داده‌ها برای ایجاد
-                    create_data = item_data['data'].copy()
-                    
-                    # تبدیل PersonalInfo_id به PersonalInfo object
-                    if create_data['PersonalInfo_id']:
-                        try:
-                            personal_info = PersonalInfo.objects.get(id=create_data['PersonalInfo_id'])
-                            create_data['PersonalInfo'] = personal_info
-                        except PersonalInfo.DoesNotExist:
-                            create_data['PersonalInfo'] = None
-                    else:
-                        create_data['PersonalInfo'] = None
-                    
-                    # حذف PersonalInfo_id از داده‌ها
-                    del create_data['PersonalInfo_id']
-                    
-                    # ایجاد کالای جدید
-                    Items.objects.create(**create_data)
-                    success_count += 1
-                    
-                elif item_data['action_type'] == 'update':
-                    # دریافت کالای موجود
-                    existing_item = Items.objects.get(id=item_data['existing_item_id'])
-                    
-                    # به‌روزرسانی فیلدها
-                    for key, value in item_data['data'].items():
-                        if key == 'PersonalInfo_id':
-                            if value:
-                                try:
-                                    personal_info = PersonalInfo.objects.get(id=value)
-                                    existing_item.PersonalInfo = personal_info
-                                except PersonalInfo.DoesNotExist:
-                                    existing_item.PersonalInfo = None
-                            else:
-                                existing_item.PersonalInfo = None
-                        elif value is not None:  # فقط مقادیر غیر خالی را به‌روزرسانی کن
-                            setattr(existing_item, key, value)
-                    
-                    existing_item.save()
-                    success_count += 1
-                    
-            except Exception as e:
-                error_count += 1
-                messages.error(request, f'خطا در پردازش ردیف {row_number}: {str(e)}')
+            data = {}
+            for key, value in item_data['data'].items():
+                if key == 'PersonalInfo_id':
+                    # تبدیل PersonalInfo_id به شماره پرسنلی دارنده
+                    data['PersonalInfo'] = value or None
+                elif value is not None or item_data['action_type'] == 'create':
+                    # در به‌روزرسانی فقط مقادیر غیر خالی اعمال می‌شوند
+                    data[key] = value
+            
+            rows.append({
+                'row_number': row_number,
+                'action_type': item_data['action_type'],
+                'existing_item_id': item_data.get('existing_item_id'),
+                'data': data,
+            })
+    
+    try:
+        result = import_items(rows)
+        success_count = result.success_count
+        error_count = len(result.errors)
+        for row_number, error in result.errors:
+            messages.error(request, f'خطا در پردازش ردیف {row_number}: {error}')
+    except Exception as e:
+        success_count = 0
+        error_count = len(rows)
+        messages.error(request, f'خطا در ثبت داده‌ها: {str(e)}')
     
     # پاک کردن داده‌ها از session
     if 'import_data' in request.session:
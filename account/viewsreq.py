@@ -8,14 +8,20 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic import UpdateView
 from django.urls import reverse_lazy
 from django.contrib import messages
-from django.db.models import Q
+from django.conf import settings
+from django.db.models import Count, Q
 from django.views.decorators.http import require_POST
 from django.utils import timezone
 from holder.models import Items, ItemHistory, PersonalInfo, ItemChangeRequest
 from .forms import ItemForm
+from .bulk_transfer import bulk_transfer
+from shared.bulk_approval import bulk_approve_requests, bulk_reject_requests
+from shared.pagination import keyset_paginate
+from extensions.utils import jalali_converter
 from shared.approval_utils import (
     check_both_parties_approved, approve_item_transfer, approve_item_assignment,
-    approve_item_removal, approve_item_edit, reject_related_requests, get_approval_message
+    approve_item_removal, approve_item_edit, reject_related_requests, get_approval_message,
+    new_transfer_group
 )
 
 
@@ -73,6 +79,9 @@ class ItemUpdateViewWithApproval(LoginRequiredMixin, UpdateView):
                     if new_owner:
                         description += f" به {new_owner.name} {new_owner.family}"
                     
+                    # شناسه مشترک درخواست‌های انتقال و دریافت
+                    transfer_group = new_transfer_group() if new_owner else None
+                    
                     # ایجاد درخواست برای مالک فعلی
                     ItemChangeRequest.objects.create(
                         item=original_obj,
@@ -80,7 +89,8 @@ class ItemUpdateViewWithApproval(LoginRequiredMixin, UpdateView):
                         admin_user=self.request.user.username,
                         action_type=action_type,
                         proposed_changes=changes,
-                        description=description
+                        description=description,
+                        transfer_group=transfer_group
                     )
                     
                     if new_owner:
@@ -91,7 +101,8 @@ class ItemUpdateViewWithApproval(LoginRequiredMixin, UpdateView):
                             admin_user=self.request.user.username,
                             action_type='receive',
                             proposed_changes=changes,
-                            description=f"درخواست دریافت کالا {original_obj.Technical_items} توسط مدیر {self.request.user.username}"
+                            description=f"درخواست دریافت کالا {original_obj.Technical_items} توسط مدیر {self.request.user.username}",
+                            transfer_group=transfer_group
                         )
                         
                         messages.warning(self.request, 
@@ -156,6 +167,23 @@ class ItemUpdateViewWithApproval(LoginRequiredMixin, UpdateView):
             return redirect(self.success_url)
 
 
+ACTION_LABELS = dict(ItemChangeRequest.ACTION_CHOICES)
+STATUS_LABELS = dict(ItemChangeRequest.STATUS_CHOICES)
+
+
+def _prepare_request_rows(change_requests):
+    """مقادیر نمایشی هر ردیف لیست درخواست‌ها (برچسب‌ها، تاریخ شمسی و خلاصه تغییرات)"""
+    for change_request in change_requests:
+        change_request.action_display = ACTION_LABELS.get(change_request.action_type, change_request.action_type)
+        change_request.status_display = STATUS_LABELS.get(change_request.status, change_request.status)
+        change_request.created_display = jalali_converter(change_request.created_at)
+        changes = change_request.proposed_changes
+        change_request.change_lines = [
+            (field, change.get('old') if isinstance(change, dict) else None, change.get('new') if isinstance(change, dict) else None)
+            for field, change in changes.items()
+        ] if isinstance(changes, dict) else []
+
+
 @login_required
 def change_requests_list(request):
     """نمایش لیست درخواست‌های تغییر کالا"""
@@ -180,20 +208,36 @@ def change_requests_list(request):
             Q(admin_user__icontains=search_query)
         )
     
-    requests = requests_queryset.order_by('-created_at')
+    # صفحه‌بندی کلیدی روی (created_at, id) بدون COUNT و OFFSET
+    page = keyset_paginate(
+        requests_queryset,
+        token=request.GET.get('cursor'),
+        per_page=getattr(settings, 'CHANGE_REQUESTS_PAGE_SIZE', 50),
+        ordering=('-created_at', '-id'),
+    )
+    requests = page.object_list
+    _prepare_request_rows(requests)
     
-    # آمار درخواست‌ها
-    total_requests = requests_queryset.count()
-    pending_requests = requests_queryset.filter(status='pending').count()
-    approved_requests = requests_queryset.filter(status='approved').count()
-    rejected_requests = requests_queryset.filter(status='rejected').count()
+    # آمار درخواست‌ها در یک کوئری
+    stats = requests_queryset.aggregate(
+        total=Count('pk'),
+        pending=Count('pk', filter=Q(status='pending')),
+        approved=Count('pk', filter=Q(status='approved')),
+        rejected=Count('pk', filter=Q(status='rejected')),
+    )
+    
+    # پارامترهای فیلتر برای ساخت لینک صفحه بعد/قبل
+    query_params = request.GET.copy()
+    query_params.pop('cursor', None)
     
     context = {
         'requests': requests,
-        'total_requests': total_requests,
-        'pending_requests': pending_requests,
-        'approved_requests': approved_requests,
-        'rejected_requests': rejected_requests,
+        'keyset_page': page,
+        'keyset_query': query_params.urlencode(),
+        'total_requests': stats['total'],
+        'pending_requests': stats['pending'],
+        'approved_requests': stats['approved'],
+        'rejected_requests': stats['rejected'],
         'status_filter': status_filter,
         'action_filter': action_filter,
         'search_query': search_query,
@@ -269,7 +313,7 @@ def approve_change_request_user(request, request_id):
             
             if old_owner_id and new_owner_id:
                 # بررسی اینکه آیا هر دو طرف تایید کرده‌اند
-                both_approved = check_both_parties_approved(item, old_owner_id, new_owner_id)
+                both_approved = check_both_parties_approved(item, old_owner_id, new_owner_id, change_request)
                 
                 if both_approved:
                     # استفاده از shared utility برای انتقال
@@ -455,6 +499,68 @@ def reject_change_request_admin(request, request_id):
         return redirect('account:change_requests_list')
 
 
+def _selected_request_ids(request):
+    """شناسه درخواست‌های انتخاب شده در فرم لیست درخواست‌ها"""
+    return [request_id for request_id in request.POST.getlist('request_ids') if request_id.isdigit()]
+
+
+@require_POST
+@login_required
+def bulk_approve_change_requests_admin(request):
+    """تایید اجباری دسته‌ای درخواست‌های انتخاب شده توسط مدیر"""
+    request_ids = _selected_request_ids(request)
+    if not request_ids:
+        messages.error(request, 'لطفاً حداقل یک درخواست را انتخاب کنید.')
+        return redirect('account:change_requests_list')
+    
+    try:
+        result = bulk_approve_requests(
+            request_ids, request.user.username,
+            include_counterparts=bool(request.POST.get('include_counterparts'))
+        )
+    except Exception as e:
+        messages.error(request, f"خطا در تایید درخواست‌ها: {str(e)}")
+        return redirect('account:change_requests_list')
+    
+    if result.processed:
+        message = f"{result.processed} درخواست به صورت اجباری تایید شد."
+        if result.related:
+            message += f" {result.related} درخواست دریافت مرتبط نیز تایید شد."
+        messages.success(request, message)
+    for change_request, error in result.errors:
+        messages.error(request, f"{change_request.item.Technical_items}: {error}")
+    if not result.processed and not result.errors:
+        messages.info(request, 'هیچ درخواست در انتظاری انتخاب نشده بود.')
+    return redirect('account:change_requests_list')
+
+
+@require_POST
+@login_required
+def bulk_reject_change_requests_admin(request):
+    """رد دسته‌ای درخواست‌های انتخاب شده توسط مدیر"""
+    request_ids = _selected_request_ids(request)
+    if not request_ids:
+        messages.error(request, 'لطفاً حداقل یک درخواست را انتخاب کنید.')
+        return redirect('account:change_requests_list')
+    
+    try:
+        result = bulk_reject_requests(
+            request_ids, include_counterparts=bool(request.POST.get('include_counterparts'))
+        )
+    except Exception as e:
+        messages.error(request, f"خطا در رد درخواست‌ها: {str(e)}")
+        return redirect('account:change_requests_list')
+    
+    if result.processed:
+        message = f"{result.processed} درخواست رد شد."
+        if result.related:
+            message += f" {result.related} درخواست انتقال/دریافت مرتبط نیز رد شد."
+        messages.info(request, message)
+    else:
+        messages.info(request, 'هیچ درخواست در انتظاری انتخاب نشده بود.')
+    return redirect('account:change_requests_list')
+
+
 @require_POST
 @login_required
 def delete_change_request(request, request_id):
@@ -492,71 +598,9 @@ def bulk_transfer_items(request):
         try:
             to_person = PersonalInfo.objects.get(Personnel_number=to_person_id)
             
-            request_count = 0
-            direct_count = 0
-            
-            for item_id in selected_items:
-                try:
-                    item = Items.objects.get(id=item_id)
-                    
-                    if item.PersonalInfo and item.PersonalInfo != to_person:
-                        # ایجاد درخواست تایید برای مالک قبلی و همزمان برای مالک جدید
-                        ItemChangeRequest.objects.create(
-                            item=item,
-                            owner=item.PersonalInfo,
-                            admin_user=request.user.username,
-                            action_type='transfer',
-                            proposed_changes={
-                                'PersonalInfo': {
-                                    'old': f"{item.PersonalInfo.name} {item.PersonalInfo.family}",
-                                    'new': f"{to_person.name} {to_person.family}",
-                                    'old_id': item.PersonalInfo.Personnel_number,
-                                    'new_id': to_person.Personnel_number
-                                }
-                            },
-                            description=description or f'درخواست انتقال کالا از {item.PersonalInfo.name} {item.PersonalInfo.family} به {to_person.name} {to_person.family}'
-                        )
-                        
-                        # همزمان ایجاد درخواست برای مالک جدید
-                        ItemChangeRequest.objects.create(
-                            item=item,
-                            owner=to_person,
-                            admin_user=request.user.username,
-                            action_type='receive',
-                            proposed_changes={
-                                'PersonalInfo': {
-                                    'old': f"{item.PersonalInfo.name} {item.PersonalInfo.family}",
-                                    'new': f"{to_person.name} {to_person.family}",
-                                    'old_id': item.PersonalInfo.Personnel_number,
-                                    'new_id': to_person.Personnel_number
-                                }
-                            },
-                            description=description or f'درخواست دریافت کالا از {item.PersonalInfo.name} {item.PersonalInfo.family}'
-                        )
-                        
-                        request_count += 1
-                    elif not item.PersonalInfo:
-                        # اگر کالا مالک ندارد، درخواست تخصیص ایجاد کن
-                        ItemChangeRequest.objects.create(
-                            item=item,
-                            owner=to_person,
-                            admin_user=request.user.username,
-                            action_type='assign',
-                            proposed_changes={
-                                'PersonalInfo': {
-                                    'old': None,
-                                    'new': f"{to_person.name} {to_person.family}",
-                                    'old_id': None,
-                                    'new_id': to_person.Personnel_number
-                                }
-                            },
-                            description=description or f'درخواست تخصیص دسته‌ای کالا {item.Technical_items} به {to_person.name} {to_person.family}'
-                        )
-                        
-                        direct_count += 1
-                        
-                except Items.DoesNotExist:
-                    continue
+            result = bulk_transfer(selected_items, to_person, request.user.username, description)
+            request_count = result.request_count
+            direct_count = result.direct_count
             
             if request_count > 0:
                 messages.warning(request, 
@@ -7,7 +7,8 @@ from django import forms
 from django.utils.html import format_html
 from django.urls import reverse
 import json
-from shared.approval_utils import approve_item_assignment
+from shared.approval_utils import approve_item_assignment, new_transfer_group
+from shared.bulk_approval import bulk_approve_requests, bulk_reject_requests
 from extensions.jalali import Persian, Gregorian
 import datetime
 
@@ -172,6 +173,9 @@ class ItemInfoAdmin(admin.ModelAdmin):
                         if new_owner:
                             description += f" به {new_owner.name} {new_owner.family}"
                         
+                        # شناسه مشترک درخواست‌های انتقال و دریافت
+                        transfer_group = new_transfer_group() if new_owner else None
+                        
                         # ایجاد درخواست برای مالک فعلی
                         ItemChangeRequest.objects.create(
                             item=original_obj,
@@ -179,7 +183,8 @@ class ItemInfoAdmin(admin.ModelAdmin):
                             admin_user=request.user.username,
                             action_type=action_type,
                             proposed_changes=changes,
-                            description=description
+                            description=description,
+                            transfer_group=transfer_group
                         )
                         
                         if new_owner:
@@ -190,7 +195,8 @@ class ItemInfoAdmin(admin.ModelAdmin):
                                 admin_user=request.user.username,
                                 action_type='receive',
                                 proposed_changes=changes,
-                                description=f"درخواست دریافت کالا {original_obj.Technical_items} توسط مدیر {request.user.username}"
+                                description=f"درخواست دریافت کالا {original_obj.Technical_items} توسط مدیر {request.user.username}",
+                                transfer_group=transfer_group
                             )
                             
                             messages.warning(request, 
@@ -259,6 +265,8 @@ class ItemInfoAdmin(admin.ModelAdmin):
                 
                 for item in queryset:
                     if item.PersonalInfo and item.PersonalInfo != to_person:
+                        transfer_group = new_transfer_group()
+                        
                         # ایجاد درخواست تایید برای مالک قبلی
                         ItemChangeRequest.objects.create(
                             item=item,
@@ -273,7 +281,8 @@ class ItemInfoAdmin(admin.ModelAdmin):
                                     'new_id': to_person.Personnel_number
                                 }
                             },
-                            description=description or f'درخواست انتقال کالا از {item.PersonalInfo.name} {item.PersonalInfo.family} به {to_person.name} {to_person.family}'
+                            description=description or f'درخواست انتقال کالا از {item.PersonalInfo.name} {item.PersonalInfo.family} به {to_person.name} {to_person.family}',
+                            transfer_group=transfer_group
                         )
                         
                         # همزمان ایجاد درخواست تایید برای مالک جدید
@@ -290,7 +299,8 @@ class ItemInfoAdmin(admin.ModelAdmin):
                                     'new_id': to_person.Personnel_number
                                 }
                             },
-                            description=description or f'درخواست دریافت کالا از {item.PersonalInfo.name} {item.PersonalInfo.family}'
+                            description=description or f'درخواست دریافت کالا از {item.PersonalInfo.name} {item.PersonalInfo.family}',
+                            transfer_group=transfer_group
                         )
                         request_count += 1
                     elif not item.PersonalInfo:
@@ -394,6 +404,10 @@ class ItemChangeRequestAdmin(admin.ModelAdmin):
     search_fields = ('item__Technical_items', 'owner__name', 'owner__family', 'admin_user')
     readonly_fields = ('item', 'owner', 'admin_user', 'action_type', 'proposed_changes', 'description', 'created_at')
     ordering = ('-created_at',)
+    actions = [
+        'approve_selected_requests', 'approve_selected_request_pairs',
+        'reject_selected_requests', 'reject_selected_request_pairs',
+    ]
     
     def show_changes(self, obj):
         """نمای�� خلاصه تغییرات"""
@@ -408,6 +422,50 @@ class ItemChangeRequestAdmin(admin.ModelAdmin):
     
     show_changes.short_description = "تغییرات"
     
+    def _approve_requests(self, request, queryset, include_counterparts):
+        result = bulk_approve_requests(
+            queryset.values_list('pk', flat=True), request.user.username,
+            include_counterparts=include_counterparts
+        )
+        if result.processed:
+            message = f"{result.processed} درخواست به صورت اجباری تایید شد."
+            if result.related:
+                message += f" {result.related} درخواست دریافت مرتبط نیز تایید شد."
+            self.message_user(request, message, messages.SUCCESS)
+        for change_request, error in result.errors:
+            self.message_user(request, f"{change_request.item.Technical_items}: {error}", messages.ERROR)
+    
+    def _reject_requests(self, request, queryset, include_counterparts):
+        result = bulk_reject_requests(queryset.values_list('pk', flat=True), include_counterparts=include_counterparts)
+        message = f"{result.processed} درخواست رد شد."
+        if result.related:
+            message += f" {result.related} درخواست انتقال/دریافت مرتبط نیز رد شد."
+        self.message_user(request, message, messages.INFO)
+    
+    def approve_selected_requests(self, request, queryset):
+        """تایید اجباری دسته‌ای درخواست‌های در انتظار انتخاب شده"""
+        self._approve_requests(request, queryset, include_counterparts=False)
+    
+    approve_selected_requests.short_description = "تایید اجباری درخواست‌های انتخاب شده"
+    
+    def approve_selected_request_pairs(self, request, queryset):
+        """تایید اجباری درخواست‌های انتخاب شده همراه با درخواست دریافت جفت انتقال‌ها"""
+        self._approve_requests(request, queryset, include_counterparts=True)
+    
+    approve_selected_request_pairs.short_description = "تایید اجباری درخواست‌های انتخاب شده همراه با درخواست دریافت جفت"
+    
+    def reject_selected_requests(self, request, queryset):
+        """رد دسته‌ای درخواست‌های در انتظار انتخاب شده"""
+        self._reject_requests(request, queryset, include_counterparts=False)
+    
+    reject_selected_requests.short_description = "رد درخواست‌های انتخاب شده"
+    
+    def reject_selected_request_pairs(self, request, queryset):
+        """رد دسته‌ای درخواست‌های انتخاب شده همراه با درخواست جفت انتقال/دریافت آن‌ها"""
+        self._reject_requests(request, queryset, include_counterparts=True)
+    
+    reject_selected_request_pairs.short_description = "رد درخواست‌های انتخاب شده همراه با درخواست جفت انتقال/دریافت"
+    
     def has_add_permission(self, request):
         return False
     
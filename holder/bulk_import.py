@@ -0,0 +1,239 @@
+"""
+ثبت دسته‌ای کالاهای ورودی از Excel
+
+به جای create/save جداگانه برای هر ردیف (که هر کدام اعتبارسنجی clean، signal های
+pre_save/post_save و درج تاریخچه را جداگانه اجرا می‌کنند)، ردیف‌ها ابتدا در حافظه
+اعتبارسنجی و سپس با bulk_create / bulk_update در یک تراکنش نوشته می‌شوند.
+رکوردهای تاریخچه، شمارنده‌های موجودی، نمایه جستجو، نسخه داده و آمار پنل مدیریت
+دقیقاً مانند signal های holder.signals به‌روزرسانی می‌شوند.
+"""
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from .context_processors import invalidate_admin_stats
+from .counters import counter_key_for_item, apply_counter_deltas
+from .models import Items, ItemHistory, PersonalInfo
+from .search import index_items
+from .versioning import bump_data_version
+
+# فیلدهای قابل تغییر از طریق ورود Excel
+IMPORT_FIELDS = (
+    'Technical_items', 'type_Item', 'brand', 'Configuration', 'status_item',
+    'status_sub_item', 'serial_number', 'Product_code', 'PersonalInfo', 'Number',
+)
+
+
+class BulkImportResult:
+    """
+    نتیجه ثبت دسته‌ای
+
+    Attributes:
+        created: تعداد کالاهای ایجاد شده
+        updated: تعداد کالاهای به‌روزرسانی شده
+        errors: لیست (شماره ردیف، متن خطا) برای ردیف‌های ثبت نشده
+    """
+
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.errors = []
+
+    @property
+    def success_count(self):
+        return self.created + self.updated
+
+
+def _validation_message(error):
+    """متن خطای اعتبارسنجی (مانند نمایش str(e) در ثبت تک‌ردیفی)"""
+    return str(error.message_dict if hasattr(error, 'error_dict') else error.messages)
+
+
+def _creation_history(item):
+    """رکورد تاریخچه ایجاد کالا (معادل signal create_item_history)"""
+    person = item.PersonalInfo
+    if person:
+        return ItemHistory(
+            item=item,
+            to_person=person,
+            action_type='assign',
+            description=f'کالا به {person.name} {person.family} تخصیص داده شد.'
+        )
+    return ItemHistory(
+        item=item,
+        to_person=None,
+        action_type='assign',
+        description='کالا بدون تخصیص به شخص خاص ایجاد شد.'
+    )
+
+
+def _transfer_history(item, new_person):
+    """
+    رکورد تاریخچه تخصیص کالای بدون دارنده (معادل signal track_item_changes)
+    """
+    return ItemHistory(
+        item=item,
+        from_person=None,
+        to_person=new_person,
+        action_type='transfer',
+        description=f'کالا از انبار به {new_person.name} {new_person.family} منتقل شد.'
+    )
+
+
+def _load_serial_owners(serials, batch_size):
+    """شماره سریال -> مجموعه شناسه کالاهایی که این سریال را دارند"""
+    owners = {}
+    serials = [serial for serial in set(serials) if serial]
+    for start in range(0, len(serials), batch_size):
+        rows = Items.objects.filter(serial_number__in=serials[start:start + batch_size]).values_list('serial_number', 'pk')
+        for serial, pk in rows:
+            owners.setdefault(serial, set()).add(pk)
+    return owners
+
+
+def import_items(rows, batch_size=None):
+    """
+    اعتبارسنجی و ثبت دسته‌ای ردیف‌های ورودی
+
+    ردیف‌ها به ترتیب ورودی اعتبارسنجی می‌شوند، بنابراین نتیجه (از جمله تکراری بودن
+    شماره سریال بین ردیف‌های همین فایل) با ثبت تک‌تک ردیف‌ها یکسان است؛ ردیف‌های
+    نامعتبر در errors گزارش و بقیه ثبت می‌شوند.
+
+    Args:
+        rows: لیست دیکشنری‌ها با کلیدهای
+            row_number: شماره ردیف برای گزارش خطا
+            action_type: 'create' یا 'update'
+            existing_item_id: شناسه کالا برای به‌روزرسانی
+            data: فیلد -> مقدار (برای PersonalInfo شماره پرسنلی یا None)
+        batch_size: اندازه دسته‌های bulk_create / bulk_update (پیش‌فرض IMPORT_BULK_BATCH_SIZE)
+
+    Returns:
+        BulkImportResult
+    """
+    batch_size = batch_size or getattr(settings, 'IMPORT_BULK_BATCH_SIZE', 500)
+    result = BulkImportResult()
+    rows = list(rows)
+
+    # دریافت یکجای کالاهای در حال به‌روزرسانی و دارندگان حساب
+    update_ids = {row['existing_item_id'] for row in rows if row['action_type'] == 'update' and row.get('existing_item_id')}
+    existing_items = Items.objects.select_related('PersonalInfo').in_bulk(update_ids)
+    personnel_numbers = {row['data'].get('PersonalInfo') for row in rows if row['data'].get('PersonalInfo')}
+    people = PersonalInfo.objects.in_bulk(personnel_numbers)
+
+    serials = [row['data'].get('serial_number') for row in rows]
+    serials.extend(item.serial_number for item in existing_items.values())
+    serial_owners = _load_serial_owners(serials, batch_size)
+
+    new_items = []
+    updated_items = {}
+    original_keys = {}
+    histories = []
+
+    for row in rows:
+        row_number = row['row_number']
+        is_update = row['action_type'] == 'update'
+
+        if is_update:
+            item = existing_items.get(row.get('existing_item_id'))
+            if item is None:
+                result.errors.append((row_number, 'کالای مورد نظر یافت نشد.'))
+                continue
+        elif row['action_type'] == 'create':
+            item = Items()
+        else:
+            continue
+
+        snapshot = {field: getattr(item, field) for field in IMPORT_FIELDS}
+        if is_update and item.pk not in original_keys:
+            original_keys[item.pk] = counter_key_for_item(item)
+        old_person = item.PersonalInfo if is_update else None
+        old_serial = item.serial_number
+
+        try:
+            for field_name, value in row['data'].items():
+                if field_name == 'PersonalInfo':
+                    item.PersonalInfo = people.get(value) if value else None
+                else:
+                    field = Items._meta.get_field(field_name)
+                    value = field.to_python(value)
+                    # مقدار خالی برای فیلد اجباری کل درج دسته‌ای را ناموفق می‌کند
+                    if value is None and not field.null:
+                        raise ValidationError({field_name: field.error_messages['null']})
+                    setattr(item, field_name, value)
+
+            # اعتبارسنجی زیر وضعیت (مانند Items.clean)
+            if item.status_item and item.status_sub_item:
+                valid_sub_choices = Items.STATUS_SUB_MAPPING.get(item.status_item, [])
+                if item.status_sub_item not in [choice[0] for choice in valid_sub_choices]:
+                    raise ValidationError({'status_sub_item': 'زیر مجموعه انتخاب‌شده معتبر نیست.'})
+
+            # یکتایی شماره سریال کالاهای فنی، با در نظر گرفتن ردیف‌های قبلی همین ورود
+            if item.type_Item == 'Technical' and item.serial_number:
+                if serial_owners.get(item.serial_number, set()) - {item.pk}:
+                    raise ValidationError({'serial_number': 'شماره سریال برای کالاهای فنی باید منحصر به فرد باشد.'})
+        except ValidationError as e:
+            for field_name, value in snapshot.items():
+                setattr(item, field_name, value)
+            result.errors.append((row_number, _validation_message(e)))
+            continue
+
+        # مالک قبلی کالا فقط از طریق سیستم تایید قابل تغییر است (مانند track_item_changes)
+        if is_update and old_person != item.PersonalInfo:
+            if old_person:
+                item.PersonalInfo = old_person
+            else:
+                histories.append(_transfer_history(item, item.PersonalInfo))
+
+        # به‌روزرسانی مالکان شماره سریال برای ردیف‌های بعدی
+        owner_token = item.pk if is_update else ('new', len(new_items))
+        if old_serial != item.serial_number or not is_update:
+            if is_update and old_serial:
+                serial_owners.get(old_serial, set()).discard(owner_token)
+            if item.serial_number:
+                serial_owners.setdefault(item.serial_number, set()).add(owner_token)
+
+        if is_update:
+            updated_items[item.pk] = item
+            result.updated += 1
+        else:
+            new_items.append(item)
+            result.created += 1
+
+    if not new_items and not updated_items:
+        return result
+
+    with transaction.atomic():
+        counter_deltas = {}
+        indexed_items = list(updated_items.values())
+
+        if connection.features.can_return_rows_from_bulk_insert:
+            Items.objects.bulk_create(new_items, batch_size=batch_size)
+            histories.extend(_creation_history(item) for item in new_items)
+            for item in new_items:
+                key = counter_key_for_item(item)
+                counter_deltas[key] = counter_deltas.get(key, 0) + 1
+            indexed_items.extend(new_items)
+        else:
+            # بدون امکان دریافت شناسه‌ها از درج دسته‌ای (مثلاً MySQL)، کالاهای جدید
+            # تک‌تک ذخیره می‌شوند و تاریخچه، شمارنده و نمایه آن‌ها توسط signal ها ثبت می‌شود
+            for item in new_items:
+                super(Items, item).save()
+
+        if updated_items:
+            Items.objects.bulk_update(list(updated_items.values()), IMPORT_FIELDS, batch_size=batch_size)
+            for pk, item in updated_items.items():
+                old_key = original_keys[pk]
+                new_key = counter_key_for_item(item)
+                if old_key != new_key:
+                    counter_deltas[old_key] = counter_deltas.get(old_key, 0) - 1
+                    counter_deltas[new_key] = counter_deltas.get(new_key, 0) + 1
+
+        if histories:
+            ItemHistory.objects.bulk_create(histories, batch_size=batch_size)
+
+        apply_counter_deltas(counter_deltas)
+        index_items(indexed_items)
+        bump_data_version()
+        invalidate_admin_stats()
+
+    return result
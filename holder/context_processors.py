@@ -1,5 +1,70 @@
+from django.conf import settings
+from django.core.cache import cache
 from django.db.models import Count, Q
-from .models import PersonalInfo, Items, Documents, Mission, Results
+from .models import PersonalInfo, Documents, Mission, Results
+from shared.inventory_stats import get_item_totals
+
+ADMIN_STATS_CACHE_KEY = 'holder:admin_stats'
+
+EMPTY_ADMIN_STATS = {
+    'total_persons': 0,
+    'total_items': 0,
+    'items_in_repair': 0,
+    'items_in_warehouse': 0,
+    'items_in_delivery': 0,
+    'total_documents': 0,
+    'total_missions': 0,
+    'total_results': 0,
+    'active_persons': 0,
+    'technical_items': 0,
+    'non_technical_items': 0,
+    'online_trainings': 0,
+    'offline_trainings': 0,
+}
+
+
+def compute_admin_stats():
+    """
+    محاسبه آمار پنل مدیریت با کوئری‌های تجمیعی
+    آمار کالاها از شمارنده‌های موجودی و آمار افراد و مدارک هر کدام با یک کوئری خوانده می‌شود.
+    """
+    item_totals = get_item_totals()
+
+    person_stats = PersonalInfo.objects.aggregate(
+        total_persons=Count('pk', distinct=True),
+        active_persons=Count('pk', filter=Q(items__isnull=False), distinct=True),
+    )
+
+    document_stats = Documents.objects.aggregate(
+        total_documents=Count('pk'),
+        online_trainings=Count('pk', filter=Q(Type_of_training='online')),
+        offline_trainings=Count('pk', filter=Q(Type_of_training='offline')),
+    )
+
+    return {
+        'total_persons': person_stats['total_persons'],
+        'total_items': item_totals['total_items'],
+        'items_in_repair': item_totals['status_counts'].get('hardware', 0),
+        'items_in_warehouse': item_totals['status_counts'].get('warehouse', 0),
+        'items_in_delivery': item_totals['status_counts'].get('Delivery', 0),
+        'total_documents': document_stats['total_documents'],
+        'total_missions': Mission.objects.count(),
+        'total_results': Results.objects.count(),
+        'active_persons': person_stats['active_persons'],
+        'technical_items': item_totals['technical_items'],
+        'non_technical_items': item_totals['non_technical_items'],
+        'online_trainings': document_stats['online_trainings'],
+        'offline_trainings': document_stats['offline_trainings'],
+    }
+
+
+def invalidate_admin_stats():
+    """
+    پاک کردن آمار ذخیره شده پنل مدیریت از cache
+    (بدون CACHES مشترک، فقط cache همین پروسه پاک می‌شود)
+    """
+    cache.delete(ADMIN_STATS_CACHE_KEY)
+
 
 def admin_stats(request):
     """
@@ -7,58 +72,13 @@ def admin_stats(request):
     """
     if not request.path.startswith('/admin/'):
         return {}
-    
+
     try:
-        # Calculate statistics
-        total_persons = PersonalInfo.objects.count()
-        total_items = Items.objects.count()
-        items_in_repair = Items.objects.filter(status_item='hardware').count()
-        items_in_warehouse = Items.objects.filter(status_item='warehouse').count()
-        items_in_delivery = Items.objects.filter(status_item='Delivery').count()
-        total_documents = Documents.objects.count()
-        total_missions = Mission.objects.count()
-        total_results = Results.objects.count()
-        
-        # Additional statistics
-        active_persons = PersonalInfo.objects.annotate(
-            items_count=Count('items')
-        ).filter(items_count__gt=0).count()
-        
-        technical_items = Items.objects.filter(type_Item='Technical').count()
-        non_technical_items = Items.objects.filter(type_Item='Non-technical').count()
-        
-        online_trainings = Documents.objects.filter(Type_of_training='online').count()
-        offline_trainings = Documents.objects.filter(Type_of_training='offline').count()
-        
-        return {
-            'total_persons': total_persons,
-            'total_items': total_items,
-            'items_in_repair': items_in_repair,
-            'items_in_warehouse': items_in_warehouse,
-            'items_in_delivery': items_in_delivery,
-            'total_documents': total_documents,
-            'total_missions': total_missions,
-            'total_results': total_results,
-            'active_persons': active_persons,
-            'technical_items': technical_items,
-            'non_technical_items': non_technical_items,
-            'online_trainings': online_trainings,
-            'offline_trainings': offline_trainings,
-        }
+        stats = cache.get(ADMIN_STATS_CACHE_KEY)
+        if stats is None:
+            stats = compute_admin_stats()
+            cache.set(ADMIN_STATS_CACHE_KEY, stats, getattr(settings, 'ADMIN_STATS_CACHE_TIMEOUT', 60))
+        return stats
     except Exception as e:
         # Return empty stats if there's an error (e.g., during migrations)
-        return {
-            'total_persons': 0,
-            'total_items': 0,
-            'items_in_repair': 0,
-            'items_in_warehouse': 0,
-            'items_in_delivery': 0,
-            'total_documents': 0,
-            'total_missions': 0,
-            'total_results': 0,
-            'active_persons': 0,
-            'technical_items': 0,
-            'non_technical_items': 0,
-            'online_trainings': 0,
-            'offline_trainings': 0,
-        }
\ No newline at end of file
+        return dict(EMPTY_ADMIN_STATS)
@@ -0,0 +1,91 @@
+"""
+ابزارهای نگهداری شمارنده‌های تجمیعی موجودی (InventoryCounter)
+"""
+
+from django.db import IntegrityError, transaction
+from django.db.models import BooleanField, Count, ExpressionWrapper, F, Q
+from .models import Items, InventoryCounter
+
+
+def item_counter_key(type_item, status_item, status_sub_item, holder_id):
+    """ساخت کلید شمارنده از مقادیر فیلدهای کالا"""
+    return (type_item or '', status_item or '', status_sub_item or '', holder_id is not None)
+
+
+def counter_key_for_item(item):
+    """کلید شمارنده برای یک نمونه کالا"""
+    return item_counter_key(item.type_Item, item.status_item, item.status_sub_item, item.PersonalInfo_id)
+
+
+def apply_counter_deltas(deltas):
+    """
+    اعمال تغییرات روی شمارنده‌ها
+
+    Args:
+        deltas: دیکشنری {کلید شمارنده: مقدار تغییر}
+    """
+    for key, delta in deltas.items():
+        if not delta:
+            continue
+        type_item, status_item, status_sub_item, has_holder = key
+        lookup = {
+            'type_Item': type_item,
+            'status_item': status_item,
+            'status_sub_item': status_sub_item,
+            'has_holder': has_holder,
+        }
+        updated = InventoryCounter.objects.filter(**lookup).update(count=F('count') + delta)
+        if not updated:
+            try:
+                with transaction.atomic():
+                    InventoryCounter.objects.create(count=delta, **lookup)
+            except IntegrityError:
+                # شمارنده همزمان توسط درخواست دیگری ایجاد شده است
+                InventoryCounter.objects.filter(**lookup).update(count=F('count') + delta)
+
+
+def rebuild_inventory_counters():
+    """
+    بازسازی کامل شمارنده‌ها از روی جدول کالاها
+
+    Returns:
+        int: تعداد ردیف‌های شمارنده ایجاد شده
+    """
+    rows = Items.objects.order_by().annotate(
+        has_holder=ExpressionWrapper(Q(PersonalInfo__isnull=False), output_field=BooleanField())
+    ).values(
+        'type_Item', 'status_item', 'status_sub_item', 'has_holder'
+    ).annotate(count=Count('id'))
+
+    totals = {}
+    for row in rows:
+        key = item_counter_key(
+            row['type_Item'], row['status_item'], row['status_sub_item'],
+            True if row['has_holder'] else None
+        )
+        totals[key] = totals.get(key, 0) + row['count']
+
+    with transaction.atomic():
+        InventoryCounter.objects.all().delete()
+        InventoryCounter.objects.bulk_create([
+            InventoryCounter(
+                type_Item=key[0], status_item=key[1], status_sub_item=key[2],
+                has_holder=key[3], count=count
+            )
+            for key, count in totals.items()
+        ])
+    return len(totals)
+
+
+def get_counter_rows():
+    """
+    دریافت ردیف‌های شمارنده به صورت (type_Item, status_item, status_sub_item, count)
+    زیر وضعیت خالی به None تبدیل می‌شود.
+    """
+    rows = InventoryCounter.objects.filter(count__gt=0).values_list(
+        'type_Item', 'status_item', 'status_sub_item', 'has_holder', 'count'
+    )
+    return [
+        (type_item, status_item, status_sub_item or None, has_holder, count)
+        for type_item, status_item, status_sub_item, has_holder, count in rows
+    ]
@@ -0,0 +1,83 @@
+"""
+صندوق درخواست‌های در انتظار تایید هر دارنده و شمارش ذخیره شده آن‌ها
+
+تعداد درخواست‌های در انتظار هر دارنده (و تعداد کل برای پنل مدیریت) در cache
+نگهداری می‌شود تا نشان‌های تعداد در داشبورد و صفحات لیست به پایگاه داده مراجعه
+نکنند. ذخیره و حذف هر درخواست تغییر (signal های holder.signals) و مسیرهای
+دسته‌ای که signal ندارند (bulk_create / update) شمارش‌های مربوط را پس از commit
+تراکنش پاک می‌کنند.
+
+این شمارش‌ها فقط برای نشان‌ها هستند و لیست درخواست‌ها همیشه از پایگاه داده خوانده
+می‌شود: بدون تنظیم CACHES مشترک، هر پروسه cache جداگانه (LocMemCache) دارد و
+پاک شدن شمارش در یک پروسه به پروسه‌های دیگر نمی‌رسد؛ در این حالت نشان‌ها تا
+PENDING_REQUESTS_CACHE_TIMEOUT ثانیه ممکن است قدیمی باشند.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from shared.pagination import keyset_paginate
+from .models import ItemChangeRequest
+
+PENDING_COUNT_CACHE_KEY = 'holder:pending_requests:{}'
+TOTAL_PENDING_CACHE_KEY = 'holder:pending_requests'
+
+# مرتب‌سازی صندوق؛ با ایندکس change_req_owner_idx روی (owner, status, created_at)
+INBOX_ORDERING = ('-created_at', '-id')
+
+
+def _cache_timeout():
+    return getattr(settings, 'PENDING_REQUESTS_CACHE_TIMEOUT', 300)
+
+
+def pending_requests_for(owner_id):
+    """درخواست‌های در انتظار تایید یک دارنده"""
+    return ItemChangeRequest.objects.filter(owner_id=owner_id, status='pending')
+
+
+def pending_request_count(owner_id):
+    """تعداد درخواست‌های در انتظار تایید یک دارنده (از cache)"""
+    key = PENDING_COUNT_CACHE_KEY.format(owner_id)
+    count = cache.get(key)
+    if count is None:
+        count = pending_requests_for(owner_id).count()
+        cache.set(key, count, _cache_timeout())
+    return count
+
+
+def total_pending_request_count():
+    """تعداد کل درخواست‌های در انتظار تایید (از cache)"""
+    count = cache.get(TOTAL_PENDING_CACHE_KEY)
+    if count is None:
+        count = ItemChangeRequest.objects.filter(status='pending').count()
+        cache.set(TOTAL_PENDING_CACHE_KEY, count, _cache_timeout())
+    return count
+
+
+def invalidate_pending_counts(owner_ids):
+    """
+    پاک کردن شمارش ذخیره شده دارندگان داده شده و تعداد کل از cache
+
+    پاک کردن پس از commit تراکنش جاری انجام می‌شود تا خواندن همزمان پیش از commit
+    تعداد قدیمی را دوباره در cache ذخیره نکند (خارج از تراکنش، بلافاصله).
+    """
+    keys = [PENDING_COUNT_CACHE_KEY.format(owner_id) for owner_id in set(owner_ids) if owner_id]
+    keys.append(TOTAL_PENDING_CACHE_KEY)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def inbox_page(owner_id, token=None, per_page=None):
+    """
+    یک صفحه از درخواست‌های در انتظار دارنده (جدیدترین ابتدا) با صفحه‌بندی کلیدی
+
+    Returns:
+        KeysetPage
+    """
+    if per_page is None:
+        per_page = getattr(settings, 'HOLDER_INBOX_PAGE_SIZE', 20)
+    queryset = pending_requests_for(owner_id).select_related('item').only(
+        'id', 'action_type', 'admin_user', 'description', 'proposed_changes',
+        'created_at', 'item__id', 'item__Technical_items',
+    )
+    return keyset_paginate(queryset, token=token, per_page=per_page, ordering=INBOX_ORDERING)
@@ -0,0 +1,171 @@
+import os
+import random
+import re
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from holder.models import Items, PersonalInfo
+
+
+class Command(BaseCommand):
+    help = (
+        'مقایسه طرح اجرای کوئری‌های پرتکرار کالاها قبل و بعد از ایندکس‌ها '
+        'روی یک پایگاه داده SQLite موقت با داده‌های ساختگی'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=500000, help='تعداد کالاهای ساختگی')
+        parser.add_argument('--people', type=int, default=2000, help='تعداد افراد ساختگی')
+        parser.add_argument('--repeat', type=int, default=20, help='تعداد تکرار هر کوئری برای زمان‌سنجی')
+        parser.add_argument('--path', default=None, help='مسیر فایل SQLite (پیش‌فرض: فایل موقت)')
+        parser.add_argument('--keep', action='store_true', help='فایل پایگاه داده پس از اجرا حذف نشود')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            self.stderr.write('این بنچمارک فقط با پایگاه داده پیش‌فرض SQLite قابل اجراست.')
+            return
+
+        path = options['path'] or os.path.join(tempfile.gettempdir(), 'benchmark_item_indexes.sqlite3')
+        if os.path.exists(path):
+            os.remove(path)
+
+        table_sql, index_sql = self.get_schema_sql()
+        db = sqlite3.connect(path)
+        try:
+            for statement in table_sql:
+                db.execute(statement)
+
+            self.stdout.write(f'ایجاد {options["items"]} کالای ساختگی در {path} ...')
+            self.seed(db, options['items'], options['people'])
+            db.execute('ANALYZE')
+
+            queries = self.get_benchmark_queries(options['items'])
+            before = self.run_queries(db, queries, options['repeat'])
+
+            for statement in index_sql:
+                db.execute(statement)
+            db.execute('ANALYZE')
+            after = self.run_queries(db, queries, options['repeat'])
+
+            self.report(queries, before, after)
+        finally:
+            db.close()
+            if not options['keep']:
+                os.remove(path)
+
+    def get_schema_sql(self):
+        """دریافت SQL ایجاد جداول و ایندکس‌های تعریف شده در Meta کالاها"""
+        with connection.schema_editor(collect_sql=True, atomic=False) as editor:
+            editor.create_model(PersonalInfo)
+            editor.create_model(Items)
+
+        meta_index_names = {index.name for index in Items._meta.indexes}
+        table_sql = []
+        index_sql = []
+        for statement in editor.collected_sql:
+            statement = statement.rstrip(';')
+            if any(f'"{name}"' in statement for name in meta_index_names):
+                index_sql.append(statement)
+            else:
+                table_sql.append(statement)
+        return table_sql, index_sql
+
+    def seed(self, db, item_count, people_count):
+        """درج داده‌های ساختگی افراد و کالاها"""
+        random.seed(1404)
+        now = datetime(2025, 1, 1)
+
+        db.executemany(
+            'INSERT INTO holder_personalinfo (name, family, "Personnel_number", "National_ID", date_of_birth, '
+            'email, phone_number, date_created, "Educational_degree", password) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (
+                (f'نام{i}', f'خانواده{i}', f'{100000000 + i}', f'{1000000000 + i}', '1990-01-01',
+                 None, '09120000000', now.isoformat(), 'b', 'x')
+                for i in range(people_count)
+            )
+        )
+
+        statuses = [(status, [code for code, label in Items.STATUS_SUB_MAPPING[status]] + [None])
+                    for status, label in Items.STATUS_CHOICES]
+
+        def rows():
+            for i in range(item_count):
+                status, sub_choices = statuses[i % len(statuses)]
+                is_technical = i % 3 != 0
+                register_date = now + timedelta(seconds=i)
+                yield (
+                    f'کالا {i}',
+                    'Technical' if is_technical else 'Non-technical',
+                    status,
+                    1,
+                    random.choice(sub_choices),
+                    f'برند {i % 50}',
+                    None,
+                    f'SN{i:08d}' if is_technical else None,
+                    f'PC{i % (item_count // 4 or 1):07d}',
+                    register_date.isoformat(),
+                    register_date.isoformat(),
+                    f'{100000000 + (i % people_count)}' if i % 4 else None,
+                )
+
+        db.executemany(
+            'INSERT INTO holder_items ("Technical_items", "type_Item", status_item, "Number", status_sub_item, '
+            'brand, "Configuration", serial_number, "Product_code", register_date, update_date, "PersonalInfo_id") '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            rows()
+        )
+        db.commit()
+
+    def get_benchmark_queries(self, item_count):
+        """کوئری‌های پرتکرار کالاها، ساخته شده با ORM"""
+        probe = item_count // 2
+        probe_serial = f'SN{probe + (1 if probe % 3 == 0 else 0):08d}'
+        # کد محصولی که وجود ندارد (ردیف جدید Excel) بدترین حالت جستجو است
+        probe_code = 'PC-missing'
+        querysets = [
+            ('Items.clean: serial uniqueness',
+             Items.objects.filter(serial_number=probe_serial).exclude(pk=1).values('id')[:1]),
+            ('Excel import: lookup by Product_code (new row)',
+             Items.objects.filter(Product_code=probe_code).values('id')[:1]),
+            ('Excel comparison: Product_code + type (new row)',
+             Items.objects.filter(Product_code=probe_code, type_Item='Non-technical').values('id')[:1]),
+            ('HomeView: default ordering',
+             Items.objects.order_by('-register_date').values('id')[:10]),
+            ('HomeView: type filter',
+             Items.objects.filter(type_Item='Technical').order_by('-register_date').values('id')[:10]),
+            ('HomeView: status + sub-status filter',
+             Items.objects.filter(status_item='warehouse', status_sub_item='ready').order_by('-register_date').values('id')[:10]),
+        ]
+        queries = []
+        for label, queryset in querysets:
+            sql, params = queryset.query.sql_with_params()
+            # تبدیل placeholder های Django به قالب ماژول sqlite3
+            sql = re.sub(r'(?<!%)%s', '?', sql).replace('%%', '%')
+            queries.append((label, sql, params))
+        return queries
+
+    def run_queries(self, db, queries, repeat):
+        """اجرای کوئری‌ها و ثبت طرح اجرا و میانگین زمان"""
+        results = []
+        for label, sql, params in queries:
+            plan = [row[-1] for row in db.execute(f'EXPLAIN QUERY PLAN {sql}', params)]
+            start = time.perf_counter()
+            for _ in range(repeat):
+                db.execute(sql, params).fetchall()
+            elapsed_ms = (time.perf_counter() - start) * 1000 / repeat
+            results.append((plan, elapsed_ms))
+        return results
+
+    def report(self, queries, before, after):
+        for (label, sql, params), (plan_before, ms_before), (plan_after, ms_after) in zip(queries, before, after):
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            self.stdout.write(f'  قبل: {ms_before:.3f} ms')
+            for line in plan_before:
+                self.stdout.write(f'    {line}')
+            self.stdout.write(f'  بعد: {ms_after:.3f} ms')
+            for line in plan_after:
+                self.stdout.write(f'    {line}')
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from holder.counters import rebuild_inventory_counters
+
+
+class Command(BaseCommand):
+    help = 'بازسازی کامل شمارنده‌های موجودی کالاها از روی جدول کالاها'
+
+    def handle(self, *args, **options):
+        rows = rebuild_inventory_counters()
+        self.stdout.write(self.style.SUCCESS(f'{rows} ردیف شمارنده موجودی بازسازی شد.'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from holder.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'بازسازی کامل نمایه جستجوی n-gram کالاها از روی جدول کالاها'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000, help='تعداد کالاهای پردازش شده در هر مرحله')
+
+    def handle(self, *args, **options):
+        total = rebuild_search_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'نمایه جستجوی {total} کالا بازسازی شد.'))
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.1 on 2026-10-18 12:38
+
+from django.db import migrations, models
+from django.db.models import BooleanField, Count, ExpressionWrapper, Q
+
+
+def populate_inventory_counters(apps, schema_editor):
+    Items = apps.get_model('holder', 'Items')
+    InventoryCounter = apps.get_model('holder', 'InventoryCounter')
+
+    rows = Items.objects.order_by().annotate(
+        has_holder=ExpressionWrapper(Q(PersonalInfo__isnull=False), output_field=BooleanField())
+    ).values('type_Item', 'status_item', 'status_sub_item', 'has_holder').annotate(count=Count('id'))
+
+    totals = {}
+    for row in rows:
+        key = (row['type_Item'] or '', row['status_item'] or '', row['status_sub_item'] or '', bool(row['has_holder']))
+        totals[key] = totals.get(key, 0) + row['count']
+
+    InventoryCounter.objects.bulk_create([
+        InventoryCounter(type_Item=key[0], status_item=key[1], status_sub_item=key[2], has_holder=key[3], count=count)
+        for key, count in totals.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('holder', '0028_items_number'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventoryCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('type_Item', models.CharField(max_length=50, verbose_name='نوع کالا')),
+                ('status_item', models.CharField(max_length=50, verbose_name='وضعیت کالا')),
+                ('status_sub_item', models.CharField(blank=True, default='', max_length=50, verbose_name='زیر مجموعه وضعیت')),
+                ('has_holder', models.BooleanField(default=False, verbose_name='دارای دارنده')),
+                ('count', models.IntegerField(default=0, verbose_name='تعداد')),
+            ],
+            options={
+                'verbose_name': 'شمارنده موجودی',
+                'verbose_name_plural': 'شمارنده\u200cهای موجودی',
+                'constraints': [models.UniqueConstraint(fields=('type_Item', 'status_item', 'status_sub_item', 'has_holder'), name='unique_inventory_counter_key')],
+            },
+        ),
+        migrations.RunPython(populate_inventory_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.1 on 2026-10-18 12:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('holder', '0029_inventorycounter'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='items',
+            index=models.Index(fields=['serial_number'], name='items_serial_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='items',
+            index=models.Index(fields=['Product_code', 'type_Item'], name='items_code_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='items',
+            index=models.Index(fields=['status_item', 'status_sub_item', '-register_date'], name='items_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='items',
+            index=models.Index(fields=['type_Item', '-register_date'], name='items_type_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='items',
+            index=models.Index(fields=['-register_date'], name='items_register_date_idx'),
+        ),
+    ]
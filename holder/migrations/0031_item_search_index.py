@@ -0,0 +1,131 @@
+# Generated by Django 5.2.1 on 2026-10-18 12:43
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# نسخه ثابت نرمال‌سازی و n-gram های holder.search در زمان ایجاد این migration؛
+# تغییرات بعدی holder.search روی این migration اثری ندارد و پس از آن‌ها نمایه
+# باید با دستور rebuild_search_index بازسازی شود.
+GRAM_SIZE = 3
+
+SEARCH_FIELDS = {
+    'name': 'n',
+    'brand': 'b',
+    'serial': 's',
+    'code': 'c',
+    'holder': 'h',
+}
+
+_CHAR_MAP = {
+    'ي': 'ی',
+    'ى': 'ی',
+    'ك': 'ک',
+    'ۀ': 'ه',
+    'ة': 'ه',
+    'أ': 'ا',
+    'إ': 'ا',
+    'ٱ': 'ا',
+    '\u200c': None,
+    '\u200d': None,
+    '\u200e': None,
+    '\u200f': None,
+    '\u0640': None,
+}
+for _digit in range(10):
+    _CHAR_MAP[chr(0x06F0 + _digit)] = str(_digit)
+    _CHAR_MAP[chr(0x0660 + _digit)] = str(_digit)
+_TRANSLATION = str.maketrans(_CHAR_MAP)
+
+_DIACRITICS_RE = re.compile('[\u064b-\u065f\u0670]')
+_SPACE_RE = re.compile(r'\s+')
+
+
+def normalize_search_text(value):
+    if value is None:
+        return ''
+    text = str(value).translate(_TRANSLATION)
+    text = _DIACRITICS_RE.sub('', text)
+    return _SPACE_RE.sub(' ', text).strip().lower()[:255]
+
+
+def make_grams(text):
+    return {text[i:i + GRAM_SIZE] for i in range(len(text))}
+
+
+def item_search_values(item):
+    person = item.PersonalInfo
+    holder = f'{person.name} {person.family} {person.Personnel_number}' if person is not None else None
+    return {
+        'name': normalize_search_text(item.Technical_items),
+        'brand': normalize_search_text(item.brand),
+        'serial': normalize_search_text(item.serial_number),
+        'code': normalize_search_text(item.Product_code),
+        'holder': normalize_search_text(holder),
+    }
+
+
+def populate_item_search_index(apps, schema_editor):
+    Items = apps.get_model('holder', 'Items')
+    ItemSearchEntry = apps.get_model('holder', 'ItemSearchEntry')
+    ItemSearchGram = apps.get_model('holder', 'ItemSearchGram')
+
+    entries = []
+    grams = []
+    for item in Items.objects.select_related('PersonalInfo').order_by('pk').iterator(chunk_size=2000):
+        values = item_search_values(item)
+        entries.append(ItemSearchEntry(item_id=item.pk, **values))
+        for field, value in values.items():
+            grams.extend(
+                ItemSearchGram(entry_id=item.pk, field=SEARCH_FIELDS[field], gram=gram)
+                for gram in make_grams(value)
+            )
+        if len(entries) >= 2000:
+            ItemSearchEntry.objects.bulk_create(entries, batch_size=500)
+            ItemSearchGram.objects.bulk_create(grams, batch_size=1000)
+            entries = []
+            grams = []
+    ItemSearchEntry.objects.bulk_create(entries, batch_size=500)
+    ItemSearchGram.objects.bulk_create(grams, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('holder', '0030_items_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemSearchEntry',
+            fields=[
+                ('item', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_entry', serialize=False, to='holder.items', verbose_name='کالا')),
+                ('name', models.CharField(blank=True, default='', max_length=255, verbose_name='نام کالا')),
+                ('brand', models.CharField(blank=True, default='', max_length=255, verbose_name='برند')),
+                ('serial', models.CharField(blank=True, default='', max_length=255, verbose_name='شماره سریال')),
+                ('code', models.CharField(blank=True, default='', max_length=255, verbose_name='کد محصول')),
+                ('holder', models.CharField(blank=True, default='', max_length=255, verbose_name='دارنده حساب')),
+            ],
+            options={
+                'verbose_name': 'نمایه جستجوی کالا',
+                'verbose_name_plural': 'نمایه\u200cهای جستجوی کالا',
+            },
+        ),
+        migrations.CreateModel(
+            name='ItemSearchGram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.CharField(choices=[('n', 'نام کالا'), ('b', 'برند'), ('s', 'شماره سریال'), ('c', 'کد محصول'), ('h', 'دارنده حساب')], max_length=1, verbose_name='فیلد')),
+                ('gram', models.CharField(max_length=3, verbose_name='n-gram')),
+                ('entry', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='grams', to='holder.itemsearchentry', verbose_name='نمایه کالا')),
+            ],
+            options={
+                'verbose_name': 'n-gram جستجو',
+                'verbose_name_plural': 'n-gram های جستجو',
+                'indexes': [models.Index(fields=['field', 'gram', 'entry'], name='search_gram_lookup_idx')],
+                'constraints': [models.UniqueConstraint(fields=('entry', 'field', 'gram'), name='unique_item_search_gram')],
+            },
+        ),
+        migrations.RunPython(populate_item_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.1 on 2026-10-18 13:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('holder', '0031_item_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True, verbose_name='نام')),
+                ('version', models.BigIntegerField(default=0, verbose_name='نسخه')),
+            ],
+            options={
+                'verbose_name': 'نسخه داده',
+                'verbose_name_plural': 'نسخه\u200cهای داده',
+            },
+        ),
+    ]
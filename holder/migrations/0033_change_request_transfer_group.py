@@ -0,0 +1,60 @@
+# Generated by Django 5.2.1 on 2026-10-18 13:42
+
+import uuid
+
+from django.db import migrations, models
+
+
+def backfill_transfer_groups(apps, schema_editor):
+    """
+    جفت کردن درخواست‌های انتقال و دریافت موجود: هر درخواست دریافت با آخرین درخواست
+    انتقال جفت نشده همان کالا و همان (مالک قبلی، مالک جدید) که پیش از آن ثبت شده است
+    """
+    ItemChangeRequest = apps.get_model('holder', 'ItemChangeRequest')
+
+    updated = []
+    current_item = None
+    open_transfers = {}
+    requests = ItemChangeRequest.objects.filter(
+        action_type__in=('transfer', 'receive'),
+        transfer_group__isnull=True,
+    ).order_by('item_id', 'pk').only('pk', 'item_id', 'action_type', 'proposed_changes')
+
+    for change_request in requests.iterator(chunk_size=2000):
+        if change_request.item_id != current_item:
+            current_item = change_request.item_id
+            open_transfers = {}
+
+        person_changes = (change_request.proposed_changes or {}).get('PersonalInfo') or {}
+        key = (person_changes.get('old_id'), person_changes.get('new_id'))
+        if change_request.action_type == 'transfer':
+            open_transfers.setdefault(key, []).append(change_request)
+        elif open_transfers.get(key):
+            transfer = open_transfers[key].pop()
+            transfer.transfer_group = change_request.transfer_group = uuid.uuid4()
+            updated.extend([transfer, change_request])
+
+        if len(updated) >= 2000:
+            ItemChangeRequest.objects.bulk_update(updated, ['transfer_group'], batch_size=500)
+            updated = []
+    ItemChangeRequest.objects.bulk_update(updated, ['transfer_group'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('holder', '0032_data_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='itemchangerequest',
+            name='transfer_group',
+            field=models.UUIDField(blank=True, null=True, verbose_name='گروه انتقال'),
+        ),
+        migrations.AddIndex(
+            model_name='itemchangerequest',
+            index=models.Index(fields=['transfer_group', 'action_type', 'status'], name='change_req_group_idx'),
+        ),
+        migrations.RunPython(backfill_transfer_groups, migrations.RunPython.noop),
+    ]
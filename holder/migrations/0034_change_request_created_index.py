@@ -0,0 +1,17 @@
+# Generated by Django 5.2.1 on 2026-10-18 13:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('holder', '0033_change_request_transfer_group'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='itemchangerequest',
+            index=models.Index(fields=['-created_at', '-id'], name='change_req_created_idx'),
+        ),
+    ]
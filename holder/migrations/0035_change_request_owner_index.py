@@ -0,0 +1,17 @@
+# Generated by Django 5.2.1 on 2026-10-18 13:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('holder', '0034_change_request_created_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='itemchangerequest',
+            index=models.Index(fields=['owner', 'status', '-created_at'], name='change_req_owner_idx'),
+        ),
+    ]
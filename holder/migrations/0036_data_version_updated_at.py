@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 13:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('holder', '0035_change_request_owner_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataversion',
+            name='updated_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='زمان آخرین تغییر'),
+        ),
+    ]
@@ -111,6 +111,18 @@ class Items(models.Model):
     class Meta:
         verbose_name = "کالا"
         verbose_name_plural = "کالاها"
+        indexes = [
+            # بررسی یکتایی شماره سریال در clean و جستجوی ردیف‌های Excel
+            models.Index(fields=['serial_number'], name='items_serial_idx'),
+            # جستجو بر اساس کد محصول و نوع کالا در ورود و مقایسه Excel
+            models.Index(fields=['Product_code', 'type_Item'], name='items_code_type_idx'),
+            # فیلتر وضعیت/زیر وضعیت همراه با مرتب‌سازی لیست کالاها
+            models.Index(fields=['status_item', 'status_sub_item', '-register_date'], name='items_status_date_idx'),
+            # فیلتر نوع کالا همراه با مرتب‌سازی لیست کالاها
+            models.Index(fields=['type_Item', '-register_date'], name='items_type_date_idx'),
+            # مرتب‌سازی پیش‌فرض لیست کالاها
+            models.Index(fields=['-register_date'], name='items_register_date_idx'),
+        ]
 
 
 class ItemHistory(models.Model):
@@ -239,6 +251,8 @@ class ItemChangeRequest(models.Model):
     # فیلدهای تغییرات پیشنهادی
     proposed_changes = models.JSONField(verbose_name="تغییرات پیشنهادی", help_text="تغییرات پیشنهادی در قالب JSON")
     description = models.TextField(verbose_name="توضیحات", help_text="توضیحات مربوط به تغییر")
+    # شناسه مشترک درخواست‌های انتقال و دریافت یک جابجایی دوطرفه
+    transfer_group = models.UUIDField(null=True, blank=True, verbose_name="گروه انتقال")
     
     # تاریخ‌ها
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="تاریخ ایجاد")
@@ -255,5 +269,108 @@ class ItemChangeRequest(models.Model):
         verbose_name = "درخواست تغییر کالا"
         verbose_name_plural = "درخواست‌های تغییر کالا"
         ordering = ['-created_at']
+        indexes = [
+            # پیدا کردن درخواست جفت انتقال/دریافت در تایید و رد درخواست‌ها
+            models.Index(fields=['transfer_group', 'action_type', 'status'], name='change_req_group_idx'),
+            # صفحه‌بندی کلیدی لیست درخواست‌ها روی (created_at, id)
+            models.Index(fields=['-created_at', '-id'], name='change_req_created_idx'),
+            # صندوق درخواست‌های در انتظار هر دارنده و شمارش آن‌ها
+            models.Index(fields=['owner', 'status', '-created_at'], name='change_req_owner_idx'),
+        ]
 
 
+
+
+class InventoryCounter(models.Model):
+    """
+    شمارنده‌های تجمیعی کالاها به تفکیک نوع، وضعیت، زیر وضعیت و داشتن دارنده
+    این جدول توسط signal های کالا به‌روزرسانی می‌شود تا آمار بدون COUNT روی کل جدول کالاها خوانده شود.
+    """
+    type_Item = models.CharField(max_length=50, verbose_name="نوع کالا")
+    status_item = models.CharField(max_length=50, verbose_name="وضعیت کالا")
+    # برای کالاهای بدون زیر وضعیت، رشته خالی ذخیره می‌شود تا قید یکتایی معتبر باشد
+    status_sub_item = models.CharField(max_length=50, blank=True, default='', verbose_name="زیر مجموعه وضعیت")
+    has_holder = models.BooleanField(default=False, verbose_name="دارای دارنده")
+    count = models.IntegerField(default=0, verbose_name="تعداد")
+
+    def __str__(self):
+        return f"{self.type_Item} - {self.status_item} - {self.status_sub_item or '---'} - {self.has_holder}: {self.count}"
+
+    class Meta:
+        verbose_name = "شمارنده موجودی"
+        verbose_name_plural = "شمارنده‌های موجودی"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['type_Item', 'status_item', 'status_sub_item', 'has_holder'],
+                name='unique_inventory_counter_key'
+            )
+        ]
+
+
+class ItemSearchEntry(models.Model):
+    """
+    متن نرمال‌شده فیلدهای قابل جستجوی هر کالا (نام، برند، سریال، کد محصول و دارنده)
+    این جدول و n-gram های آن توسط signal های کالا و دارنده حساب به‌روز نگه داشته می‌شوند.
+    """
+    item = models.OneToOneField(Items, on_delete=models.CASCADE, primary_key=True, related_name='search_entry', verbose_name="کالا")
+    name = models.CharField(max_length=255, blank=True, default='', verbose_name="نام کالا")
+    brand = models.CharField(max_length=255, blank=True, default='', verbose_name="برند")
+    serial = models.CharField(max_length=255, blank=True, default='', verbose_name="شماره سریال")
+    code = models.CharField(max_length=255, blank=True, default='', verbose_name="کد محصول")
+    holder = models.CharField(max_length=255, blank=True, default='', verbose_name="دارنده حساب")
+
+    def __str__(self):
+        return f"{self.item_id}: {self.name}"
+
+    class Meta:
+        verbose_name = "نمایه جستجوی کالا"
+        verbose_name_plural = "نمایه‌های جستجوی کالا"
+
+
+class ItemSearchGram(models.Model):
+    """
+    n-gram های سه حرفی متن نرمال‌شده هر فیلد برای جستجوی «شامل» بدون اسکن کل جدول کالاها
+    """
+    FIELD_CHOICES = [
+        ('n', 'نام کالا'),
+        ('b', 'برند'),
+        ('s', 'شماره سریال'),
+        ('c', 'کد محصول'),
+        ('h', 'دارنده حساب'),
+    ]
+    entry = models.ForeignKey(ItemSearchEntry, on_delete=models.CASCADE, related_name='grams', verbose_name="نمایه کالا")
+    field = models.CharField(max_length=1, choices=FIELD_CHOICES, verbose_name="فیلد")
+    gram = models.CharField(max_length=3, verbose_name="n-gram")
+
+    def __str__(self):
+        return f"{self.entry_id} - {self.field}: {self.gram}"
+
+    class Meta:
+        verbose_name = "n-gram جستجو"
+        verbose_name_plural = "n-gram های جستجو"
+        indexes = [
+            # پیدا کردن کالاهای دارای یک n-gram در یک فیلد
+            models.Index(fields=['field', 'gram', 'entry'], name='search_gram_lookup_idx'),
+        ]
+        constraints = [
+            # بررسی وجود n-gram برای یک کالا (شرط EXISTS در جستجو)
+            models.UniqueConstraint(fields=['entry', 'field', 'gram'], name='unique_item_search_gram'),
+        ]
+
+
+class DataVersion(models.Model):
+    """
+    شماره نسخه داده‌های موجودی (کالاها و دارندگان)
+    با هر تغییر در این مدل‌ها افزایش می‌یابد تا نتایج ذخیره شده (مثلاً فایل‌های خروجی) نامعتبر شوند.
+    """
+    name = models.CharField(max_length=50, unique=True, verbose_name="نام")
+    version = models.BigIntegerField(default=0, verbose_name="نسخه")
+    # زمان آخرین افزایش نسخه (تاریخ داده‌های خروجی‌های ذخیره شده)
+    updated_at = models.DateTimeField(null=True, blank=True, verbose_name="زمان آخرین تغییر")
+
+    def __str__(self):
+        return f"{self.name}: {self.version}"
+
+    class Meta:
+        verbose_name = "نسخه داده"
+        verbose_name_plural = "نسخه‌های داده"
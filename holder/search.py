@@ -0,0 +1,272 @@
+"""
+نمایه جستجوی n-gram کالاها (ItemSearchEntry / ItemSearchGram)
+
+متن فیلدهای قابل جستجو پس از نرمال‌سازی فارسی (ی/ي، ک/ك، نیم‌فاصله، اعراب و ارقام
+فارسی/عربی) به n-gram های سه حرفی تبدیل و ذخیره می‌شود تا جستجوی «شامل» به جای
+LIKE '%...%' روی کل جدول کالاها، با جستجوی ایندکس‌دار انجام شود.
+"""
+
+import re
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from .models import Items, ItemSearchEntry, ItemSearchGram
+
+GRAM_SIZE = 3
+
+# سقف شمارش هر n-gram برای انتخاب کم‌تکرارترین n-gram جستجو؛
+# n-gram هایی که به این سقف برسند برای جستجو به اندازه کافی انتخابی نیستند
+GRAM_PROBE_LIMIT = 1000
+
+# نام فیلد نمایه -> کد ذخیره شده در ItemSearchGram
+SEARCH_FIELDS = {
+    'name': 'n',
+    'brand': 'b',
+    'serial': 's',
+    'code': 'c',
+    'holder': 'h',
+}
+
+_CHAR_MAP = {
+    'ي': 'ی',
+    'ى': 'ی',
+    'ك': 'ک',
+    'ۀ': 'ه',
+    'ة': 'ه',
+    'أ': 'ا',
+    'إ': 'ا',
+    'ٱ': 'ا',
+    '\u200c': None,  # نیم‌فاصله
+    '\u200d': None,
+    '\u200e': None,
+    '\u200f': None,
+    '\u0640': None,  # کشیده
+}
+for _digit in range(10):
+    _CHAR_MAP[chr(0x06F0 + _digit)] = str(_digit)  # ارقام فارسی
+    _CHAR_MAP[chr(0x0660 + _digit)] = str(_digit)  # ارقام عربی
+_TRANSLATION = str.maketrans(_CHAR_MAP)
+
+_DIACRITICS_RE = re.compile('[\u064b-\u065f\u0670]')  # اعراب
+_SPACE_RE = re.compile(r'\s+')
+
+
+def normalize_search_text(value):
+    """
+    نرمال‌سازی متن برای ذخیره در نمایه و برای عبارت جستجو
+
+    Args:
+        value: متن ورودی (یا None)
+
+    Returns:
+        str: متن نرمال‌شده با حروف کوچک
+    """
+    if value is None:
+        return ''
+    text = str(value).translate(_TRANSLATION)
+    text = _DIACRITICS_RE.sub('', text)
+    return _SPACE_RE.sub(' ', text).strip().lower()[:255]
+
+
+def make_grams(text):
+    """
+    تولید n-gram های یک متن نرمال‌شده
+
+    علاوه بر n-gram های سه حرفی، دو بخش کوتاه‌تر انتهای متن هم ذخیره می‌شود
+    تا هر زیررشته کوتاه‌تر از GRAM_SIZE پیشوند حداقل یک n-gram باشد.
+    """
+    return {text[i:i + GRAM_SIZE] for i in range(len(text))}
+
+
+def holder_search_text(person):
+    """متن قابل جستجوی دارنده حساب"""
+    if person is None:
+        return ''
+    return f'{person.name} {person.family} {person.Personnel_number}'
+
+
+def item_search_values(item):
+    """مقادیر نرمال‌شده فیلدهای نمایه برای یک کالا"""
+    return {
+        'name': normalize_search_text(item.Technical_items),
+        'brand': normalize_search_text(item.brand),
+        'serial': normalize_search_text(item.serial_number),
+        'code': normalize_search_text(item.Product_code),
+        'holder': normalize_search_text(holder_search_text(item.PersonalInfo) if item.PersonalInfo_id else None),
+    }
+
+
+def index_items(items):
+    """
+    ایجاد یا به‌روزرسانی نمایه جستجوی کالاها
+    فقط n-gram های فیلدهایی که تغییر کرده‌اند بازنویسی می‌شوند.
+
+    Args:
+        items: لیست کالاها (بهتر است با select_related('PersonalInfo') دریافت شده باشند)
+
+    Returns:
+        int: تعداد کالاهایی که نمایه آن‌ها ایجاد یا تغییر کرد
+    """
+    items = list(items)
+    if not items:
+        return 0
+
+    existing = ItemSearchEntry.objects.in_bulk([item.pk for item in items])
+    new_entries = []
+    changed_entries = []
+    changed_fields = set()
+    stale_ids = {}
+    new_grams = []
+
+    for item in items:
+        values = item_search_values(item)
+        entry = existing.get(item.pk)
+        if entry is None:
+            new_entries.append(ItemSearchEntry(item_id=item.pk, **values))
+            fields = list(values)
+        else:
+            fields = [field for field, value in values.items() if getattr(entry, field) != value]
+            if not fields:
+                continue
+            for field in fields:
+                setattr(entry, field, values[field])
+                stale_ids.setdefault(SEARCH_FIELDS[field], []).append(item.pk)
+            changed_entries.append(entry)
+            changed_fields.update(fields)
+
+        for field in fields:
+            new_grams.extend(
+                ItemSearchGram(entry_id=item.pk, field=SEARCH_FIELDS[field], gram=gram)
+                for gram in make_grams(values[field])
+            )
+
+    with transaction.atomic():
+        if new_entries:
+            ItemSearchEntry.objects.bulk_create(new_entries, batch_size=500)
+        if changed_entries:
+            ItemSearchEntry.objects.bulk_update(changed_entries, sorted(changed_fields), batch_size=500)
+            for field_code, ids in stale_ids.items():
+                ItemSearchGram.objects.filter(field=field_code, entry_id__in=ids).delete()
+        if new_grams:
+            ItemSearchGram.objects.bulk_create(new_grams, batch_size=1000, ignore_conflicts=True)
+
+    return len(new_entries) + len(changed_entries)
+
+
+def reindex_holder(person):
+    """
+    به‌روزرسانی متن دارنده در نمایه کالاهای یک شخص پس از تغییر نام یا نام خانوادگی
+    """
+    holder_text = normalize_search_text(holder_search_text(person))
+    items = Items.objects.filter(PersonalInfo=person).exclude(
+        search_entry__holder=holder_text
+    ).select_related('PersonalInfo')
+    return index_items(items)
+
+
+def rebuild_search_index(batch_size=2000):
+    """
+    بازسازی کامل نمایه جستجو از روی جدول کالاها
+
+    Returns:
+        int: تعداد کالاهای نمایه شده
+    """
+    ItemSearchEntry.objects.all().delete()
+    total = 0
+    batch = []
+    for item in Items.objects.select_related('PersonalInfo').order_by('pk').iterator(chunk_size=batch_size):
+        batch.append(item)
+        if len(batch) >= batch_size:
+            total += index_items(batch)
+            batch = []
+    total += index_items(batch)
+    return total
+
+
+def _cover_grams(text):
+    """
+    n-gram های سه حرفی بدون هم‌پوشانی که کل متن جستجو را پوشش می‌دهند
+    (بررسی پیوستگی با شرط contains روی متن نمایه انجام می‌شود)
+    """
+    grams = [text[i:i + GRAM_SIZE] for i in range(0, len(text) - GRAM_SIZE + 1, GRAM_SIZE)]
+    grams.append(text[-GRAM_SIZE:])
+    return list(dict.fromkeys(grams))
+
+
+def _gram_queryset(field_code, gram):
+    """n-gram های یک فیلد؛ برای عبارت کوتاه‌تر از GRAM_SIZE، بازه پیشوندی روی ایندکس"""
+    if len(gram) < GRAM_SIZE:
+        return ItemSearchGram.objects.filter(field=field_code, gram__gte=gram, gram__lt=gram + '\uffff')
+    return ItemSearchGram.objects.filter(field=field_code, gram=gram)
+
+
+def _field_item_ids(field, text):
+    """
+    زیرکوئری شناسه کالاهایی که فیلد مورد نظر آن‌ها شامل متن نرمال‌شده است
+
+    تعداد هر n-gram حداکثر تا GRAM_PROBE_LIMIT شمرده می‌شود و جستجو از کم‌تکرارترین
+    n-gram شروع می‌شود. اگر حتی کم‌تکرارترین n-gram هم پرتکرار باشد، اسکن متن
+    نرمال‌شده نمایه از پیمایش لیست‌های بلند n-gram ارزان‌تر است.
+    """
+    field_code = SEARCH_FIELDS[field]
+    grams = _cover_grams(text) if len(text) >= GRAM_SIZE else [text]
+
+    frequencies = {}
+    for gram in grams:
+        frequency = _gram_queryset(field_code, gram)[:GRAM_PROBE_LIMIT].count()
+        if not frequency:
+            return ItemSearchGram.objects.none().values_list('entry_id', flat=True)
+        frequencies[gram] = frequency
+    grams.sort(key=lambda gram: frequencies[gram])
+
+    if frequencies[grams[0]] >= GRAM_PROBE_LIMIT:
+        return ItemSearchEntry.objects.filter(**{f'{field}__contains': text}).values_list('item_id', flat=True)
+
+    if len(text) < GRAM_SIZE:
+        return _gram_queryset(field_code, text).values_list('entry_id', flat=True)
+
+    queryset = _gram_queryset(field_code, grams[0])
+    for gram in grams[1:]:
+        queryset = queryset.filter(Exists(
+            ItemSearchGram.objects.filter(entry_id=OuterRef('entry_id'), field=field_code, gram=gram)
+        ))
+    # حذف نتایجی که n-gram ها را دارند اما نه به صورت پیوسته
+    return queryset.filter(**{f'entry__{field}__contains': text}).values_list('entry_id', flat=True)
+
+
+def search_items_q(query, fields):
+    """
+    ساخت شرط جستجوی کالاها در یک یا چند فیلد نمایه
+
+    Args:
+        query: عبارت جستجو
+        fields: لیست نام فیلدها از SEARCH_FIELDS
+
+    Returns:
+        Q: شرط قابل استفاده روی queryset کالاها (برای عبارت خالی، Q خالی)
+    """
+    text = normalize_search_text(query)
+    condition = Q()
+    if not text:
+        return condition
+    for field in fields:
+        condition |= Q(pk__in=_field_item_ids(field, text))
+    return condition
+
+
+def find_item_ids(query, fields, limit=10):
+    """
+    پیدا کردن سریع حداکثر limit شناسه کالا برای جستجوی لحظه‌ای (typeahead)
+    بدون مرتب‌سازی، تا کوئری پس از یافتن اولین نتایج متوقف شود.
+    """
+    text = normalize_search_text(query)
+    if not text:
+        return []
+    item_ids = []
+    for field in fields:
+        if len(item_ids) >= limit:
+            break
+        for item_id in _field_item_ids(field, text).distinct()[:limit]:
+            if item_id not in item_ids and len(item_ids) < limit:
+                item_ids.append(item_id)
+    return item_ids
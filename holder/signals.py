@@ -1,6 +1,11 @@
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_save, pre_save, post_delete
 from django.dispatch import receiver
-from .models import Items, ItemHistory
+from .models import Items, ItemHistory, PersonalInfo, Documents, Mission, Results, ItemChangeRequest
+from .counters import counter_key_for_item, apply_counter_deltas
+from .search import index_items, reindex_holder
+from .versioning import bump_data_version
+from .context_processors import invalidate_admin_stats
+from .inbox import invalidate_pending_counts
 
 
 # متغیر سراسری برای کنترل signal
@@ -17,6 +22,17 @@ def enable_signals():
     _skip_signal = False
 
 
+@receiver(pre_save, sender=Items)
+def load_previous_item(sender, instance, **kwargs):
+    """
+    خواندن یک‌باره وضعیت قبلی کالا (همراه با مالک) پیش از ذخیره
+    برای استفاده در track_item_changes و remember_counter_key
+    """
+    instance._previous_item = None
+    if instance.pk:
+        instance._previous_item = Items.objects.select_related('PersonalInfo').filter(pk=instance.pk).first()
+
+
 @receiver(pre_save, sender=Items)
 def track_item_changes(sender, instance, **kwargs):
     """
@@ -30,8 +46,10 @@ def track_item_changes(sender, instance, **kwargs):
     # بررسی اینکه آیا این یک رکورد جدید است یا خیر
     if instance.pk:  # اگر pk وجود داشته باشد، یعنی کالا از قبل وجود دارد و در حال بروزرسانی است
         try:
-            # دریافت اطلاعات قبلی کالا
-            old_instance = Items.objects.get(pk=instance.pk)
+            # اطلاعات قبلی کالا (خوانده شده در load_previous_item)
+            old_instance = getattr(instance, '_previous_item', None)
+            if old_instance is None:
+                raise Items.DoesNotExist
             
             # بررسی تغییر مالک کالا
             if old_instance.PersonalInfo != instance.PersonalInfo:
@@ -93,4 +111,94 @@ def create_item_history(sender, instance, created, **kwargs):
                 to_person=None,
                 action_type='assign',
                 description='کالا بدون تخصیص به شخص خاص ایجاد شد.'
-            )
\ No newline at end of file
+            )
+
+
+@receiver(pre_save, sender=Items)
+def remember_counter_key(sender, instance, **kwargs):
+    """
+    ذخیره کلید شمارنده فعلی کالا پیش از ذخیره، برای به‌روزرسانی شمارنده‌های موجودی
+    """
+    old_instance = getattr(instance, '_previous_item', None)
+    instance._counter_old_key = counter_key_for_item(old_instance) if old_instance is not None else None
+
+
+@receiver(post_save, sender=Items)
+def update_inventory_counters(sender, instance, created, **kwargs):
+    """
+    به‌روزرسانی شمارنده‌های موجودی پس از ایجاد یا ویرایش کالا
+    """
+    new_key = counter_key_for_item(instance)
+    old_key = None if created else getattr(instance, '_counter_old_key', None)
+    if old_key == new_key:
+        return
+
+    deltas = {new_key: 1}
+    if old_key is not None:
+        deltas[old_key] = deltas.get(old_key, 0) - 1
+    apply_counter_deltas(deltas)
+
+
+@receiver(post_delete, sender=Items)
+def decrement_inventory_counters(sender, instance, **kwargs):
+    """
+    کاهش شمارنده‌های موجودی پس از حذف کالا
+    """
+    apply_counter_deltas({counter_key_for_item(instance): -1})
+
+
+@receiver(post_save, sender=Items)
+def update_item_search_index(sender, instance, **kwargs):
+    """
+    به‌روزرسانی نمایه جستجوی کالا پس از ایجاد یا ویرایش
+    (حذف نمایه همراه با حذف کالا به صورت CASCADE انجام می‌شود)
+    """
+    index_items([instance])
+
+
+@receiver(post_save, sender=PersonalInfo)
+def update_holder_search_index(sender, instance, created, **kwargs):
+    """
+    به‌روزرسانی متن دارنده در نمایه جستجوی کالاهای شخص پس از ویرایش اطلاعات او
+    """
+    if not created:
+        reindex_holder(instance)
+
+
+def clear_admin_stats_cache(sender, **kwargs):
+    """
+    پاک کردن آمار ذخیره شده پنل مدیریت پس از تغییر در مدل‌های مرتبط
+    """
+    invalidate_admin_stats()
+
+
+for _stats_model in (Items, Documents, Mission, Results, PersonalInfo):
+    post_save.connect(clear_admin_stats_cache, sender=_stats_model, dispatch_uid=f'admin_stats_save_{_stats_model.__name__}')
+    post_delete.connect(clear_admin_stats_cache, sender=_stats_model, dispatch_uid=f'admin_stats_delete_{_stats_model.__name__}')
+
+
+def bump_inventory_data_version(sender, **kwargs):
+    """
+    افزایش نسخه داده‌های موجودی پس از تغییر کالاها یا دارندگان
+    (خروجی‌های ذخیره شده با نسخه قبلی دیگر استفاده نمی‌شوند)
+
+    تاریخچه کالاها در خروجی‌ها نیست و همراه با ذخیره خود کالا ثبت می‌شود، بنابراین
+    هر تغییر کالا فقط یک بار نسخه را افزایش می‌دهد.
+    """
+    bump_data_version()
+
+
+for _versioned_model in (Items, PersonalInfo):
+    post_save.connect(bump_inventory_data_version, sender=_versioned_model, dispatch_uid=f'data_version_save_{_versioned_model.__name__}')
+    post_delete.connect(bump_inventory_data_version, sender=_versioned_model, dispatch_uid=f'data_version_delete_{_versioned_model.__name__}')
+
+
+def clear_pending_request_counts(sender, instance, **kwargs):
+    """
+    پاک کردن شمارش ذخیره شده درخواست‌های در انتظار مالک درخواست پس از ذخیره یا حذف آن
+    """
+    invalidate_pending_counts([instance.owner_id])
+
+
+post_save.connect(clear_pending_request_counts, sender=ItemChangeRequest, dispatch_uid='pending_counts_save')
+post_delete.connect(clear_pending_request_counts, sender=ItemChangeRequest, dispatch_uid='pending_counts_delete')
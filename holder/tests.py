@@ -1,3 +1,316 @@
+import datetime
+import importlib
+
+from django.apps import apps
 from django.test import TestCase
 
-# Create your tests here.
+from account.bulk_transfer import bulk_transfer
+from account.comparison_apply import _resolve_holders
+from shared.approval_utils import check_both_parties_approved, new_transfer_group, reject_related_requests
+from shared.bulk_approval import bulk_approve_requests
+from .bulk_import import import_items
+from .counters import rebuild_inventory_counters
+from .models import PersonalInfo, Items, ItemChangeRequest, ItemHistory, InventoryCounter
+
+transfer_group_migration = importlib.import_module('holder.migrations.0033_change_request_transfer_group')
+
+
+def create_person(number):
+    return PersonalInfo.objects.create(
+        name=f'نام{number}',
+        family=f'خانوادگی{number}',
+        Personnel_number=f'10000000{number}',
+        National_ID=f'200000000{number}',
+        date_of_birth=datetime.date(1990, 1, 1),
+        phone_number='09120000000',
+        Educational_degree='کارشناسی',
+        password='secret',
+    )
+
+
+def create_item(name, owner=None, **fields):
+    values = {
+        'Technical_items': name,
+        'type_Item': 'Technical',
+        'status_item': 'warehouse',
+        'serial_number': f'SN-{name}',
+        'Product_code': f'PC-{name}',
+        'PersonalInfo': owner,
+    }
+    values.update(fields)
+    return Items.objects.create(**values)
+
+
+class TransferGroupTests(TestCase):
+    """جفت شدن درخواست‌های انتقال و دریافت با transfer_group"""
+
+    def setUp(self):
+        self.old_owner = create_person(1)
+        self.new_owner = create_person(2)
+        self.other_owner = create_person(3)
+        self.item = create_item('laptop', self.old_owner)
+
+    def change_request(self, action_type, owner, new_owner, transfer_group=None, status='pending', item=None):
+        return ItemChangeRequest.objects.create(
+            item=item or self.item,
+            owner=owner,
+            admin_user='admin',
+            action_type=action_type,
+            status=status,
+            proposed_changes={'PersonalInfo': {
+                'old_id': self.old_owner.Personnel_number,
+                'new_id': new_owner.Personnel_number,
+            }},
+            description='',
+            transfer_group=transfer_group,
+        )
+
+    def test_backfill_pairs_interleaved_requests(self):
+        first_transfer = self.change_request('transfer', self.old_owner, self.new_owner)
+        other_transfer = self.change_request('transfer', self.old_owner, self.other_owner)
+        second_transfer = self.change_request('transfer', self.old_owner, self.new_owner)
+        second_receive = self.change_request('receive', self.new_owner, self.new_owner)
+        other_receive = self.change_request('receive', self.other_owner, self.other_owner)
+        first_receive = self.change_request('receive', self.new_owner, self.new_owner)
+        unmatched_receive = self.change_request('receive', self.new_owner, self.new_owner)
+        other_item = create_item('printer', self.old_owner)
+        other_item_receive = self.change_request('receive', self.new_owner, self.new_owner, item=other_item)
+
+        transfer_group_migration.backfill_transfer_groups(apps, None)
+
+        def group(change_request):
+            change_request.refresh_from_db()
+            return change_request.transfer_group
+
+        # هر دریافت با آخرین انتقال جفت نشده پیش از خود با همان (مالک قبلی، مالک جدید) جفت می‌شود
+        self.assertIsNotNone(group(second_transfer))
+        self.assertEqual(group(second_transfer), group(second_receive))
+        self.assertIsNotNone(group(first_transfer))
+        self.assertEqual(group(first_transfer), group(first_receive))
+        self.assertIsNotNone(group(other_transfer))
+        self.assertEqual(group(other_transfer), group(other_receive))
+        self.assertEqual(len({group(first_transfer), group(second_transfer), group(other_transfer)}), 3)
+        self.assertIsNone(group(unmatched_receive))
+        self.assertIsNone(group(other_item_receive))
+
+    def test_check_both_parties_approved_uses_transfer_group(self):
+        first_group = new_transfer_group()
+        second_group = new_transfer_group()
+        first_transfer = self.change_request('transfer', self.old_owner, self.new_owner, first_group, status='approved')
+        self.change_request('receive', self.new_owner, self.new_owner, first_group)
+        second_transfer = self.change_request('transfer', self.old_owner, self.new_owner, second_group)
+        second_receive = self.change_request('receive', self.new_owner, self.new_owner, second_group, status='approved')
+
+        # تایید دو نیمه از دو جفت متفاوت، انتقال را کامل نمی‌کند
+        for change_request in (first_transfer, second_receive):
+            self.assertFalse(check_both_parties_approved(
+                self.item, self.old_owner.Personnel_number, self.new_owner.Personnel_number, change_request
+            ))
+
+        second_transfer.status = 'approved'
+        second_transfer.save()
+        self.assertTrue(check_both_parties_approved(
+            self.item, self.old_owner.Personnel_number, self.new_owner.Personnel_number, second_receive
+        ))
+
+    def test_reject_related_requests_rejects_only_its_pair(self):
+        first_group = new_transfer_group()
+        second_group = new_transfer_group()
+        first_transfer = self.change_request('transfer', self.old_owner, self.new_owner, first_group)
+        first_receive = self.change_request('receive', self.new_owner, self.new_owner, first_group)
+        self.change_request('transfer', self.old_owner, self.new_owner, second_group)
+        second_receive = self.change_request('receive', self.new_owner, self.new_owner, second_group)
+
+        second_receive.status = 'rejected'
+        second_receive.save()
+        reject_related_requests(second_receive)
+
+        statuses = dict(ItemChangeRequest.objects.filter(transfer_group=second_group).values_list('action_type', 'status'))
+        self.assertEqual(statuses, {'transfer': 'rejected', 'receive': 'rejected'})
+        first_transfer.refresh_from_db()
+        first_receive.refresh_from_db()
+        self.assertEqual((first_transfer.status, first_receive.status), ('pending', 'pending'))
+
+
+class InventoryCounterTests(TestCase):
+    """همخوانی شمارنده‌های موجودی با جدول کالاها پس از هر مسیر نوشتن"""
+
+    def setUp(self):
+        self.owner = create_person(1)
+        self.new_owner = create_person(2)
+
+    def assertCountersMatchItems(self):
+        def nonzero_counters():
+            return sorted(
+                row for row in InventoryCounter.objects.values_list(
+                    'type_Item', 'status_item', 'status_sub_item', 'has_holder', 'count'
+                ) if row[-1]
+            )
+
+        maintained = nonzero_counters()
+        rebuild_inventory_counters()
+        self.assertEqual(maintained, nonzero_counters())
+
+    def test_create_update_delete(self):
+        item = create_item('laptop')
+        other = create_item('monitor', self.owner, type_Item='Non-technical')
+        self.assertCountersMatchItems()
+
+        item.status_item = 'hardware'
+        item.status_sub_item = 'repair'
+        item.save()
+        self.assertCountersMatchItems()
+
+        item.PersonalInfo = self.owner
+        item.save()
+        self.assertCountersMatchItems()
+
+        # تغییر مالک بدون تایید برگردانده می‌شود و شمارنده‌ها نباید تغییر کنند
+        item = Items.objects.get(pk=item.pk)
+        item.PersonalInfo = self.new_owner
+        item.save()
+        self.assertEqual(Items.objects.get(pk=item.pk).PersonalInfo, self.owner)
+        self.assertCountersMatchItems()
+
+        other.delete()
+        self.assertCountersMatchItems()
+
+        self.owner.delete()
+        self.assertCountersMatchItems()
+
+    def test_bulk_import(self):
+        item = create_item('laptop')
+        result = import_items([
+            {'row_number': 1, 'action_type': 'create', 'data': {
+                'Technical_items': 'printer', 'type_Item': 'Technical', 'status_item': 'warehouse',
+                'serial_number': 'SN-printer', 'Product_code': 'PC-printer',
+                'PersonalInfo': self.owner.Personnel_number,
+            }},
+            {'row_number': 2, 'action_type': 'update', 'existing_item_id': item.pk, 'data': {
+                'status_item': 'Delivery', 'status_sub_item': 'internal',
+                'PersonalInfo': self.new_owner.Personnel_number,
+            }},
+        ])
+        self.assertEqual((result.created, result.updated, result.errors), (1, 1, []))
+        self.assertCountersMatchItems()
+
+    def test_bulk_transfer_approval(self):
+        items = [create_item(f'laptop{index}', self.owner) for index in range(3)]
+        items.append(create_item('spare'))
+        bulk_transfer([item.pk for item in items], self.new_owner, 'admin')
+        request_ids = ItemChangeRequest.objects.filter(
+            action_type__in=('transfer', 'assign')
+        ).values_list('pk', flat=True)
+
+        result = bulk_approve_requests(request_ids, 'admin')
+
+        self.assertEqual(result.errors, [])
+        self.assertEqual(Items.objects.filter(PersonalInfo=self.new_owner).count(), 4)
+        self.assertCountersMatchItems()
+
+
+class BulkApprovalTests(TestCase):
+    """تایید اجباری دسته‌ای درخواست‌ها به ترتیب ایجاد و مستقل از خطای درخواست‌های دیگر"""
+
+    def setUp(self):
+        self.owner = create_person(1)
+        self.new_owner = create_person(2)
+        self.other_owner = create_person(3)
+
+    def edit_request(self, item, **changes):
+        return ItemChangeRequest.objects.create(
+            item=item,
+            owner=self.owner,
+            admin_user='admin',
+            action_type='edit',
+            proposed_changes={field: {'old': getattr(item, field), 'new': value} for field, value in changes.items()},
+            description='',
+        )
+
+    def owner_request(self, item, action_type, owner, old_owner, new_owner, status='pending'):
+        return ItemChangeRequest.objects.create(
+            item=item,
+            owner=owner,
+            admin_user='admin',
+            action_type=action_type,
+            status=status,
+            proposed_changes={'PersonalInfo': {
+                'old_id': old_owner.Personnel_number,
+                'new_id': new_owner.Personnel_number,
+            }},
+            description='',
+        )
+
+    def test_failed_edit_does_not_leak_into_later_edits(self):
+        item = create_item('laptop', self.owner)
+        create_item('printer')
+        failing = self.edit_request(item, serial_number='SN-printer', brand='EVIL')
+        renaming = self.edit_request(item, Technical_items='renamed')
+
+        result = bulk_approve_requests([failing.pk, renaming.pk], 'admin')
+
+        self.assertEqual([change_request.pk for change_request, error in result.errors], [failing.pk])
+        item.refresh_from_db()
+        self.assertEqual((item.Technical_items, item.serial_number, item.brand), ('renamed', 'SN-laptop', None))
+        failing.refresh_from_db()
+        renaming.refresh_from_db()
+        self.assertEqual((failing.status, renaming.status), ('pending', 'approved'))
+
+    def test_database_error_affects_only_its_request(self):
+        broken_item = create_item('laptop', self.owner)
+        other_item = create_item('printer', self.owner)
+        broken = self.edit_request(broken_item, Product_code=None)
+        valid = self.edit_request(other_item, brand='HP')
+
+        result = bulk_approve_requests([broken.pk, valid.pk], 'admin')
+
+        self.assertEqual([change_request.pk for change_request, error in result.errors], [broken.pk])
+        other_item.refresh_from_db()
+        self.assertEqual(other_item.brand, 'HP')
+        broken.refresh_from_db()
+        valid.refresh_from_db()
+        self.assertEqual((broken.status, valid.status), ('pending', 'approved'))
+
+    def test_requests_apply_in_creation_order(self):
+        item = create_item('laptop', self.owner)
+        # انتقال تایید شده دوطرفه به new_owner که ویرایش قدیمی‌تر آن را اعمال می‌کند
+        self.owner_request(item, 'transfer', self.owner, self.owner, self.new_owner, status='approved')
+        self.owner_request(item, 'receive', self.new_owner, self.owner, self.new_owner, status='approved')
+        older_edit = self.owner_request(item, 'edit', self.owner, self.owner, self.new_owner)
+        newer_transfer = self.owner_request(item, 'transfer', self.new_owner, self.new_owner, self.other_owner)
+
+        result = bulk_approve_requests([newer_transfer.pk, older_edit.pk], 'admin')
+
+        self.assertEqual(result.errors, [])
+        item.refresh_from_db()
+        self.assertEqual(item.PersonalInfo, self.other_owner)
+        self.assertEqual(
+            ItemHistory.objects.filter(item=item, action_type='transfer').order_by('pk').last().to_person,
+            self.other_owner
+        )
+
+
+class ComparisonHolderTests(TestCase):
+    """یافتن دارندگان مقادیر Excel مقایسه با شماره پرسنلی یا نام"""
+
+    def test_resolve_by_number_and_name(self):
+        first = create_person(1)
+        second = create_person(2)
+        duplicate = create_person(3)
+        duplicate.name, duplicate.family = first.name, first.family
+        duplicate.save()
+
+        holders = _resolve_holders([
+            second.Personnel_number,
+            f'{second.name} {second.family} ({second.Personnel_number})',
+            f'{first.name} {first.family}',
+            'ناشناس ناشناس',
+            'بدون دارنده',
+            '',
+        ])
+
+        self.assertEqual(holders, {
+            second.Personnel_number: second,
+            f'{second.name} {second.family} ({second.Personnel_number})': second,
+            f'{first.name} {first.family}': first,
+        })
@@ -16,6 +16,7 @@ urlpatterns = [
     
 # Ajax endpoints
     path('get-status-sub-items/', views.get_status_sub_items, name='get_status_sub_items'),
+    path('pending-inbox/', views.pending_inbox, name='pending_inbox'),
     
 # Change request endpoints
     path('approve-request/<int:request_id>/', views.approve_change_request, name='approve_change_request'),
@@ -0,0 +1,37 @@
+"""
+شماره نسخه داده‌های موجودی (DataVersion)
+
+هر نوشتن روی کالاها یا دارندگان حساب نسخه را افزایش می‌دهد؛
+نتایج ذخیره شده‌ای که نسخه داده را در کلید خود دارند با این افزایش نامعتبر می‌شوند.
+"""
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import DataVersion
+
+INVENTORY_DATA_VERSION = 'inventory'
+
+
+def get_data_version(name=INVENTORY_DATA_VERSION):
+    """نسخه فعلی داده‌ها (صفر اگر هنوز تغییری ثبت نشده باشد)"""
+    version = DataVersion.objects.filter(name=name).values_list('version', flat=True).first()
+    return version or 0
+
+
+def get_data_version_time(name=INVENTORY_DATA_VERSION):
+    """زمان آخرین افزایش نسخه داده‌ها (None اگر ثبت نشده باشد)"""
+    return DataVersion.objects.filter(name=name).values_list('updated_at', flat=True).first()
+
+
+def bump_data_version(name=INVENTORY_DATA_VERSION):
+    """افزایش نسخه داده‌ها"""
+    now = timezone.now()
+    updated = DataVersion.objects.filter(name=name).update(version=F('version') + 1, updated_at=now)
+    if not updated:
+        try:
+            with transaction.atomic():
+                DataVersion.objects.create(name=name, version=1, updated_at=now)
+        except IntegrityError:
+            # ردیف نسخه همزمان توسط درخواست دیگری ایجاد شده است
+            DataVersion.objects.filter(name=name).update(version=F('version') + 1, updated_at=now)
@@ -10,6 +10,7 @@ from .forms import (
 from django.utils.crypto import get_random_string
 from django.utils import timezone
 from .session_utils import HolderSessionManager
+from .inbox import pending_request_count, pending_requests_for, inbox_page
 import json
 from shared.approval_utils import (
     check_both_parties_approved, approve_item_transfer, approve_item_assignment,
@@ -115,11 +116,8 @@ def dashboard(request):
         missions = Mission.objects.filter(PersonalInfo=user).order_by('-register_date')
         results = Results.objects.filter(PersonalInfo=user).order_by('-register_date')
         
-        # دریافت درخواست‌های تایید در انتظار
-        pending_requests = ItemChangeRequest.objects.filter(
-            owner=user, 
-            status='pending'
-        ).order_by('-created_at')
+        # دریافت درخواست‌های تایید در انتظار (همیشه از پایگاه داده؛ تعداد ذخیره شده فقط برای نشان‌ها)
+        pending_requests = pending_requests_for(user.pk).select_related('item').order_by('-created_at')
         
         # فرم‌های جدید
         document_form = DocumentForm()
@@ -146,6 +144,44 @@ def dashboard(request):
         messages.error(request, "حساب کاربری یافت نشد")
         return redirect('login')
 
+def pending_inbox(request):
+    """
+    Ajax view صندوق درخواست‌های در انتظار تایید کاربر
+
+    تعداد درخواست‌ها (برای نشان اعلان) از cache خوانده می‌شود و درخواست‌ها همیشه از
+    پایگاه داده با صفحه‌بندی کلیدی (پارامتر cursor) برگردانده می‌شوند؛ با count_only=1
+    فقط تعداد.
+    """
+    if not HolderSessionManager.is_authenticated(request):
+        return JsonResponse({'status': 'error', 'message': 'لطفا ابتدا وارد شوید'})
+
+    user_id = HolderSessionManager.get_user_id(request)
+    count = pending_request_count(user_id)
+    data = {'status': 'success', 'count': count}
+    if request.GET.get('count_only'):
+        return JsonResponse(data)
+
+    page = inbox_page(user_id, token=request.GET.get('cursor'))
+    data.update({
+        'requests': [
+            {
+                'id': change_request.id,
+                'action_type': change_request.action_type,
+                'action_display': change_request.get_action_type_display(),
+                'item_id': change_request.item.id,
+                'item_name': change_request.item.Technical_items,
+                'admin_user': change_request.admin_user,
+                'description': change_request.description,
+                'proposed_changes': change_request.proposed_changes,
+                'created_at': change_request.jinfo(),
+            }
+            for change_request in page
+        ],
+        'next_cursor': page.next_token,
+        'previous_cursor': page.previous_token,
+    })
+    return JsonResponse(data)
+
 @require_POST
 def add_document(request):
     if not HolderSessionManager.is_authenticated(request):
@@ -287,7 +323,7 @@ def approve_change_request(request, request_id):
             
             if old_owner_id and new_owner_id:
                 # بررسی اینکه آیا هر دو طرف تایید کرده‌اند
-                both_approved = check_both_parties_approved(item, old_owner_id, new_owner_id)
+                both_approved = check_both_parties_approved(item, old_owner_id, new_owner_id, change_request)
                 
                 if both_approved:
                     # استفاده از shared utility برای انتقا��
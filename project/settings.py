@@ -144,6 +144,56 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'static/')
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media/')
 
+# مدت زمان نگهداری آمار پنل مدیریت در cache (ثانیه)
+# CACHES تنظیم نشده است، بنابراین هر پروسه cache جداگانه (LocMemCache) دارد و پاک شدن
+# آمار پس از تغییرات فقط در همان پروسه اثر دارد؛ پروسه‌های دیگر حداکثر تا این مدت
+# آمار قبلی را نمایش می‌دهند. برای چند پروسه، یک cache مشترک (مثلاً Redis) تنظیم کنید.
+ADMIN_STATS_CACHE_TIMEOUT = 60
+
+# صفحه‌بندی کلیدی (cursor) لیست کالاها به جای صفحه‌بندی با شماره صفحه
+# در صورت False، این حالت فقط با پارامتر cursor در آدرس فعال می‌شود
+ITEM_LIST_KEYSET_PAGINATION = False
+
+# تعداد thread های اجرای کارهای خروجی پس‌زمینه (Excel / PDF) در هر پروسه
+EXPORT_JOB_WORKERS = 2
+
+# مدت نگهداری فایل‌های خروجی پس‌زمینه در MEDIA_ROOT/exports (ساعت)
+EXPORT_JOB_TTL_HOURS = 24
+
+# پوشه فایل‌های خروجی ذخیره شده بر اساس فیلترها (باید خارج از MEDIA_ROOT باشد)
+EXPORT_CACHE_DIR = os.path.join(BASE_DIR, 'export_cache')
+
+# اندازه دسته‌های bulk_create / bulk_update در ثبت کالاهای ورودی از Excel
+IMPORT_BULK_BATCH_SIZE = 500
+
+# تعداد ردیف‌های هر صفحه تأیید ورود Excel
+IMPORT_REVIEW_PAGE_SIZE = 50
+
+# مدت نگهداری دسته‌های ورود Excel پس از آخرین فعالیت (ساعت)
+IMPORT_BATCH_TTL_HOURS = 72
+
+# تعداد ردیف‌های هر صفحه نتایج مقایسه Excel با سیستم
+COMPARISON_PAGE_SIZE = 100
+
+# مدت نگهداری نتایج مقایسه Excel (ساعت)
+COMPARISON_RUN_TTL_HOURS = 72
+
+# تعداد ردیف‌های هر صفحه لیست درخواست‌های تغییر کالا
+CHANGE_REQUESTS_PAGE_SIZE = 50
+
+# مدت نگهداری تعداد درخواست‌های در انتظار تایید هر دارنده و تعداد کل در cache (ثانیه)
+# (فقط برای نشان‌ها؛ بدون CACHES مشترک، هر پروسه شمارش‌های خود را جداگانه نگه می‌دارد)
+PENDING_REQUESTS_CACHE_TIMEOUT = 300
+
+# تعداد درخواست‌های هر صفحه صندوق درخواست‌های در انتظار دارنده
+HOLDER_INBOX_PAGE_SIZE = 20
+
+# مسیر فایل TTF فونت فارسی خروجی‌های PDF (در صورت خالی بودن، مسیرهای پیش‌فرض سیستم جستجو می‌شوند)
+PDF_PERSIAN_FONT_PATH = os.environ.get('PDF_PERSIAN_FONT_PATH', '')
+
+# حداکثر تعداد متن‌های تصحیح شده (reshape / bidi) در حافظه نهان خروجی‌های PDF
+PDF_TEXT_CACHE_SIZE = 4096
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -2,11 +2,24 @@
 ابزارهای مشترک برای سیستم تایید درخواست‌ها
 """
 
+import uuid
+
 from django.utils import timezone
 from holder.models import Items, ItemHistory, PersonalInfo, ItemChangeRequest
 
+# نوع درخواست جفت هر طرف انتقال دوطرفه
+COUNTERPART_ACTIONS = {
+    'transfer': 'receive',
+    'receive': 'transfer',
+}
+
+
+def new_transfer_group():
+    """شناسه گروه جدید برای جفت درخواست‌های انتقال و دریافت"""
+    return uuid.uuid4()
 
-def check_both_parties_approved(item, old_owner_id, new_owner_id):
+
+def check_both_parties_approved(item, old_owner_id, new_owner_id, change_request=None):
     """
     بررسی اینکه آیا هر دو طرف انتقال تایید کرده‌اند
     
@@ -14,10 +27,20 @@ def check_both_parties_approved(item, old_owner_id, new_owner_id):
         item: آبجکت کالا
         old_owner_id: شماره پرسنلی مالک قبلی
         new_owner_id: شماره پرسنلی مالک جدید
+        change_request: درخواست انتقال یا دریافت؛ در صورت داشتن transfer_group فقط
+            درخواست جفت همان گروه بررسی می‌شود
     
     Returns:
         bool: True اگر هر دو طرف تایید کرده باشند، در غیر این صورت False
     """
+    if change_request is not None and change_request.transfer_group:
+        approved_actions = set(ItemChangeRequest.objects.filter(
+            transfer_group=change_request.transfer_group,
+            action_type__in=COUNTERPART_ACTIONS,
+            status='approved'
+        ).values_list('action_type', flat=True))
+        return approved_actions == set(COUNTERPART_ACTIONS)
+    
     # بررسی تایید مالک قبلی - باید درخواست transfer تایید شده باشد
     transfer_requests = ItemChangeRequest.objects.filter(
         item=item,
@@ -269,7 +292,19 @@ def reject_related_requests(change_request):
     Args:
         change_request: درخواست اصلی که رد شده
     """
-    if change_request.action_type in ['transfer', 'receive']:
+    if change_request.action_type in ['transfer', 'receive'] and change_request.transfer_group:
+        # درخواست جفت همان گروه انتقال
+        related_request = ItemChangeRequest.objects.filter(
+            transfer_group=change_request.transfer_group,
+            action_type=COUNTERPART_ACTIONS[change_request.action_type],
+            status='pending'
+        ).first()
+        if related_request:
+            related_request.status = 'rejected'
+            related_request.responded_at = timezone.now()
+            related_request.save()
+    
+    elif change_request.action_type in ['transfer', 'receive']:
         item = change_request.item
         changes = change_request.proposed_changes or {}
         
@@ -0,0 +1,304 @@
+"""
+تایید و رد اجباری دسته‌ای درخواست‌های تغییر کالا توسط مدیر
+
+به جای اجرای approve_change_request_admin برای هر درخواست (که هر کدام مالکان را
+جداگانه جستجو و کالا را جداگانه با save ذخیره می‌کند)، درخواست‌های انتخاب شده،
+کالاها، مالکان جدید و درخواست‌های جفت انتقال/دریافت یک بار خوانده می‌شوند؛ تغییر
+مالک کالاها با bulk_update و رکوردهای تاریخچه با bulk_create در یک تراکنش ثبت
+می‌شوند و شمارنده‌های موجودی، نمایه جستجو، نسخه داده و آمار پنل مدیریت مانند
+signal های holder.signals به‌روزرسانی می‌شوند؛ شمارش ذخیره شده درخواست‌های در
+انتظار مالکان درخواست‌ها نیز پاک می‌شود.
+"""
+
+import copy
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from holder.context_processors import invalidate_admin_stats
+from holder.counters import apply_counter_deltas, counter_key_for_item
+from holder.inbox import invalidate_pending_counts
+from holder.models import Items, ItemHistory, PersonalInfo, ItemChangeRequest
+from holder.search import index_items
+from holder.versioning import bump_data_version
+from .approval_utils import COUNTERPART_ACTIONS, approve_item_edit
+from .bulk_lookup import chunked
+
+
+class BulkApprovalResult:
+    """
+    نتیجه تایید یا رد دسته‌ای
+
+    Attributes:
+        processed: تعداد درخواست‌های انتخاب شده که تایید یا رد شدند
+        related: تعداد درخواست‌های جفت (انتقال/دریافت) که همراه آن‌ها بسته شدند
+        errors: لیست (درخواست، متن خطا) برای درخواست‌هایی که در انتظار باقی ماندند
+    """
+
+    def __init__(self):
+        self.processed = 0
+        self.related = 0
+        self.errors = []
+
+
+def _pending_requests(request_ids):
+    """درخواست‌های در انتظار انتخاب شده به ترتیب ایجاد، با کالا و مالک"""
+    change_requests = []
+    for chunk in chunked(set(request_ids)):
+        change_requests.extend(
+            ItemChangeRequest.objects.select_related('item__PersonalInfo', 'owner')
+            .filter(pk__in=chunk, status='pending')
+        )
+    change_requests.sort(key=lambda change_request: (change_request.created_at, change_request.pk))
+
+    # درخواست‌های یک کالا به همان نمونه کالا اشاره می‌کنند تا تغییرات پشت سر هم اعمال شوند
+    items = {}
+    for change_request in change_requests:
+        change_request.item = items.setdefault(change_request.item_id, change_request.item)
+    return change_requests
+
+
+def pending_counterparts(change_requests):
+    """
+    درخواست جفت در انتظار هر درخواست انتقال/دریافت (مانند reject_related_requests)
+
+    درخواست‌های دارای transfer_group با یک کوئری روی همین ستون جفت می‌شوند و فقط
+    برای درخواست‌های قدیمی بدون گروه، درخواست‌های کالا بر اساس مالک بررسی می‌شوند.
+
+    Returns:
+        dict: شناسه درخواست -> درخواست دریافت مالک جدید (برای انتقال) یا درخواست
+        انتقال مالک قبلی (برای دریافت)
+    """
+    pair_requests = [
+        change_request for change_request in change_requests
+        if change_request.action_type in COUNTERPART_ACTIONS
+    ]
+    grouped = [change_request for change_request in pair_requests if change_request.transfer_group]
+    legacy = [change_request for change_request in pair_requests if not change_request.transfer_group]
+    counterparts = {}
+
+    if grouped:
+        group_members = {}
+        for chunk in chunked({change_request.transfer_group for change_request in grouped}):
+            for candidate in ItemChangeRequest.objects.filter(
+                transfer_group__in=chunk,
+                action_type__in=COUNTERPART_ACTIONS,
+                status='pending',
+            ):
+                group_members[(candidate.transfer_group, candidate.action_type)] = candidate
+        for change_request in grouped:
+            counterpart = group_members.get(
+                (change_request.transfer_group, COUNTERPART_ACTIONS[change_request.action_type])
+            )
+            if counterpart is not None:
+                counterparts[change_request.pk] = counterpart
+
+    if legacy:
+        # جدیدترین درخواست هر (کالا، مالک، نوع)، معادل first() با ترتیب پیش‌فرض مدل
+        candidates = {}
+        for chunk in chunked({change_request.item_id for change_request in legacy}):
+            for candidate in ItemChangeRequest.objects.filter(
+                item_id__in=chunk,
+                action_type__in=COUNTERPART_ACTIONS,
+                status='pending',
+            ).order_by('-created_at'):
+                candidates.setdefault((candidate.item_id, candidate.owner_id, candidate.action_type), candidate)
+        for change_request in legacy:
+            person_changes = (change_request.proposed_changes or {}).get('PersonalInfo', {})
+            if change_request.action_type == 'transfer':
+                key = (change_request.item_id, person_changes.get('new_id'), 'receive')
+            else:
+                key = (change_request.item_id, person_changes.get('old_id'), 'transfer')
+            counterpart = candidates.get(key)
+            if counterpart is not None:
+                counterparts[change_request.pk] = counterpart
+
+    return counterparts
+
+
+def _set_status(change_requests, status, now):
+    request_ids = {change_request.pk for change_request in change_requests}
+    for chunk in chunked(request_ids):
+        ItemChangeRequest.objects.filter(pk__in=chunk).update(status=status, responded_at=now)
+    # update سیگنال post_save ندارد
+    invalidate_pending_counts(change_request.owner_id for change_request in change_requests)
+
+
+class _EditFailed(Exception):
+    """ویرایش ناموفق؛ savepoint درخواست بازگردانده می‌شود"""
+
+
+class _OwnerChanges:
+    """تغییرات مالک کالاها و تاریخچه آن‌ها تا زمان ثبت دسته‌ای"""
+
+    def __init__(self, now):
+        self.now = now
+        self.items = {}
+        self.original_keys = {}
+        self.histories = []
+
+    def move(self, item, new_owner, action_type, description):
+        if item.pk not in self.original_keys:
+            self.original_keys[item.pk] = counter_key_for_item(item)
+        self.histories.append(ItemHistory(
+            item=item,
+            from_person=item.PersonalInfo,
+            to_person=new_owner,
+            action_type=action_type,
+            description=description,
+        ))
+        item.PersonalInfo = new_owner
+        item.update_date = self.now
+        self.items[item.pk] = item
+
+    def save(self, batch_size):
+        if not self.items:
+            return
+        items = list(self.items.values())
+        Items.objects.bulk_update(items, ['PersonalInfo', 'update_date'], batch_size=batch_size)
+        ItemHistory.objects.bulk_create(self.histories, batch_size=batch_size)
+
+        counter_deltas = {}
+        for pk, item in self.items.items():
+            old_key = self.original_keys[pk]
+            new_key = counter_key_for_item(item)
+            if old_key != new_key:
+                counter_deltas[old_key] = counter_deltas.get(old_key, 0) - 1
+                counter_deltas[new_key] = counter_deltas.get(new_key, 0) + 1
+        apply_counter_deltas(counter_deltas)
+        index_items(items)
+        bump_data_version()
+        invalidate_admin_stats()
+
+
+def bulk_approve_requests(request_ids, admin_username, include_counterparts=False):
+    """
+    تایید اجباری درخواست‌های در انتظار (مانند approve_change_request_admin برای هر درخواست)
+
+    درخواست‌ها به ترتیب ایجاد اعمال می‌شوند. تغییرات مالک تا رسیدن به یک درخواست
+    ویرایش همان کالا (یا پایان دسته) در حافظه جمع و یکجا ثبت می‌شوند. هر ویرایش
+    روی نسخه جداگانه‌ای از کالا و در savepoint خود با approve_item_edit اعمال
+    می‌شود؛ خطای یک ویرایش (از جمله خطای پایگاه داده) فقط همان درخواست را در
+    انتظار نگه می‌دارد و مقادیر آن به درخواست‌های بعدی نمی‌رسد.
+
+    Args:
+        request_ids: شناسه درخواست‌های انتخاب شده
+        admin_username: نام کاربر مدیر برای توضیحات تاریخچه
+        include_counterparts: با اعمال یک درخواست انتقال، درخواست دریافت در انتظار
+            مالک جدید نیز تایید شود
+
+    Returns:
+        BulkApprovalResult
+    """
+    batch_size = getattr(settings, 'IMPORT_BULK_BATCH_SIZE', 500)
+    result = BulkApprovalResult()
+    now = timezone.now()
+
+    with transaction.atomic():
+        change_requests = _pending_requests(request_ids)
+        counterparts = pending_counterparts(change_requests) if include_counterparts else {}
+        new_owner_ids = {
+            (change_request.proposed_changes or {}).get('PersonalInfo', {}).get('new_id')
+            for change_request in change_requests
+            if change_request.action_type == 'transfer'
+        }
+        people = PersonalInfo.objects.in_bulk({owner_id for owner_id in new_owner_ids if owner_id})
+
+        # آخرین وضعیت هر کالا در طول دسته
+        items = {change_request.item_id: change_request.item for change_request in change_requests}
+        owner_changes = _OwnerChanges(now)
+        approved = []
+
+        for change_request in change_requests:
+            item = items[change_request.item_id]
+            changes = change_request.proposed_changes or {}
+
+            if change_request.action_type == 'edit':
+                if item.pk in owner_changes.items:
+                    # تغییر مالک قبلی همین کالا پیش از ویرایش ثبت می‌شود
+                    owner_changes.save(batch_size)
+                    owner_changes = _OwnerChanges(now)
+
+                # ویرایش کالا روی نسخه جداگانه تا تغییرات ویرایش ناموفق باقی نماند
+                edited = copy.copy(item)
+                try:
+                    with transaction.atomic():
+                        success, message = approve_item_edit(
+                            edited, changes, change_request.owner,
+                            f'تغییرات اجباری توسط مدیر {admin_username}'
+                        )
+                        if not success:
+                            raise _EditFailed(message)
+                except _EditFailed as e:
+                    result.errors.append((change_request, str(e)))
+                    continue
+                items[item.pk] = edited
+                approved.append(change_request)
+                result.processed += 1
+                continue
+
+            if change_request.action_type in ['transfer', 'remove'] and 'PersonalInfo' in changes:
+                new_owner_id = changes['PersonalInfo'].get('new_id')
+                if new_owner_id and change_request.action_type == 'transfer':
+                    new_owner = people.get(new_owner_id)
+                    if item.PersonalInfo:
+                        # انتقال کالا
+                        if new_owner is None:
+                            result.errors.append((change_request, "خطا در یافتن اطلاعات مالکان."))
+                            continue
+                        owner_changes.move(item, new_owner, 'transfer', f'انتقال اجباری توسط مدیر {admin_username}')
+                    else:
+                        # تخصیص به مالک جدید
+                        if new_owner is None:
+                            result.errors.append((change_request, "مالک جدید یافت نشد"))
+                            continue
+                        owner_changes.move(item, new_owner, 'assign', f'تخصیص اجباری توسط مدیر {admin_username}')
+
+                    counterpart = counterparts.get(change_request.pk)
+                    if counterpart is not None:
+                        approved.append(counterpart)
+                else:
+                    # حذف کالا
+                    owner_changes.move(item, None, 'return', f'حذف اجباری توسط مدیر {admin_username}')
+
+            elif change_request.action_type == 'assign':
+                # تخصیص کالا به مالک جدید
+                owner_changes.move(item, change_request.owner, 'assign', f'تخصیص اجباری توسط مدیر {admin_username}')
+
+            approved.append(change_request)
+            result.processed += 1
+
+        owner_changes.save(batch_size)
+
+        selected = {change_request.pk for change_request in change_requests}
+        result.related = len({change_request.pk for change_request in approved} - selected)
+        _set_status(approved, 'approved', now)
+
+    return result
+
+
+def bulk_reject_requests(request_ids, include_counterparts=False):
+    """
+    رد درخواست‌های در انتظار
+
+    Args:
+        request_ids: شناسه درخواست‌های انتخاب شده
+        include_counterparts: درخواست جفت انتقال/دریافت هر درخواست نیز رد شود
+
+    Returns:
+        BulkApprovalResult
+    """
+    result = BulkApprovalResult()
+
+    with transaction.atomic():
+        change_requests = _pending_requests(request_ids)
+        selected = {change_request.pk for change_request in change_requests}
+        rejected = list(change_requests)
+        if include_counterparts:
+            rejected.extend(pending_counterparts(change_requests).values())
+        _set_status(rejected, 'rejected', timezone.now())
+
+    result.processed = len(selected)
+    result.related = len({change_request.pk for change_request in rejected} - selected)
+    return result
@@ -0,0 +1,59 @@
+"""
+جستجوی دسته‌ای مقادیر با کوئری‌های __in
+
+به جای یک کوئری برای هر ردیف فایل ورودی، همه مقادیر یک ستون با چند کوئری __in
+(هر کدام حداکثر LOOKUP_CHUNK_SIZE مقدار، برای ماندن زیر سقف پارامترهای پایگاه داده)
+خوانده و در یک دیکشنری نگهداری می‌شوند.
+"""
+
+# حداکثر تعداد مقادیر هر کوئری __in
+LOOKUP_CHUNK_SIZE = 500
+
+
+def chunked(values, size=LOOKUP_CHUNK_SIZE):
+    """تقسیم مقادیر به دسته‌های حداکثر size تایی"""
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def lookup_first_by(queryset, field, values, fields=None, chunk_size=LOOKUP_CHUNK_SIZE):
+    """
+    اولین ردیف (کمترین pk، معادل filter(...).first()) برای هر مقدار یک فیلد
+
+    Args:
+        queryset: queryset پایه
+        field: نام فیلد جستجو
+        values: مقادیر جستجو (مقادیر خالی نادیده گرفته می‌شوند)
+        fields: فیلدهای مورد نیاز از هر ردیف (None برای نمونه کامل مدل)
+        chunk_size: حداکثر تعداد مقادیر هر کوئری
+
+    Returns:
+        dict: مقدار فیلد -> نمونه مدل (یا دیکشنری fields در صورت تعیین fields)
+    """
+    values = {value for value in values if value}
+    found = {}
+    for chunk in chunked(values, chunk_size):
+        rows = queryset.filter(**{f'{field}__in': chunk}).order_by('pk')
+        if fields is not None:
+            rows = rows.values(field, *[name for name in fields if name != field])
+            for row in rows:
+                found.setdefault(row[field], row)
+        else:
+            for row in rows:
+                found.setdefault(getattr(row, field), row)
+    return found
+
+
+def existing_values(queryset, field, values, chunk_size=LOOKUP_CHUNK_SIZE):
+    """
+    مجموعه مقادیری از values که در فیلد داده شده وجود دارند
+
+    Returns:
+        set
+    """
+    values = {value for value in values if value}
+    found = set()
+    for chunk in chunked(values, chunk_size):
+        found.update(queryset.filter(**{f'{field}__in': chunk}).values_list(field, flat=True))
+    return found
@@ -0,0 +1,144 @@
+"""
+ابزارهای مشترک برای محاسبه آمار موجودی کالاها
+"""
+
+from holder.models import Items
+from holder.counters import get_counter_rows
+
+
+def get_status_type_counts():
+    """
+    دریافت تعداد کالاها به تفکیک (نوع، وضعیت، زیر وضعیت) از جدول شمارنده‌های موجودی
+
+    Returns:
+        list: لیستی از تاپل‌های (type_Item, status_item, status_sub_item, count)
+    """
+    return [
+        (type_item, status_item, status_sub_item, count)
+        for type_item, status_item, status_sub_item, has_holder, count in get_counter_rows()
+    ]
+
+
+def get_item_totals():
+    """
+    دریافت آمار کلی کالاها (کل، فنی، غیر فنی، به تفکیک وضعیت) بدون COUNT روی جدول کالاها
+
+    Returns:
+        dict: شامل total_items، technical_items، non_technical_items، with_holder_items و status_counts
+    """
+    totals = {
+        'total_items': 0,
+        'technical_items': 0,
+        'non_technical_items': 0,
+        'with_holder_items': 0,
+        'status_counts': {},
+    }
+    for type_item, status_item, status_sub_item, has_holder, count in get_counter_rows():
+        totals['total_items'] += count
+        if type_item == 'Technical':
+            totals['technical_items'] += count
+        elif type_item == 'Non-technical':
+            totals['non_technical_items'] += count
+        if has_holder:
+            totals['with_holder_items'] += count
+        totals['status_counts'][status_item] = totals['status_counts'].get(status_item, 0) + count
+    return totals
+
+
+def build_inventory_breakdown(grouped_counts):
+    """
+    ساخت ساختار آماری داشبورد از شمارش‌های گروه‌بندی شده
+
+    Args:
+        grouped_counts: لیستی از تاپل‌های (type_Item, status_item, status_sub_item, count)
+
+    Returns:
+        dict: شامل total_items، technical_items، non_technical_items و status_stats
+    """
+    total_items = 0
+    type_counts = {}
+    status_counts = {}
+    sub_counts = {}
+    with_sub_counts = {}
+    without_sub_counts = {}
+
+    for type_item, status_item, status_sub_item, count in grouped_counts:
+        total_items += count
+        type_counts[type_item] = type_counts.get(type_item, 0) + count
+        status_counts[status_item] = status_counts.get(status_item, 0) + count
+
+        if status_sub_item is None:
+            without_sub_counts[status_item] = without_sub_counts.get(status_item, 0) + count
+        else:
+            with_sub_counts[status_item] = with_sub_counts.get(status_item, 0) + count
+            key = (status_item, status_sub_item)
+            sub_counts[key] = sub_counts.get(key, 0) + count
+
+    # آمار وضعیت کالاها - به همان ترتیب STATUS_CHOICES
+    status_stats = []
+    for status_code, status_name in Items.STATUS_CHOICES:
+        count = status_counts.get(status_code, 0)
+        percentage = (count / total_items * 100) if total_items > 0 else 0
+
+        # محاسبه زیر وضعیت‌ها برای این وضعیت
+        sub_statuses = []
+        if status_code in Items.STATUS_SUB_MAPPING:
+            items_with_sub_status = with_sub_counts.get(status_code, 0)
+            items_without_sub_status = without_sub_counts.get(status_code, 0)
+
+            for sub_code, sub_name in Items.STATUS_SUB_MAPPING[status_code]:
+                sub_count = sub_counts.get((status_code, sub_code), 0)
+                # درصد نسبت به کل کالاها
+                percentage_total = (sub_count / total_items * 100) if total_items > 0 else 0
+                # درصد نسبت به وضعیت بالادستی
+                percentage_parent = (sub_count / count * 100) if count > 0 else 0
+                # درصد نسبت به آیتم‌هایی که دارای زیر وضعیت هستند
+                percentage_parent_with_sub = (sub_count / items_with_sub_status * 100) if items_with_sub_status > 0 else 0
+
+                sub_statuses.append({
+                    'code': sub_code,
+                    'name': sub_name,
+                    'count': sub_count,
+                    'percentage_total': round(percentage_total, 2),
+                    'percentage_parent': round(percentage_parent, 2),
+                    'percentage_parent_with_sub': round(percentage_parent_with_sub, 2)
+                })
+
+            # اضافه کردن آیتم‌هایی که زیر وضعیت ندارند
+            if items_without_sub_status > 0:
+                percentage_total_no_sub = (items_without_sub_status / total_items * 100) if total_items > 0 else 0
+                percentage_parent_no_sub = (items_without_sub_status / count * 100) if count > 0 else 0
+
+                sub_statuses.append({
+                    'code': 'no_sub_status',
+                    'name': 'بدون زیر وضعیت',
+                    'count': items_without_sub_status,
+                    'percentage_total': round(percentage_total_no_sub, 2),
+                    'percentage_parent': round(percentage_parent_no_sub, 2),
+                    'percentage_parent_with_sub': 0
+                })
+
+        status_stats.append({
+            'code': status_code,
+            'name': status_name,
+            'count': count,
+            'percentage': round(percentage, 2),
+            'sub_statuses': sub_statuses
+        })
+
+    return {
+        'total_items': total_items,
+        'technical_items': type_counts.get('Technical', 0),
+        'non_technical_items': type_counts.get('Non-technical', 0),
+        'status_stats': status_stats,
+    }
+
+
+def get_inventory_breakdown():
+    """
+    محاسبه آمار کامل وضعیت/زیر وضعیت/نوع کالاها از شمارنده‌های موجودی
+
+    Returns:
+        dict: ساختار آماده برای استفاده در داشبورد
+    """
+    return build_inventory_breakdown(get_status_type_counts())
@@ -0,0 +1,115 @@
+"""
+فیلترهای مشترک لیست کالاها (صفحه اصلی، خروجی Excel و PDF)
+"""
+
+from holder.counters import get_counter_rows
+from holder.search import search_items_q
+
+# پارامترهای جستجوی متنی لیست کالاها
+ITEM_SEARCH_PARAMS = ('search', 'brand_search', 'serial_search', 'code_search', 'holder_search')
+
+# همه پارامترهای فیلتر لیست کالاها
+ITEM_FILTER_PARAMS = ITEM_SEARCH_PARAMS + ('type_filter', 'status_filter', 'sub_status_filter')
+
+
+def item_filter_params(params):
+    """
+    استخراج پارامترهای فیلتر غیرخالی لیست کالاها به صورت دیکشنری ساده
+    (برای ذخیره همراه کارهای پس‌زمینه خروجی)
+
+    Args:
+        params: دیکشنری پارامترها (request.GET یا request.POST)
+
+    Returns:
+        dict: نام پارامتر -> مقدار
+    """
+    return {name: params.get(name) for name in ITEM_FILTER_PARAMS if params.get(name)}
+
+
+def apply_item_filters(queryset, params):
+    """
+    اعمال جستجو و فیلترهای لیست کالاها روی queryset
+
+    جستجوهای متنی از نمایه n-gram کالاها (holder.search) استفاده می‌کنند.
+
+    Args:
+        queryset: queryset کالاها
+        params: دیکشنری پارامترها (request.GET یا request.POST)
+
+    Returns:
+        QuerySet: queryset فیلتر شده و مرتب شده بر اساس تاریخ ثبت
+    """
+    search_query = params.get('search')
+    brand_search = params.get('brand_search')
+    serial_search = params.get('serial_search')
+    code_search = params.get('code_search')
+    holder_search = params.get('holder_search')
+    type_filter = params.get('type_filter')
+    status_filter = params.get('status_filter')
+    sub_status_filter = params.get('sub_status_filter')
+
+    # جستجو در نام کالا
+    if search_query:
+        queryset = queryset.filter(search_items_q(search_query, ['name']))
+
+    # جستجو در برند
+    if brand_search:
+        queryset = queryset.filter(search_items_q(brand_search, ['brand']))
+
+    # جستجو در شماره سریال
+    if serial_search:
+        queryset = queryset.filter(search_items_q(serial_search, ['serial']))
+
+    # جستجو در کد محصول
+    if code_search:
+        queryset = queryset.filter(search_items_q(code_search, ['code']))
+
+    # جستجو در دارنده حساب (نام، نام خانوادگی و شماره پرسنلی)
+    if holder_search:
+        queryset = queryset.filter(search_items_q(holder_search, ['holder']))
+
+    # فیلتر بر اساس نوع کالا
+    if type_filter:
+        queryset = queryset.filter(type_Item=type_filter)
+
+    # فیلتر بر اساس وضعیت کالا
+    if status_filter:
+        queryset = queryset.filter(status_item=status_filter)
+
+    # فیلتر بر اساس زیر وضعیت کالا
+    if sub_status_filter:
+        queryset = queryset.filter(status_sub_item=sub_status_filter)
+
+    return queryset.order_by('-register_date')
+
+
+def estimate_filtered_total(params):
+    """
+    تعداد کالاهای لیست بدون COUNT روی جدول کالاها، از شمارنده‌های موجودی
+
+    فقط فیلترهای نوع/وضعیت/زیر وضعیت از شمارنده‌ها قابل محاسبه‌اند؛
+    در صورت وجود جستجوی متنی None برگردانده می‌شود.
+
+    Args:
+        params: دیکشنری پارامترها (request.GET یا request.POST)
+
+    Returns:
+        int یا None
+    """
+    if any(params.get(name) for name in ITEM_SEARCH_PARAMS):
+        return None
+
+    type_filter = params.get('type_filter')
+    status_filter = params.get('status_filter')
+    sub_status_filter = params.get('sub_status_filter')
+
+    total = 0
+    for type_item, status_item, status_sub_item, has_holder, count in get_counter_rows():
+        if type_filter and type_item != type_filter:
+            continue
+        if status_filter and status_item != status_filter:
+            continue
+        if sub_status_filter and status_sub_item != sub_status_filter:
+            continue
+        total += count
+    return total
@@ -0,0 +1,141 @@
+"""
+صفحه‌بندی کلیدی (keyset / cursor) برای لیست‌های بزرگ
+
+به جای COUNT کامل و OFFSET، هر صفحه با شرط روی مقادیر مرتب‌سازی آخرین (یا اولین)
+ردیف صفحه قبل خوانده می‌شود؛ بنابراین هزینه صفحات عمیق با صفحه اول برابر است.
+"""
+
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+class KeysetPage:
+    """
+    یک صفحه از نتایج صفحه‌بندی کلیدی
+
+    Attributes:
+        object_list: ردیف‌های این صفحه
+        has_next / has_previous: وجود صفحه بعد / قبل
+        next_token / previous_token: توکن رمز شده برای دریافت صفحه بعد / قبل
+    """
+
+    def __init__(self, object_list, has_next, has_previous, next_token, previous_token):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.next_token = next_token
+        self.previous_token = previous_token
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def _json_value(value):
+    """تبدیل مقادیر تاریخ (با دقت میکروثانیه) و سایر انواع به رشته برای توکن"""
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def encode_cursor(direction, values):
+    """
+    ساخت توکن cursor از جهت ('n' بعدی، 'p' قبلی) و مقادیر فیلدهای مرتب‌سازی
+    """
+    payload = json.dumps({'d': direction, 'v': values}, default=_json_value, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, model, ordering):
+    """
+    بازگرداندن جهت و مقادیر از توکن cursor
+
+    Returns:
+        tuple: (direction, values) یا (None, None) برای توکن نامعتبر
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+        direction = payload['d']
+        raw_values = payload['v']
+        if direction not in ('n', 'p') or len(raw_values) != len(ordering):
+            return None, None
+        values = [
+            model._meta.get_field(field.lstrip('-')).to_python(value)
+            for field, value in zip(ordering, raw_values)
+        ]
+        return direction, values
+    except (ValueError, TypeError, KeyError, ValidationError, UnicodeError):
+        return None, None
+
+
+def _keyset_condition(ordering, values, forward):
+    """
+    شرط «بعد از» (یا «قبل از») یک ردیف برای مرتب‌سازی چند فیلدی
+
+    برای (a desc, b desc) و مقادیر (x, y) شرط a <= x AND (a < x OR (a = x AND b < y))
+    ساخته می‌شود؛ بخش اول امکان استفاده از ایندکس را به صورت بازه فراهم می‌کند.
+    """
+    lookups = []
+    for field in ordering:
+        descending = field.startswith('-')
+        # در جهت رو به جلو همان ترتیب مرتب‌سازی دنبال می‌شود
+        lookups.append((field.lstrip('-'), 'lt' if descending == forward else 'gt'))
+
+    condition = Q()
+    equal = Q()
+    for (name, lookup), value in zip(lookups, values):
+        condition |= equal & Q(**{f'{name}__{lookup}': value})
+        equal &= Q(**{name: value})
+
+    first_name, first_lookup = lookups[0]
+    return Q(**{f'{first_name}__{first_lookup}e': values[0]}) & condition
+
+
+def keyset_paginate(queryset, token=None, per_page=10, ordering=('-register_date', '-id')):
+    """
+    صفحه‌بندی کلیدی queryset
+
+    Args:
+        queryset: queryset ورودی (مرتب‌سازی آن با ordering جایگزین می‌شود)
+        token: توکن cursor دریافتی از صفحه قبل (خالی برای صفحه اول)
+        per_page: تعداد ردیف در هر صفحه
+        ordering: فیلدهای مرتب‌سازی؛ فیلد آخر باید یکتا باشد (مثلاً id)
+
+    Returns:
+        KeysetPage
+    """
+    ordering = list(ordering)
+    direction, values = decode_cursor(token, queryset.model, ordering) if token else (None, None)
+
+    def reverse(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    if direction == 'p':
+        # صفحه قبل: خواندن در جهت عکس و برگرداندن ترتیب
+        rows = list(
+            queryset.filter(_keyset_condition(ordering, values, forward=False))
+            .order_by(*[reverse(field) for field in ordering])[:per_page + 1]
+        )
+        has_previous = len(rows) > per_page
+        rows = rows[:per_page][::-1]
+        has_next = True
+    else:
+        if direction == 'n':
+            queryset = queryset.filter(_keyset_condition(ordering, values, forward=True))
+        rows = list(queryset.order_by(*ordering)[:per_page + 1])
+        has_next = len(rows) > per_page
+        rows = rows[:per_page]
+        has_previous = direction == 'n'
+
+    def row_values(row):
+        return [getattr(row, field.lstrip('-')) for field in ordering]
+
+    next_token = encode_cursor('n', row_values(rows[-1])) if rows and has_next else None
+    previous_token = encode_cursor('p', row_values(rows[0])) if rows and has_previous else None
+    return KeysetPage(rows, bool(next_token), bool(previous_token), next_token, previous_token)